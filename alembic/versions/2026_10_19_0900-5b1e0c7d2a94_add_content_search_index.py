@@ -0,0 +1,49 @@
+"""Add full-text search index for content
+
+Revision ID: 5b1e0c7d2a94
+Revises: 40047453e55f
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5b1e0c7d2a94'
+down_revision = '40047453e55f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("ALTER TABLE contents ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_contents_search_vector "
+            "ON contents USING gin (search_vector)"
+        )
+        # Backfill existing rows
+        op.execute(
+            "UPDATE contents SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(content, '')), 'B') "
+            "WHERE is_deleted = false"
+        )
+    elif dialect == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS contents_fts USING fts5(title, content)")
+        op.execute(
+            "INSERT INTO contents_fts (rowid, title, content) "
+            "SELECT id, title, content FROM contents WHERE is_deleted = 0"
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_contents_search_vector")
+        op.execute("ALTER TABLE contents DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS contents_fts")
@@ -0,0 +1,33 @@
+"""Add cache invalidations table
+
+Revision ID: 977b54002007
+Revises: 5b1e0c7d2a94
+Create Date: 2026-10-19 09:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '977b54002007'
+down_revision = '5b1e0c7d2a94'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('cache_invalidations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('namespace', sa.String(), nullable=False),
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_cache_invalidations_id'), 'cache_invalidations', ['id'], unique=False)
+    op.create_index(op.f('ix_cache_invalidations_created_at'), 'cache_invalidations', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_cache_invalidations_created_at'), table_name='cache_invalidations')
+    op.drop_index(op.f('ix_cache_invalidations_id'), table_name='cache_invalidations')
+    op.drop_table('cache_invalidations')
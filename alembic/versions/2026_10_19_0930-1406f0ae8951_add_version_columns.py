@@ -0,0 +1,25 @@
+"""Add version columns for optimistic concurrency
+
+Revision ID: 1406f0ae8951
+Revises: 977b54002007
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '1406f0ae8951'
+down_revision = '977b54002007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('contents', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('users', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'version')
+    op.drop_column('contents', 'version')
@@ -0,0 +1,36 @@
+"""Add moderation queue lease columns and pending queue index
+
+Revision ID: 0320c100ad54
+Revises: 1406f0ae8951
+Create Date: 2026-10-19 09:45:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0320c100ad54'
+down_revision = '1406f0ae8951'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('contents', sa.Column('claimed_by', sa.Integer(), nullable=True))
+    op.add_column('contents', sa.Column('claim_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_foreign_key('fk_contents_claimed_by', 'contents', 'users', ['claimed_by'], ['id'])
+    op.create_index(
+        'ix_contents_pending_queue',
+        'contents',
+        ['created_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text("moderation_status = 'pending' AND is_deleted = false"),
+        sqlite_where=sa.text("moderation_status = 'pending' AND is_deleted = 0")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contents_pending_queue', table_name='contents')
+    op.drop_constraint('fk_contents_claimed_by', 'contents', type_='foreignkey')
+    op.drop_column('contents', 'claim_expires_at')
+    op.drop_column('contents', 'claimed_by')
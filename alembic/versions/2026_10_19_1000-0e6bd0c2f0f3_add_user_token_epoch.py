@@ -0,0 +1,23 @@
+"""Add token epoch to users
+
+Revision ID: 0e6bd0c2f0f3
+Revises: 0320c100ad54
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0e6bd0c2f0f3'
+down_revision = '0320c100ad54'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_epoch', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_epoch')
@@ -0,0 +1,34 @@
+"""Add changes table for the change feed
+
+Revision ID: 01a1701fd748
+Revises: 0e6bd0c2f0f3
+Create Date: 2026-10-19 10:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '01a1701fd748'
+down_revision = '0e6bd0c2f0f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('changes',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('entity_type', sa.String(), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_changes_created_at'), 'changes', ['created_at'], unique=False)
+    op.create_index('ix_changes_entity_type_id', 'changes', ['entity_type', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_changes_entity_type_id', table_name='changes')
+    op.drop_index(op.f('ix_changes_created_at'), table_name='changes')
+    op.drop_table('changes')
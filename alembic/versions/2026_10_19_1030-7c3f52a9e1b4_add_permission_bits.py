@@ -0,0 +1,42 @@
+"""Add permission bits and registry version
+
+Revision ID: 7c3f52a9e1b4
+Revises: 01a1701fd748
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '7c3f52a9e1b4'
+down_revision = '01a1701fd748'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('permissions', sa.Column('bit', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_permissions_bit'), 'permissions', ['bit'], unique=True)
+
+    # Existing permissions get bits in creation order
+    conn = op.get_bind()
+    permission_ids = conn.execute(sa.text("SELECT id FROM permissions ORDER BY id")).scalars().all()
+    for bit, permission_id in enumerate(permission_ids):
+        conn.execute(
+            sa.text("UPDATE permissions SET bit = :bit WHERE id = :id"),
+            {"bit": bit, "id": permission_id}
+        )
+
+    op.create_table('permission_registry',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO permission_registry (id, version) VALUES (1, 1)")
+
+
+def downgrade() -> None:
+    op.drop_table('permission_registry')
+    op.drop_index(op.f('ix_permissions_bit'), table_name='permissions')
+    op.drop_column('permissions', 'bit')
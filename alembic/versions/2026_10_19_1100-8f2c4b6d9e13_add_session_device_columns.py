@@ -0,0 +1,27 @@
+"""Add device, address and last-seen columns to user_sessions
+
+Revision ID: 8f2c4b6d9e13
+Revises: 3d8e5f1a6b27
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8f2c4b6d9e13'
+down_revision = '3d8e5f1a6b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('user_sessions', sa.Column('user_agent', sa.String(), nullable=True))
+    op.add_column('user_sessions', sa.Column('ip_address', sa.String(), nullable=True))
+    op.add_column('user_sessions', sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('user_sessions', 'last_seen_at')
+    op.drop_column('user_sessions', 'ip_address')
+    op.drop_column('user_sessions', 'user_agent')
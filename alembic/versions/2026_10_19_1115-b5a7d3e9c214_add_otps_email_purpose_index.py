@@ -0,0 +1,30 @@
+"""Keep one OTP per email and purpose behind a unique index
+
+Revision ID: b5a7d3e9c214
+Revises: 8f2c4b6d9e13
+Create Date: 2026-10-19 11:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b5a7d3e9c214'
+down_revision = '8f2c4b6d9e13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Only the newest code per email and purpose was ever accepted
+    op.execute(
+        "DELETE FROM otps WHERE id NOT IN "
+        "(SELECT MAX(id) FROM otps GROUP BY email, purpose)"
+    )
+    op.drop_index('ix_otps_email', table_name='otps')
+    op.create_index('ix_otps_email_purpose', 'otps', ['email', 'purpose'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_otps_email_purpose', table_name='otps')
+    op.create_index('ix_otps_email', 'otps', ['email'], unique=False)
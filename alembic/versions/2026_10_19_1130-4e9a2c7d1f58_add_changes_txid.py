@@ -0,0 +1,29 @@
+"""Order the change feed by writing transaction
+
+Revision ID: 4e9a2c7d1f58
+Revises: b5a7d3e9c214
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '4e9a2c7d1f58'
+down_revision = 'b5a7d3e9c214'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows keep txid 0, so they stay ahead of everything new and
+    # plain id cursors handed out before this migration remain valid
+    op.add_column('changes', sa.Column('txid', sa.BigInteger(), server_default='0', nullable=False))
+    op.drop_index('ix_changes_entity_type_id', table_name='changes')
+    op.create_index('ix_changes_entity_type_txid_id', 'changes', ['entity_type', 'txid', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_changes_entity_type_txid_id', table_name='changes')
+    op.create_index('ix_changes_entity_type_id', 'changes', ['entity_type', 'id'], unique=False)
+    op.drop_column('changes', 'txid')
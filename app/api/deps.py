@@ -1,21 +1,27 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from functools import lru_cache
 from typing import List, Optional
-from jose import JWTError, jwt
+from jwt import InvalidTokenError
 from app.db.base import get_db
 from app.models.user import User
+from app.core.security import verify_token
 from app.core.config import settings
+import ipaddress
+import secrets
 from app.core.logger import logger
 from app.services.permission_service import PermissionService
 from app.services.token_blacklist_service import TokenBlacklistService
+from app.services.user_cache_service import UserCacheService, UserPrincipal
+from app.services.session_service import session_activity
 
 # OAuth2 scheme for token extraction
 oauth2_scheme = HTTPBearer()
 
 
-def get_current_user(db: Session = Depends(get_db), credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme)) -> User:
-    """Get current authenticated user with blacklist check"""
+def get_current_user(db: Session = Depends(get_db), credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme)) -> UserPrincipal:
+    """Get current authenticated user with blacklist and session check"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -23,23 +29,25 @@ def get_current_user(db: Session = Depends(get_db), credentials: HTTPAuthorizati
     )
     
     try:
-        # Check if token is blacklisted first
-        if TokenBlacklistService.is_token_blacklisted(db, credentials.credentials):
-            logger.warning("Attempted to use blacklisted token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has been revoked",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        # Verified once per token, then served from the digest cache
+        payload = verify_token(credentials.credentials)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-    except JWTError:
+    except InvalidTokenError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    session_id = payload.get("sid")
+    if TokenBlacklistService.is_token_revoked(db, payload.get("jti"), session_id):
+        logger.warning("Attempted to use blacklisted token or revoked session")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # Cached principal; other User attributes load lazily when a handler reads them
+    user = UserCacheService.get_principal(db, int(user_id))
     if user is None:
         raise credentials_exception
     
@@ -52,15 +60,35 @@ def get_current_user(db: Session = Depends(get_db), credentials: HTTPAuthorizati
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return user
+    # Tokens issued before the user's last bulk revocation are no longer valid
+    if payload.get("epoch", 0) != user.token_epoch:
+        logger.warning(f"Attempted to use revoked token for user {user_id}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if session_id:
+        # Coalesced in memory, written by a background flush
+        session_activity.touch(session_id)
+    
+    # The permission mask in the token only holds for the role it was issued for
+    if payload.get("rid") != user.role_id:
+        return user.bind(db, None, None)
+    return user.bind(db, payload.get("pm"), payload.get("pv"))
 
 
 def require_permission(permission: str):
     """Decorator to require specific permission"""
     def permission_checker(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-        user_permissions = PermissionService.get_user_permissions(db, current_user.id)
-        
-        if permission not in user_permissions:
+        if not PermissionService.has_permission(
+            db,
+            current_user.role_id,
+            permission,
+            current_user.permission_mask,
+            current_user.registry_version
+        ):
             logger.warning(f"User {current_user.id} attempted to access resource requiring permission '{permission}'")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -89,19 +117,69 @@ def require_role(role: str):
     return role_checker
 
 
+def require_service_token(request: Request):
+    """Authenticate internal services with the shared SERVICE_TOKEN.
+    
+    Service endpoints are hidden (404) when no token is configured.
+    """
+    if not settings.SERVICE_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    
+    expected = f"Bearer {settings.SERVICE_TOKEN}"
+    if not secrets.compare_digest(request.headers.get("Authorization", ""), expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid service token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@lru_cache(maxsize=1)
+def _trusted_networks(value: str) -> Optional[List]:
+    """Parsed TRUSTED_PROXIES; None when every peer is trusted"""
+    entries = [entry.strip() for entry in value.split(",") if entry.strip()]
+    if "*" in entries:
+        return None
+    return [ipaddress.ip_network(entry, strict=False) for entry in entries]
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    networks = _trusted_networks(settings.TRUSTED_PROXIES)
+    if networks is None:
+        return True
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in networks)
+
+
 def get_client_ip(request: Request) -> str:
-    """Get client IP address from request"""
-    # Check for forwarded headers first
+    """Get client IP address from request.
+    
+    Forwarded headers are client-controlled, so they are only honored when
+    the connection comes from one of TRUSTED_PROXIES. X-Forwarded-For is
+    read from the nearest hop outwards, skipping our own proxies.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if not _is_trusted_proxy(peer):
+        return peer
+    
     forwarded_for = request.headers.get("X-Forwarded-For")
     if forwarded_for:
-        return forwarded_for.split(",")[0].strip()
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not _is_trusted_proxy(hop):
+                return hop
+        if hops:
+            return hops[0]
     
     real_ip = request.headers.get("X-Real-IP")
     if real_ip:
-        return real_ip
+        return real_ip.strip()
     
     # Fall back to direct connection
-    return request.client.host if request.client else "unknown"
+    return peer
 
 
 def get_user_agent(request: Request) -> str:
@@ -4,9 +4,14 @@ from typing import List
 
 from app.db.base import get_db
 from app.schemas.user import UserResponse, UserUpdate
+from app.schemas.auth import SessionResponse
 from app.models.user import User
 from app.api.deps import require_permission, get_client_ip, get_user_agent
 from app.services.audit_service import AuditService
+from app.services.change_feed_service import ChangeFeedService
+from app.services.session_service import SessionService
+from app.core.invalidation import invalidation_bus
+from app.core.maintenance import maintenance
 
 router = APIRouter()
 
@@ -48,9 +53,11 @@ def update_user(
         raise HTTPException(status_code=404, detail="User not found")
     
     # Update user fields
-    for field, value in user_update.dict(exclude_unset=True).items():
+    for field, value in user_update.dict(exclude_unset=True, exclude={"version"}).items():
         setattr(user, field, value)
     
+    ChangeFeedService.record(db, "user", user.id, "updated")
+    invalidation_bus.user_changed(db, user.id)
     db.commit()
     db.refresh(user)
     
@@ -85,6 +92,8 @@ def delete_user(
     # Soft delete
     user.is_deleted = True
     user.is_active = False
+    ChangeFeedService.record(db, "user", user.id, "deleted")
+    invalidation_bus.user_changed(db, user.id)
     db.commit()
     
     # Log audit
@@ -103,6 +112,46 @@ def delete_user(
     return {"message": "User deleted successfully"}
 
 
+@router.get("/users/{user_id}/sessions", response_model=List[SessionResponse])
+def get_user_sessions(
+    user_id: int,
+    current_user: User = Depends(require_permission("user_manage")),
+    db: Session = Depends(get_db)
+):
+    """List a user's active sessions (Admin only) - Devices and last activity"""
+    if not db.query(User.id).filter(User.id == user_id, User.is_deleted.is_(False)).first():
+        raise HTTPException(status_code=404, detail="User not found")
+    return SessionService.list_sessions(db, user_id)
+
+
+@router.delete("/users/{user_id}/sessions/{session_id}")
+def revoke_user_session(
+    user_id: int,
+    session_id: str,
+    request: Request,
+    current_user: User = Depends(require_permission("user_manage")),
+    db: Session = Depends(get_db)
+):
+    """Revoke any user's session (Admin only) - Its refresh and access tokens stop working"""
+    if not SessionService.revoke_session(db, session_id, user_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # Log audit
+    AuditService.log_action(
+        db=db,
+        action="session_revoked_by_admin",
+        user_id=current_user.id,
+        resource="session",
+        resource_id=session_id,
+        details={"session_user_id": user_id},
+        ip_address=get_client_ip(request),
+        user_agent=get_user_agent(request),
+        status="success"
+    )
+    
+    return {"message": "Session revoked successfully"}
+
+
 @router.get("/audit-logs")
 def get_audit_logs(
     current_user: User = Depends(require_permission("audit_view")),
@@ -114,3 +163,29 @@ def get_audit_logs(
     
     logs = db.query(AuditLog).order_by(AuditLog.created_at.desc()).all()
     return paginate(logs)
+
+
+@router.get("/cache-stats")
+def get_cache_stats(
+    current_user: User = Depends(require_permission("system_manage"))
+):
+    """Get in-process cache statistics (Admin only) - Hit ratios and memory footprint"""
+    from app.core.cache import get_cache_stats
+    
+    return get_cache_stats()
+
+
+@router.get("/invalidation-bus")
+def get_invalidation_bus_stats(
+    current_user: User = Depends(require_permission("system_manage"))
+):
+    """Get cross-worker invalidation bus statistics (Admin only) - Delivery counts and lag"""
+    return invalidation_bus.get_stats()
+
+
+@router.get("/maintenance")
+def get_maintenance_stats(
+    current_user: User = Depends(require_permission("system_manage"))
+):
+    """Get maintenance scheduler statistics (Admin only) - Rows reaped and time spent per task"""
+    return maintenance.get_stats()
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from fastapi_pagination import Page, paginate
 from typing import Optional
@@ -8,6 +9,8 @@ from app.schemas.audit_log import AuditLogResponse
 from app.models.audit_log import AuditLog
 from app.api.deps import require_permission
 from app.models.user import User
+from app.services.audit_service import AUDIT_TOPIC
+from app.core.sse import event_stream_response
 
 router = APIRouter()
 
@@ -36,6 +39,29 @@ def list_audit_logs(
     return paginate(logs)
 
 
+@router.get("/stream")
+async def stream_audit_logs(
+    request: Request,
+    user_id: Optional[int] = Query(None, description="Filter by user ID"),
+    action: Optional[str] = Query(None, description="Filter by action"),
+    resource: Optional[str] = Query(None, description="Filter by resource"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("audit_view"))
+):
+    """Live tail of new audit logs as Server-Sent Events (moderator/admin only)"""
+    def matches(evt) -> bool:
+        log = evt.data
+        return (
+            (user_id is None or log["user_id"] == user_id)
+            and (action is None or log["action"] == action)
+            and (resource is None or log["resource"] == resource)
+        )
+    
+    # The stream can stay open for hours; do not pin a pooled connection
+    await run_in_threadpool(db.close)
+    return event_stream_response(request, AUDIT_TOPIC, matches)
+
+
 @router.get("/{log_id}", response_model=AuditLogResponse)
 def get_audit_log(
     log_id: int,
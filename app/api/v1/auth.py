@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+import json
+import math
+from typing import List
 
 from app.db.base import get_db
 from app.schemas.auth import (
@@ -10,16 +14,26 @@ from app.schemas.auth import (
     OTPRequest,
     RegisterRequest,
     RegisterResponse,
-    VerifyAccountRequest
+    VerifyAccountRequest,
+    RevocationSnapshot,
+    IntrospectRequest,
+    IntrospectResponse,
+    SessionResponse
 )
 from app.schemas.user import UserResponse
 from app.services.auth_service import AuthService
 from app.services.otp_service import OTPService
 from app.services.audit_service import AuditService
 from app.services.token_blacklist_service import TokenBlacklistService
-from app.api.deps import get_current_user, get_client_ip, get_user_agent
+from app.services.user_service import UserService
+from app.services.session_service import SessionService
+from app.services.login_throttle_service import login_throttle
+from app.api.deps import get_current_user, get_client_ip, get_user_agent, require_service_token
 from app.models.user import User
 from app.core.logger import logger
+from app.core.security import verify_token
+from app.core.etag import make_etag, etag_matches_none_match, not_modified
+from app.core.config import settings
 
 # OAuth2 scheme for token extraction
 oauth2_scheme = HTTPBearer()
@@ -35,10 +49,13 @@ async def register(
 ):
     """Register a new user (Step 1: Create account)"""
     try:
+        # Checked before the user is committed, so a 429 never leaves an account without a code
+        OTPService.check_send_allowed(get_client_ip(request))
+        
         # Create user
         user = AuthService.register_user(db, user_data)
         
-        # Send OTP
+        # Send OTP (the IP's send was already counted above)
         await OTPService.create_otp(db, user.email, purpose="registration")
         
         # Log audit
@@ -78,6 +95,9 @@ def verify_account(
 ):
     """Verify user account with OTP (Step 2: Verify account)"""
     try:
+        # Rejected here, before any database work, once over the attempt limits
+        OTPService.check_verify_allowed(verify_data.email, "registration", get_client_ip(request))
+        
         user = AuthService.verify_user_account(db, verify_data)
         
         # Log audit
@@ -115,7 +135,7 @@ async def resend_otp(
         # Check if user exists
         user = db.query(User).filter(
             User.email == otp_request.email,
-            User.is_deleted is False
+            User.is_deleted == False
         ).first()
         
         if not user:
@@ -130,8 +150,10 @@ async def resend_otp(
                 detail="Account already verified"
             )
         
-        # Create new OTP
-        await OTPService.create_otp(db, otp_request.email, purpose="registration")
+        # Create new OTP (a resend within the cooldown keeps the pending one)
+        sent = await OTPService.create_otp(
+            db, otp_request.email, purpose="registration", ip_address=get_client_ip(request)
+        )
         
         # Log audit
         AuditService.log_action(
@@ -139,7 +161,7 @@ async def resend_otp(
             action="otp_resend",
             user_id=user.id,
             resource="otp",
-            details={"email": otp_request.email},
+            details={"email": otp_request.email, "coalesced": not sent},
             ip_address=get_client_ip(request),
             user_agent=get_user_agent(request),
             status="success"
@@ -167,16 +189,32 @@ async def login(
     db: Session = Depends(get_db)
 ):
     """Login user - Step 1: Verify credentials and send OTP"""
-    user = AuthService.authenticate_user(db, login_data.email, login_data.password)
+    ip_address = get_client_ip(request)
+    
+    # Reject attempts inside the backoff window before any DB or bcrypt work;
+    # they are audited as periodic per email/IP summaries
+    retry_after = login_throttle.acquire(login_data.email, ip_address)
+    if retry_after:
+        login_throttle.suppress(login_data.email, ip_address, get_user_agent(request))
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, please try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+    
+    # bcrypt is deliberately slow; keep it off the event loop
+    user = await run_in_threadpool(AuthService.authenticate_user, db, login_data.email, login_data.password)
     
     if not user:
+        login_throttle.record_failure(login_data.email, ip_address)
+        
         # Log failed attempt
         AuditService.log_action(
             db=db,
             action="login_failed",
             resource="auth",
             details={"email": login_data.email},
-            ip_address=get_client_ip(request),
+            ip_address=ip_address,
             user_agent=get_user_agent(request),
             status="failed"
         )
@@ -187,6 +225,8 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    login_throttle.record_success(login_data.email)
+    
     # Check if user account is verified
     if not user.is_verified:
         raise HTTPException(
@@ -202,7 +242,7 @@ async def login(
         )
     
     # Send OTP for login verification
-    await OTPService.create_otp(db, user.email, purpose="login")
+    await OTPService.create_otp(db, user.email, purpose="login", ip_address=ip_address)
     
     # Log OTP sent
     AuditService.log_action(
@@ -211,7 +251,7 @@ async def login(
         user_id=user.id,
         resource="auth",
         details={"email": user.email},
-        ip_address=get_client_ip(request),
+        ip_address=ip_address,
         user_agent=get_user_agent(request),
         status="success"
     )
@@ -235,9 +275,9 @@ async def resend_login_otp(
         # Check if user exists and is verified
         user = db.query(User).filter(
             User.email == otp_request.email,
-            User.is_deleted is False,
-            User.is_verified is True,
-            User.is_active is True
+            User.is_deleted == False,
+            User.is_verified == True,
+            User.is_active == True
         ).first()
         
         if not user:
@@ -246,8 +286,10 @@ async def resend_login_otp(
                 detail="User not found or account not verified"
             )
         
-        # Create new OTP for login
-        await OTPService.create_otp(db, otp_request.email, purpose="login")
+        # Create new OTP for login (a resend within the cooldown keeps the pending one)
+        sent = await OTPService.create_otp(
+            db, otp_request.email, purpose="login", ip_address=get_client_ip(request)
+        )
         
         # Log audit
         AuditService.log_action(
@@ -255,7 +297,7 @@ async def resend_login_otp(
             action="login_otp_resend",
             user_id=user.id,
             resource="auth",
-            details={"email": otp_request.email},
+            details={"email": otp_request.email, "coalesced": not sent},
             ip_address=get_client_ip(request),
             user_agent=get_user_agent(request),
             status="success"
@@ -284,6 +326,9 @@ async def verify_login(
 ):
     """Login user - Step 2: Verify OTP and return JWT tokens"""
     try:
+        # Rejected here, before any database work, once over the attempt limits
+        OTPService.check_verify_allowed(verify_data.email, "login", get_client_ip(request))
+        
         # Verify OTP
         user = await OTPService.verify_otp(db, verify_data.email, verify_data.otp_code, purpose="login")
         
@@ -294,7 +339,12 @@ async def verify_login(
             )
         
         # Create tokens
-        tokens = AuthService.create_tokens(user.id, db)
+        tokens = AuthService.create_tokens(
+            user.id,
+            db,
+            user_agent=get_user_agent(request),
+            ip_address=get_client_ip(request)
+        )
         
         # Log successful login
         AuditService.log_action(
@@ -328,18 +378,13 @@ def refresh_token(
 ):
     """Refresh access token"""
     try:
-        # First blacklist the old refresh token
-        TokenBlacklistService.add_token_to_blacklist(
-            db=db,
-            token=refresh_data.refresh_token,
-            user_id=None,  # Will be extracted from token
-            token_type="refresh"
+        # Rotating within the session retires the old refresh token
+        return AuthService.refresh_access_token(
+            db,
+            refresh_data.refresh_token,
+            ip_address=get_client_ip(request),
+            user_agent=get_user_agent(request)
         )
-        
-        # Create new tokens
-        tokens = AuthService.refresh_access_token(db, refresh_data.refresh_token)
-        
-        return tokens
     except HTTPException:
         raise
     except Exception as e:
@@ -367,6 +412,11 @@ def logout(
             token_type="access"
         )
         
+        # End the session so its refresh token stops working too
+        session_id = verify_token(credentials.credentials).get("sid")
+        if session_id:
+            SessionService.revoke_session(db, session_id, current_user.id)
+        
         # Log logout
         AuditService.log_action(
             db=db,
@@ -402,7 +452,93 @@ def logout(
 
 @router.get("/me", response_model=UserResponse)
 def get_current_user_info(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user)
 ):
     """Get current user information"""
+    etag = UserService.user_etag(current_user)
+    if etag_matches_none_match(request, etag):
+        return not_modified(etag)
+    
+    response.headers["ETag"] = etag
     return current_user
+
+
+@router.get("/sessions", response_model=List[SessionResponse])
+def list_sessions(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme)
+):
+    """List own active sessions (one per login/device)"""
+    current_session_id = verify_token(credentials.credentials).get("sid")
+    sessions = SessionService.list_sessions(db, current_user.id)
+    return [
+        SessionResponse.model_validate(session).model_copy(update={"current": session.id == current_session_id})
+        for session in sessions
+    ]
+
+
+@router.delete("/sessions/{session_id}")
+def revoke_session(
+    session_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Revoke one of own sessions; its refresh and access tokens stop working"""
+    if not SessionService.revoke_session(db, session_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    AuditService.log_action(
+        db=db,
+        action="session_revoked",
+        user_id=current_user.id,
+        resource="session",
+        resource_id=session_id,
+        ip_address=get_client_ip(request),
+        user_agent=get_user_agent(request),
+        status="success"
+    )
+    
+    return {"message": "Session revoked successfully"}
+
+
+@router.get("/revocations", response_model=RevocationSnapshot, dependencies=[Depends(require_service_token)])
+def get_revocation_snapshot(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    """Revocation snapshot for services that verify tokens locally via the JWKS (service token)"""
+    snapshot = TokenBlacklistService.get_revocation_snapshot(db)
+    etag = make_etag(json.dumps(
+        [
+            snapshot["revoked_jtis"], snapshot["token_epochs"], snapshot["disabled_users"],
+            snapshot["default_role_id"], snapshot["role_ids"]
+        ],
+        sort_keys=True
+    ))
+    cache_control = f"private, max-age={settings.REVOCATION_SNAPSHOT_MAX_AGE_SECONDS}"
+    
+    if etag_matches_none_match(request, etag):
+        not_modified_response = not_modified(etag)
+        not_modified_response.headers["Cache-Control"] = cache_control
+        return not_modified_response
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return snapshot
+
+
+@router.post("/introspect", response_model=IntrospectResponse, dependencies=[Depends(require_service_token)])
+def introspect_tokens(
+    introspect_data: IntrospectRequest,
+    db: Session = Depends(get_db)
+):
+    """Validate a batch of access tokens in one call (service token)"""
+    return IntrospectResponse(results=AuthService.introspect_tokens(db, introspect_data.tokens))
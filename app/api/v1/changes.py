@@ -0,0 +1,55 @@
+import asyncio
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.db.base import get_db
+from app.schemas.change import ChangeFeedResponse
+from app.services.change_feed_service import ChangeFeedService, ENTITY_TYPES
+from app.api.deps import require_permission
+from app.models.user import User
+from app.core.config import settings
+
+router = APIRouter()
+
+
+@router.get("/", response_model=ChangeFeedResponse)
+async def get_changes(
+    since: Optional[str] = Query(None, description="Cursor from the previous response; omit to start from now"),
+    types: str = Query("user,content", description="Comma-separated entity types"),
+    limit: int = Query(500, ge=1, le=5000),
+    wait: int = Query(0, ge=0, description="Seconds to long-poll when there are no changes"),
+    current_user: User = Depends(require_permission("user_manage")),
+    db: Session = Depends(get_db)
+):
+    """Incremental change feed for users and content (admin only)"""
+    entity_types = [t.strip() for t in types.split(",") if t.strip()]
+    if not entity_types or any(t not in ENTITY_TYPES for t in entity_types):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"types must be a subset of {', '.join(ENTITY_TYPES)}"
+        )
+    
+    if since is None:
+        cursor = await run_in_threadpool(ChangeFeedService.current_cursor, db)
+        return ChangeFeedResponse(changes=[], cursor=cursor)
+    
+    try:
+        cursor = ChangeFeedService.parse_cursor(since)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
+    deadline = time.monotonic() + min(wait, settings.CHANGE_FEED_MAX_WAIT_SECONDS)
+    while True:
+        result = await run_in_threadpool(ChangeFeedService.get_changes, db, cursor, entity_types, limit)
+        if result["changes"] or time.monotonic() >= deadline:
+            return result
+        
+        # Release the connection while waiting for new changes
+        await run_in_threadpool(db.rollback)
+        await asyncio.sleep(min(settings.CHANGE_FEED_POLL_SECONDS, max(deadline - time.monotonic(), 0)))
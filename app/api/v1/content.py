@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Request, HTTPException, status
+from fastapi import APIRouter, Depends, Request, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from fastapi_pagination import Page, paginate
@@ -8,11 +8,28 @@ from app.models.user import User
 from app.api.deps import require_permission, get_client_ip, get_user_agent
 from app.services.audit_service import AuditService
 from app.services.content_service import ContentService
-from app.schemas.content import ContentCreate, ContentUpdate, ContentResponse, ContentModeration
+from app.services.search_service import ContentSearchService
+from app.services.content_cache_service import ContentCacheService
+from app.core.etag import make_version_etag, get_if_match_version, etag_matches_none_match, not_modified
+from app.schemas.content import (
+    ContentCreate,
+    ContentUpdate,
+    ContentResponse,
+    ContentModeration,
+    ContentSearchResponse,
+    ContentBulkModeration,
+    BulkModerationResponse,
+    BulkModerationResult
+)
 
 router = APIRouter()
 
 
+def _can_view(content, user: User) -> bool:
+    """Private content is only visible to its author and to moderators/admins"""
+    return content.is_public or content.author_id == user.id or user.role.name in ["admin", "moderator"]
+
+
 @router.post("/", response_model=ContentResponse)
 def create_content(
     content_data: ContentCreate,
@@ -84,14 +101,42 @@ def get_content(
         )
 
 
+@router.get("/search", response_model=ContentSearchResponse)
+def search_content(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    current_user: User = Depends(require_permission("content_read")),
+    db: Session = Depends(get_db)
+):
+    """Full-text search over content titles and bodies, ranked by relevance"""
+    items, next_cursor = ContentSearchService.search(
+        db=db,
+        q=q,
+        user_id=current_user.id,
+        is_privileged=current_user.role.name in ["admin", "moderator"],
+        limit=limit,
+        cursor=cursor
+    )
+    
+    return ContentSearchResponse(items=items, next_cursor=next_cursor)
+
+
 @router.get("/{content_id}", response_model=ContentResponse)
 def get_content_by_id(
     content_id: int,
+    request: Request,
     current_user: User = Depends(require_permission("content_read")),
     db: Session = Depends(get_db)
 ):
     """Get specific content by ID"""
-    content = ContentService.get_content_by_id(db, content_id)
+    # Conditional GET: answer from the ETag alone when the client is up to date
+    if request.headers.get("If-None-Match"):
+        version = ContentCacheService.get_version(db, content_id)
+        if version and _can_view(version, current_user) and etag_matches_none_match(request, version.etag):
+            return not_modified(version.etag)
+    
+    content = ContentCacheService.get_content(db, content_id)
     
     if not content:
         raise HTTPException(
@@ -100,13 +145,14 @@ def get_content_by_id(
         )
     
     # Check if user can view this content
-    if not content.is_public and content.author_id != current_user.id and current_user.role.name not in ["admin", "moderator"]:
+    if not _can_view(content, current_user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this content"
         )
     
-    return content
+    # Serve the cached payload as-is, it was validated against ContentResponse when cached
+    return Response(content=content.body, media_type="application/json", headers={"ETag": content.etag})
 
 
 @router.put("/{content_id}", response_model=ContentResponse)
@@ -114,12 +160,20 @@ def update_content(
     content_id: int,
     content_data: ContentUpdate,
     request: Request,
+    response: Response,
     current_user: User = Depends(require_permission("content_update_own")),
     db: Session = Depends(get_db)
 ):
     """Update own content (All authenticated users) - Own content modification"""
     try:
-        content = ContentService.update_content(db, content_id, content_data, current_user.id)
+        content = ContentService.update_content(
+            db,
+            content_id,
+            content_data,
+            current_user.id,
+            expected_version=get_if_match_version(request, "content", content_id)
+        )
+        response.headers["ETag"] = make_version_etag("content", content.id, content.version)
         
         # Log audit
         AuditService.log_action(
@@ -258,3 +312,72 @@ def moderate_content(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to moderate content"
         )
+
+
+@router.post("/moderate/bulk", response_model=BulkModerationResponse)
+def bulk_moderate_content(
+    moderation_data: ContentBulkModeration,
+    request: Request,
+    current_user: User = Depends(require_permission("content_moderate")),
+    db: Session = Depends(get_db)
+):
+    """Moderate many content items at once (Moderator/Admin only) - Backlog clearing"""
+    content_ids = list(dict.fromkeys(moderation_data.ids))
+    ip_address = get_client_ip(request)
+    user_agent = get_user_agent(request)
+    
+    try:
+        moderated = ContentService.bulk_moderate_content(db, content_ids, moderation_data.status)
+        
+        # One audit row per moderated item, written in the same transaction
+        AuditService.log_actions(
+            db,
+            [
+                {
+                    "action": "content_moderated",
+                    "user_id": current_user.id,
+                    "resource": "content",
+                    "resource_id": str(content_id),
+                    "details": {
+                        "title": title,
+                        "moderation_status": moderation_data.status,
+                        "reason": moderation_data.reason,
+                        "bulk": True
+                    },
+                    "ip_address": ip_address,
+                    "user_agent": user_agent,
+                    "status": "success"
+                }
+                for content_id, title in moderated
+            ],
+            commit=False
+        )
+        db.commit()
+        
+    except Exception as e:
+        db.rollback()
+        # Log failed attempt
+        AuditService.log_action(
+            db=db,
+            action="content_bulk_moderation_failed",
+            user_id=current_user.id,
+            resource="content",
+            details={"count": len(content_ids), "error": str(e)},
+            ip_address=ip_address,
+            user_agent=user_agent,
+            status="failed"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to moderate content"
+        )
+    
+    moderated_ids = {content_id for content_id, _ in moderated}
+    return BulkModerationResponse(
+        status=moderation_data.status,
+        moderated=len(moderated_ids),
+        results=[
+            BulkModerationResult(id=content_id, outcome="moderated" if content_id in moderated_ids else "not_found")
+            for content_id in content_ids
+        ]
+    )
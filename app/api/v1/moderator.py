@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.db.base import get_db
 from app.schemas.user import UserResponse
+from app.schemas.content import ModerationClaimResponse
 from app.models.user import User
 from app.api.deps import require_permission, get_client_ip, get_user_agent
 from app.services.audit_service import AuditService
+from app.services.content_service import ContentService, MODERATION_TOPIC
+from app.services.change_feed_service import ChangeFeedService
+from app.core.invalidation import invalidation_bus
+from app.core.sse import event_stream_response
 
 router = APIRouter()
 
@@ -51,6 +57,8 @@ def suspend_user(
     
     # Suspend user
     user.is_active = False
+    ChangeFeedService.record(db, "user", user.id, "updated")
+    invalidation_bus.user_changed(db, user.id)
     db.commit()
     
     # Log audit
@@ -83,6 +91,8 @@ def activate_user(
     
     # Activate user
     user.is_active = True
+    ChangeFeedService.record(db, "user", user.id, "updated")
+    invalidation_bus.user_changed(db, user.id)
     db.commit()
     
     # Log audit
@@ -101,6 +111,36 @@ def activate_user(
     return {"message": "User activated successfully"}
 
 
+@router.get("/queue/claim", response_model=ModerationClaimResponse)
+def claim_moderation_queue(
+    n: int = Query(10, ge=1, le=100, description="Number of items to claim"),
+    current_user: User = Depends(require_permission("content_moderate")),
+    db: Session = Depends(get_db)
+):
+    """Claim pending content for review (Moderator/Admin only) - Leased work queue"""
+    items = ContentService.claim_pending_content(db, current_user.id, limit=n)
+    
+    return ModerationClaimResponse(
+        items=items,
+        lease_expires_at=items[0].claim_expires_at if items else None
+    )
+
+
+@router.get("/stream")
+async def stream_moderation_queue(
+    request: Request,
+    current_user: User = Depends(require_permission("content_moderate")),
+    db: Session = Depends(get_db)
+):
+    """Live moderation queue (Moderator/Admin only) - Server-Sent Events
+    
+    Emits content_created, content_moderated and content_deleted events.
+    """
+    # The stream can stay open for hours; do not pin a pooled connection
+    await run_in_threadpool(db.close)
+    return event_stream_response(request, MODERATION_TOPIC)
+
+
 @router.get("/reports")
 def get_reports(
     current_user: User = Depends(require_permission("report_manage")),
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
 from fastapi_pagination import Page, paginate
 
@@ -8,24 +8,36 @@ from app.services.role_service import RoleService
 from app.services.audit_service import AuditService
 from app.api.deps import require_permission, get_client_ip, get_user_agent
 from app.models.user import User
+from app.core.etag import make_etag, etag_matches_none_match, not_modified
 
 router = APIRouter()
 
 
 @router.get("/", response_model=Page[RoleResponse])
 def list_roles(
+    request: Request,
+    response: Response,
     active_only: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("role_manage"))
 ):
     """List all roles (admin only)"""
     roles = RoleService.get_roles(db, skip=0, limit=1000, active_only=active_only)
+    
+    # The page is a pure function of the role versions and the query string
+    etag = make_etag("roles", request.url.query, *[(role.id, role.updated_at) for role in roles])
+    if etag_matches_none_match(request, etag):
+        return not_modified(etag)
+    
+    response.headers["ETag"] = etag
     return paginate(roles)
 
 
 @router.get("/{role_id}", response_model=RoleResponse)
 def get_role(
     role_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_permission("role_manage"))
 ):
@@ -36,6 +48,12 @@ def get_role(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Role not found"
         )
+    
+    etag = make_etag("role", role.id, role.updated_at)
+    if etag_matches_none_match(request, etag):
+        return not_modified(etag)
+    
+    response.headers["ETag"] = etag
     return role
 
 
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1 import auth, users, roles, audit_logs, admin, moderator, content
+from app.api.v1 import auth, users, roles, audit_logs, admin, moderator, content, changes
 
 api_router = APIRouter()
 
@@ -10,3 +10,4 @@ api_router.include_router(audit_logs.router, prefix="/audit-logs", tags=["Audit
 api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
 api_router.include_router(moderator.router, prefix="/moderator", tags=["Moderator"])
 api_router.include_router(content.router, prefix="/content", tags=["Content"])
+api_router.include_router(changes.router, prefix="/changes", tags=["Changes"])
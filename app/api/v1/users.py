@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from fastapi_pagination import Page, paginate
 
 from app.db.base import get_db
-from app.schemas.user import UserResponse, UserUpdate, UserUpdateRole
+from app.schemas.user import UserResponse, UserUpdate, UserUpdateRole, UserBulkAction, UserBulkResult
 from app.services.user_service import UserService
 from app.services.audit_service import AuditService
 from app.api.deps import (
@@ -14,6 +16,7 @@ from app.api.deps import (
 )
 from app.services.permission_service import PermissionService
 from app.models.user import User
+from app.core.etag import get_if_match_version, etag_matches_none_match, not_modified
 
 router = APIRouter()
 
@@ -28,20 +31,62 @@ def list_users(
     return paginate(users)
 
 
+@router.post("/bulk", response_model=UserBulkResult)
+def bulk_update_users(
+    bulk_data: UserBulkAction,
+    request: Request,
+    stream: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_permission("user_manage"))
+):
+    """Activate, deactivate, delete or re-role many users at once (admin only).
+    
+    With ``stream=true`` the response is NDJSON with one progress record per
+    chunk followed by the summary.
+    """
+    progress = UserService.bulk_update_users(
+        db,
+        bulk_data,
+        actor_id=current_user.id,
+        ip_address=get_client_ip(request),
+        user_agent=get_user_agent(request)
+    )
+    
+    if stream:
+        return StreamingResponse(
+            (json.dumps(record) + "\n" for record in progress),
+            media_type="application/x-ndjson"
+        )
+    
+    result = None
+    for record in progress:
+        result = record
+    return UserBulkResult(**result)
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user(
     user_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get user by ID"""
     # Users can only view their own profile unless they have user_manage permission
-    if current_user.id != user_id and "user_manage" not in PermissionService.get_user_permissions(db, current_user.id):
+    if current_user.id != user_id and not PermissionService.has_permission(
+        db, current_user.role_id, "user_manage", current_user.permission_mask, current_user.registry_version
+    ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this user"
         )
     
+    if request.headers.get("If-None-Match"):
+        etag = UserService.get_user_etag(db, user_id)
+        if etag and etag_matches_none_match(request, etag):
+            return not_modified(etag)
+    
     user = UserService.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(
@@ -49,6 +94,7 @@ def get_user(
             detail="User not found"
         )
     
+    response.headers["ETag"] = UserService.user_etag(user)
     return user
 
 
@@ -57,18 +103,21 @@ def update_user(
     user_id: int,
     user_data: UserUpdate,
     request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update user information"""
-    # Users can only update their own profile unless they are admin
-    if current_user.id != user_id and current_user.role.name != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this user"
-        )
-    
-    user = UserService.update_user(db, user_id, user_data)
+    # Users can only update their own profile unless they are admin; the
+    # service enforces this and the If-Match version in one UPDATE
+    user = UserService.update_user(
+        db,
+        user_id,
+        user_data,
+        actor_id=current_user.id,
+        expected_version=get_if_match_version(request, "user", user_id)
+    )
+    response.headers["ETag"] = UserService.user_etag(user)
     
     # Log audit
     AuditService.log_action(
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import JSONResponse
+
+from app.core.keys import get_keyring
+from app.core.etag import make_etag, etag_matches_none_match, not_modified
+from app.core.config import settings
+
+router = APIRouter()
+
+
+@router.get("/.well-known/jwks.json")
+def get_jwks(request: Request) -> Response:
+    """Public keys for verifying access tokens (empty while tokens are HS256-signed)"""
+    keyring = get_keyring()
+    jwks = keyring.jwks()
+    etag = make_etag("jwks", *sorted(keyring.keys))
+    
+    # Verifiers refetch when they meet an unknown kid, so a long max-age
+    # does not delay key rotation
+    cache_control = f"public, max-age={settings.JWKS_CACHE_MAX_AGE_SECONDS}"
+    
+    if etag_matches_none_match(request, etag):
+        response = not_modified(etag)
+    else:
+        response = JSONResponse(jwks, media_type="application/jwk-set+json")
+        response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return response
@@ -0,0 +1,117 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# All caches register themselves here so their stats can be reported
+_registry: Dict[str, "LRUCache"] = {}
+
+
+class LRUCache:
+    """Thread-safe bounded LRU cache with per-entry TTL and hit/miss counters.
+
+    ``None`` is used to signal a miss, so callers that need to cache the
+    absence of a value should store their own sentinel.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        ttl: float,
+        sizeof: Optional[Callable[[Any], int]] = None
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._sizeof = sizeof or sys.getsizeof
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _registry[name] = self
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped on every invalidation.
+
+        Read it before loading a value from the source and pass it to
+        ``set`` so a load that raced with an invalidation is discarded.
+        """
+        return self._generation
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at, size = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self._memory_bytes -= size
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, generation: Optional[int] = None) -> bool:
+        """Store a value; returns False if the generation moved on meanwhile"""
+        size = self._sizeof(value)
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= old[2]
+            self._data[key] = (value, expires_at, size)
+            self._memory_bytes += size
+            while len(self._data) > self.maxsize:
+                _, evicted = self._data.popitem(last=False)
+                self._memory_bytes -= evicted[2]
+                self.evictions += 1
+            return True
+
+    def delete(self, key: Hashable):
+        """Drop a single key"""
+        with self._lock:
+            self._generation += 1
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= old[2]
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+            self._memory_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_bytes": self._memory_bytes
+        }
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every registered cache"""
+    return {name: cache.stats() for name, cache in _registry.items()}
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from datetime import datetime
 from typing import Optional
 
 
@@ -11,10 +12,29 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    JWT_KEYS_DIR: Optional[str] = None  # directory of <kid>.pem private keys; enables EdDSA/RS256 signing
+    JWT_ACTIVE_KID: Optional[str] = None  # defaults to the last key in sort order
+    # Once JWT_KEYS_DIR is set, tokens without a kid (HS256 with SECRET_KEY) are
+    # rejected, unless this is set to a time after the switch (UTC, e.g. the
+    # switch plus REFRESH_TOKEN_EXPIRE_DAYS) so tokens issued before it keep working
+    ACCEPT_LEGACY_HS256_UNTIL: Optional[datetime] = None
+    JWKS_CACHE_MAX_AGE_SECONDS: int = 3600
+    SERVICE_TOKEN: Optional[str] = None  # shared secret for internal service endpoints (revocations, introspection)
+    REVOCATION_SNAPSHOT_MAX_AGE_SECONDS: int = 30
+    SESSION_LAST_SEEN_FLUSH_SECONDS: float = 60.0  # how often coalesced session activity is written
     
     # OTP
     OTP_EXPIRE_MINUTES: int = 5
     OTP_LENGTH: int = 6
+    OTP_STORE_BACKEND: str = "sql"  # sql, memory (single process only) or redis
+    REDIS_URL: Optional[str] = None  # redis://[:password@]host:port/db, any Redis-protocol server
+    OTP_VERIFY_MAX_ATTEMPTS: int = 5  # per email and purpose within the window
+    OTP_VERIFY_MAX_ATTEMPTS_PER_IP: int = 30
+    OTP_VERIFY_WINDOW_SECONDS: int = 900
+    OTP_RESEND_COOLDOWN_SECONDS: int = 60  # resends within this reuse the pending code
+    OTP_SEND_MAX_PER_IP: int = 20  # OTP send and resend requests per IP within the send window
+    OTP_SEND_WINDOW_SECONDS: int = 3600
+    LIMITS_BACKEND: str = "memory"  # or redis (REDIS_URL) to share counters between workers
     
     # Email/SMTP Configuration
     SMTP_HOST: str = "smtp.gmail.com"
@@ -29,6 +49,80 @@ class Settings(BaseSettings):
     # Email Settings
     SEND_EMAIL_ENABLED: bool = True  # Set to True to enable email sending
     
+    # Caching
+    CONTENT_CACHE_SIZE: int = 10000
+    CONTENT_CACHE_TTL_SECONDS: int = 60
+    CONTENT_CACHE_NEGATIVE_TTL_SECONDS: int = 5
+    USER_CACHE_SIZE: int = 50000
+    USER_CACHE_TTL_SECONDS: int = 30  # upper bound on staleness if an invalidation is missed
+    PERMISSION_REGISTRY_TTL_SECONDS: int = 60
+    TOKEN_CACHE_SIZE: int = 100000  # verified token claims, keyed by token digest
+    
+    # Invalidation bus
+    INVALIDATION_BUS_BACKEND: str = "auto"  # auto, postgres (LISTEN/NOTIFY) or table (polled)
+    INVALIDATION_BUS_POLL_SECONDS: float = 1.0
+    INVALIDATION_BUS_RETRY_SECONDS: float = 5.0
+    
+    # Moderation queue
+    MODERATION_LEASE_SECONDS: int = 300
+    
+    # Bulk operations
+    BULK_CHUNK_SIZE: int = 1000
+    
+    # Change feed
+    CHANGE_FEED_POLL_SECONDS: float = 1.0
+    CHANGE_FEED_MAX_WAIT_SECONDS: int = 30
+    CHANGE_FEED_RETENTION_DAYS: int = 7  # older changes are reaped; clients must resync from scratch
+    
+    # Server-Sent Events
+    SSE_QUEUE_SIZE: int = 256  # per subscriber
+    SSE_SLOW_CONSUMER_POLICY: str = "disconnect"  # or "drop_oldest"
+    SSE_REPLAY_BUFFER_SIZE: int = 1000  # per topic, for Last-Event-ID resumption
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    SSE_RETRY_MS: int = 3000
+    
+    # Maintenance (expired row reaper)
+    MAINTENANCE_ENABLED: bool = True
+    MAINTENANCE_INTERVAL_SECONDS: float = 300.0
+    MAINTENANCE_JITTER_SECONDS: float = 60.0  # random extra delay so workers do not run in lockstep
+    MAINTENANCE_BATCH_SIZE: int = 1000  # rows per DELETE
+    MAINTENANCE_MAX_BATCHES: int = 100  # per task and run; the rest waits for the next run
+    MAINTENANCE_BATCH_PAUSE_SECONDS: float = 0.05  # between batches, to leave room for live traffic
+    
+    # Client addresses: X-Forwarded-For / X-Real-IP are only honored when the
+    # connecting peer is one of these (comma-separated IPs or CIDRs, "*" for any)
+    TRUSTED_PROXIES: str = "127.0.0.1,::1"
+    
+    # Rate limiting (token buckets, "<count>/<second|minute|hour|day>")
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # memory (per worker), sqlite (per host) or redis (REDIS_URL)
+    RATE_LIMIT_SQLITE_PATH: Optional[str] = None  # defaults to a file in the temp dir; /dev/shm keeps it in memory
+    RATE_LIMIT_AUTH: str = "10/minute"  # per IP on login, register and OTP endpoints
+    RATE_LIMIT_WRITE: str = "120/minute"  # per user, or per IP when anonymous
+    RATE_LIMIT_READ: str = "600/minute"
+    
+    # Login throttling (per process)
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_FREE_ATTEMPTS: int = 3  # failed logins per email before backoff starts
+    LOGIN_THROTTLE_FREE_ATTEMPTS_PER_IP: int = 20
+    LOGIN_THROTTLE_BASE_DELAY_SECONDS: float = 1.0  # doubles with every further failure
+    LOGIN_THROTTLE_MAX_DELAY_SECONDS: float = 900.0
+    LOGIN_THROTTLE_RESET_SECONDS: float = 900.0  # failures are forgotten this long after the last one
+    LOGIN_THROTTLE_SUMMARY_SECONDS: float = 60.0  # how often throttled attempts are written as audit summaries
+    
+    # Logging
+    LOG_QUEUE_SIZE: int = 10000  # records waiting for the log writer; more are dropped and counted
+    LOG_FLUSH_INTERVAL_MS: int = 100  # how long the log writer lets records collect before writing them
+    
+    # Access log
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0  # share of successful requests logged; errors and slow requests always are
+    ACCESS_LOG_SLOW_MS: float = 1000.0
+    
+    # Metrics (set PROMETHEUS_MULTIPROC_DIR to aggregate across workers)
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: Optional[str] = None  # bearer token scrapers must send to /metrics when set
+    METRICS_SAMPLE_SECONDS: float = 15.0  # how often each worker publishes pool, queue and cache figures
+    
     # Application
     APP_NAME: str = "FastAPI Auth System"
     DEBUG: bool = False
@@ -0,0 +1,162 @@
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from app.core.config import settings
+
+# Stale keys are swept at most this often, on write
+SWEEP_INTERVAL_SECONDS = 60
+
+# INCRBY the current bucket (expiring it after two windows) and read the previous one
+_HIT_SCRIPT = """
+local count = redis.call('INCRBY', KEYS[1], ARGV[1])
+if count == tonumber(ARGV[1]) then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return {count, tonumber(redis.call('GET', KEYS[2]) or '0')}
+"""
+
+
+class SlidingWindowCounter:
+    """Approximate sliding-window event counts per key.
+
+    Each key keeps two fixed buckets, the current window and the previous
+    one; the estimate weights the previous bucket by how much of it still
+    overlaps the sliding window. That is three numbers per key instead of
+    a timestamp per event. With a RESP client the buckets live on the
+    shared server, so every worker sees the same counts.
+    """
+
+    def __init__(self, name: str, window_seconds: float, client=None):
+        self.name = name
+        self.window = window_seconds
+        self.client = client
+        self._buckets: Dict[str, Tuple[int, int, int]] = {}  # key -> (window index, previous, current)
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def _position(self) -> Tuple[int, float]:
+        now = time.time()
+        index = int(now // self.window)
+        return index, (now - index * self.window) / self.window
+
+    def hit(self, key: str, amount: int = 1) -> float:
+        """Record ``amount`` events and return the new estimate"""
+        index, elapsed = self._position()
+        if self.client is not None:
+            current, previous = self.client.execute(
+                "EVAL", _HIT_SCRIPT, 2,
+                self._redis_key(key, index), self._redis_key(key, index - 1),
+                amount, int(self.window * 2000)
+            )
+            return previous * (1 - elapsed) + current
+
+        with self._lock:
+            previous, current = self._shift(key, index)
+            current += amount
+            self._buckets[key] = (index, previous, current)
+            self._maybe_sweep(index)
+        return previous * (1 - elapsed) + current
+
+    def count(self, key: str) -> float:
+        """Current estimate without recording anything"""
+        index, elapsed = self._position()
+        if self.client is not None:
+            current, previous = self.client.execute(
+                "MGET", self._redis_key(key, index), self._redis_key(key, index - 1)
+            )
+            return int(previous or 0) * (1 - elapsed) + int(current or 0)
+
+        with self._lock:
+            previous, current = self._shift(key, index)
+        return previous * (1 - elapsed) + current
+
+    def reset(self, key: str):
+        index, _ = self._position()
+        if self.client is not None:
+            self.client.execute("DEL", self._redis_key(key, index), self._redis_key(key, index - 1))
+            return
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def _shift(self, key: str, index: int) -> Tuple[int, int]:
+        # Roll the stored buckets forward to the current window
+        stored = self._buckets.get(key)
+        if stored is None:
+            return 0, 0
+        stored_index, previous, current = stored
+        if stored_index == index:
+            return previous, current
+        if stored_index == index - 1:
+            return current, 0
+        return 0, 0
+
+    def _maybe_sweep(self, index: int):
+        now = time.monotonic()
+        if now - self._last_sweep < SWEEP_INTERVAL_SECONDS:
+            return
+        stale = [key for key, (stored_index, _, _) in self._buckets.items() if stored_index < index - 1]
+        for key in stale:
+            del self._buckets[key]
+        self._last_sweep = now
+
+    def _redis_key(self, key: str, index: int) -> str:
+        return f"sw:{self.name}:{key}:{index}"
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class Cooldown:
+    """At most one event per key every ``seconds``"""
+
+    def __init__(self, name: str, seconds: float, client=None):
+        self.name = name
+        self.seconds = seconds
+        self.client = client
+        self._until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def acquire(self, key: str) -> bool:
+        """Start the cooldown; False if it is already running"""
+        if self.client is not None:
+            return self.client.execute(
+                "SET", self._redis_key(key), 1, "NX", "PX", int(self.seconds * 1000)
+            ) is not None
+
+        now = time.monotonic()
+        with self._lock:
+            if self._until.get(key, 0) > now:
+                return False
+            self._until[key] = now + self.seconds
+            if now - self._last_sweep >= SWEEP_INTERVAL_SECONDS:
+                expired: List[str] = [k for k, until in self._until.items() if until <= now]
+                for k in expired:
+                    del self._until[k]
+                self._last_sweep = now
+        return True
+
+    def reset(self, key: str):
+        if self.client is not None:
+            self.client.execute("DEL", self._redis_key(key))
+            return
+        with self._lock:
+            self._until.pop(key, None)
+
+    def _redis_key(self, key: str) -> str:
+        return f"cd:{self.name}:{key}"
+
+    def __len__(self) -> int:
+        return len(self._until)
+
+
+def shared_client():
+    """RESP client for LIMITS_BACKEND=redis, None to keep counters in memory"""
+    if settings.LIMITS_BACKEND == "memory":
+        return None
+    if settings.LIMITS_BACKEND == "redis":
+        from app.core.resp import get_client
+        return get_client(settings.REDIS_URL)
+    raise ValueError(f"Unknown limits backend {settings.LIMITS_BACKEND}")
+
@@ -0,0 +1,74 @@
+import hashlib
+import re
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Request, Response, status
+
+
+def _part(value) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from identifying parts (kind, id, updated_at, ...)"""
+    digest = hashlib.sha1("|".join(_part(p) for p in parts).encode()).hexdigest()
+    return f'"{digest[:24]}"'
+
+
+def make_version_etag(kind: str, resource_id: int, version: int, *extra) -> str:
+    """Build a strong ETag for a versioned row.
+
+    The version stays readable so an If-Match header can be turned back
+    into the expected version of an optimistic update. ``extra`` covers
+    nested data (e.g. the user's role) that is not part of the row version.
+    """
+    etag = f"{kind}-{resource_id}-v{version}"
+    if extra:
+        etag += "-" + hashlib.sha1("|".join(_part(p) for p in extra).encode()).hexdigest()[:8]
+    return f'"{etag}"'
+
+
+def get_if_match_version(request: Request, kind: str, resource_id: int) -> Optional[int]:
+    """Expected row version from If-Match, or None if the header is absent.
+
+    Raises 412 for tags that cannot refer to the current resource.
+    """
+    header = request.headers.get("If-Match")
+    if not header or header.strip() == "*":
+        return None
+
+    pattern = re.compile(rf'^"{re.escape(kind)}-{resource_id}-v(\d+)(?:-[0-9a-f]+)?"$')
+    for tag in _parse(header):
+        match = pattern.match(tag)
+        if match:
+            return int(match.group(1))
+
+    raise HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Resource has been modified"
+    )
+
+
+def _parse(header: str) -> list:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def etag_matches_none_match(request: Request, etag: str) -> bool:
+    """True if If-None-Match matches (weak comparison, per RFC 9110)"""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+
+    tags = _parse(header)
+    if "*" in tags:
+        return True
+
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return any((tag[2:] if tag.startswith("W/") else tag) == bare for tag in tags)
+
+
+def not_modified(etag: str) -> Response:
+    """304 response carrying the current ETag"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -2,6 +2,7 @@ from fastapi import Request, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm.exc import StaleDataError
 from app.core.logger import logger
 
 
@@ -42,3 +43,15 @@ async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
             "error": str(exc)
         }
     )
+
+
+async def stale_data_exception_handler(request: Request, exc: StaleDataError):
+    """Handler for optimistic concurrency conflicts (version_id_col mismatch)"""
+    logger.warning(f"Concurrent modification detected: {str(exc)}")
+    
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={
+            "detail": "Resource was modified by another request"
+        }
+    )
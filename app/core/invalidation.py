@@ -0,0 +1,296 @@
+import json
+import os
+import select
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import event, func, insert, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.maintenance import delete_in_batches, maintenance
+
+# Message kinds
+USER_CHANGED = "user_changed"
+ROLE_CHANGED = "role_changed"
+CONTENT_CHANGED = "content_changed"
+
+MESSAGE_KINDS = (USER_CHANGED, ROLE_CHANGED, CONTENT_CHANGED)
+
+# NOTIFY channel used by the PostgreSQL backend
+CHANNEL = "cache_invalidation"
+
+# NOTIFY payloads must be shorter than 8000 bytes
+MAX_PAYLOAD_BYTES = 7999
+
+# Identifies this process so it can ignore its own notifications
+ORIGIN = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+# Handlers receive the changed id, or None when everything of that kind
+# must be dropped (e.g. after the listener lost messages)
+Handler = Callable[[Optional[int]], None]
+
+
+class PostgresBackend:
+    """LISTEN/NOTIFY on a dedicated autocommit connection.
+
+    NOTIFY is transactional, so a message is only delivered if the
+    publishing transaction commits. Ids are packed into as few payloads
+    as fit under the NOTIFY size limit, all sent by one statement.
+    """
+
+    name = "postgres"
+
+    @staticmethod
+    def pack(kind: str, keys: List[int]) -> List[str]:
+        """JSON payloads carrying ``keys``, each under MAX_PAYLOAD_BYTES"""
+        sent_at = time.time()
+        # Everything but the ids; an empty list serializes as "[]"
+        overhead = len(json.dumps({"k": kind, "ids": [], "t": sent_at, "o": ORIGIN}))
+        payloads = []
+        chunk: List[int] = []
+        size = overhead
+        for key in keys:
+            # The id and its ", " separator
+            cost = len(str(key)) + 2
+            if chunk and size + cost > MAX_PAYLOAD_BYTES:
+                payloads.append(json.dumps({"k": kind, "ids": chunk, "t": sent_at, "o": ORIGIN}))
+                chunk, size = [], overhead
+            chunk.append(key)
+            size += cost
+        if chunk:
+            payloads.append(json.dumps({"k": kind, "ids": chunk, "t": sent_at, "o": ORIGIN}))
+        return payloads
+
+    def publish(self, db: Session, kind: str, keys: List[int]):
+        db.execute(
+            text(f"SELECT pg_notify('{CHANNEL}', payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"payloads": self.pack(kind, keys)}
+        )
+
+    def listen(self, bus: "InvalidationBus", stop: threading.Event):
+        from app.db.base import engine
+
+        while not stop.is_set():
+            conn = None
+            try:
+                conn = engine.raw_connection()
+                dbapi_conn = conn.dbapi_connection
+                dbapi_conn.autocommit = True
+                dbapi_conn.cursor().execute(f"LISTEN {CHANNEL}")
+                # Anything sent while we were not listening is lost
+                bus.reset()
+                logger.info(f"Invalidation bus listening on channel {CHANNEL}")
+
+                while not stop.is_set():
+                    if select.select([dbapi_conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    dbapi_conn.poll()
+                    while dbapi_conn.notifies:
+                        notify = dbapi_conn.notifies.pop(0)
+                        message = json.loads(notify.payload)
+                        if message.get("o") == ORIGIN:
+                            continue
+                        # Single "id" messages come from workers not yet upgraded
+                        for key in message.get("ids") or [message["id"]]:
+                            bus.deliver(message["k"], key, message["t"])
+            except Exception as e:
+                bus.stats["reconnects"] += 1
+                logger.error(f"Invalidation bus listener error: {str(e)}")
+                stop.wait(settings.INVALIDATION_BUS_RETRY_SECONDS)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.invalidate()
+                    except Exception:
+                        pass
+
+
+class TableBackend:
+    """Polled cache_invalidations table, for SQLite and single-host setups"""
+
+    name = "table"
+
+    def publish(self, db: Session, kind: str, keys: List[int]):
+        from app.models.cache_invalidation import CacheInvalidation
+
+        db.execute(
+            insert(CacheInvalidation),
+            [{"namespace": kind, "key": str(key)} for key in keys]
+        )
+
+    def listen(self, bus: "InvalidationBus", stop: threading.Event):
+        from app.db.base import SessionLocal
+        from app.models.cache_invalidation import CacheInvalidation
+
+        last_seen_id = None
+        while not stop.is_set():
+            db = SessionLocal()
+            try:
+                if last_seen_id is None:
+                    last_seen_id = db.query(func.max(CacheInvalidation.id)).scalar() or 0
+                    bus.reset()
+
+                rows = db.query(CacheInvalidation).filter(
+                    CacheInvalidation.id > last_seen_id
+                ).order_by(CacheInvalidation.id).all()
+
+                for row in rows:
+                    # SQLite timestamps have second resolution, so lag is approximate there
+                    created_at = row.created_at
+                    if created_at.tzinfo is None:
+                        created_at = created_at.replace(tzinfo=timezone.utc)
+                    bus.deliver(row.namespace, int(row.key), created_at.timestamp())
+                    last_seen_id = row.id
+            except Exception as e:
+                logger.error(f"Invalidation bus poll error: {str(e)}")
+            finally:
+                db.close()
+            stop.wait(settings.INVALIDATION_BUS_POLL_SECONDS)
+
+
+class InvalidationBus:
+    """Fan-out of cache invalidations to every worker.
+
+    Services publish typed messages inside their own transaction. The
+    publishing process applies them as soon as that transaction commits;
+    other workers receive them through the backend's listener thread.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = {kind: [] for kind in MESSAGE_KINDS}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.stats = {
+            "published": 0,
+            "received": 0,
+            "handler_errors": 0,
+            "reconnects": 0,
+            "lag_count": 0,
+            "lag_total_ms": 0.0,
+            "lag_max_ms": 0.0,
+            "lag_last_ms": 0.0
+        }
+
+    def subscribe(self, kind: str, handler: Handler):
+        """Call ``handler(id)`` for every message of ``kind``"""
+        self._handlers[kind].append(handler)
+
+    def publish(self, db: Session, kind: str, keys: Iterable[int]):
+        """Publish as part of the caller's transaction"""
+        keys = list(keys)
+        if not keys:
+            return
+        get_backend(db).publish(db, kind, keys)
+        db.info.setdefault("invalidations", []).append((kind, keys))
+        self.stats["published"] += len(keys)
+
+    def user_changed(self, db: Session, user_id: int):
+        self.publish(db, USER_CHANGED, [user_id])
+
+    def role_changed(self, db: Session, role_id: int):
+        self.publish(db, ROLE_CHANGED, [role_id])
+
+    def content_changed(self, db: Session, content_id: int):
+        self.publish(db, CONTENT_CHANGED, [content_id])
+
+    def _dispatch(self, kind: str, key: Optional[int]):
+        for handler in self._handlers.get(kind, ()):
+            try:
+                handler(key)
+            except Exception as e:
+                self.stats["handler_errors"] += 1
+                logger.error(f"Invalidation handler for {kind} failed: {str(e)}")
+
+    def deliver(self, kind: str, key: int, sent_at: float):
+        """Apply a message received from another worker"""
+        lag_ms = max((time.time() - sent_at) * 1000, 0.0)
+        with self._lock:
+            self.stats["received"] += 1
+            self.stats["lag_count"] += 1
+            self.stats["lag_total_ms"] += lag_ms
+            self.stats["lag_last_ms"] = lag_ms
+            self.stats["lag_max_ms"] = max(self.stats["lag_max_ms"], lag_ms)
+        self._dispatch(kind, key)
+
+    def reset(self):
+        """Drop everything, for when messages may have been missed"""
+        for kind in MESSAGE_KINDS:
+            self._dispatch(kind, None)
+
+    def start(self, backend=None):
+        """Start the listener thread (once per process)"""
+        if self._thread is not None:
+            return
+        from app.db.base import engine
+
+        backend = backend or _select_backend(engine.dialect.name)
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=backend.listen,
+            args=(self, self._stop),
+            name="invalidation-bus",
+            daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Invalidation bus started ({backend.name} backend)")
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        lag_count = stats.pop("lag_count")
+        stats["lag_mean_ms"] = round(stats.pop("lag_total_ms") / lag_count, 2) if lag_count else 0.0
+        stats["lag_max_ms"] = round(stats["lag_max_ms"], 2)
+        stats["lag_last_ms"] = round(stats["lag_last_ms"], 2)
+        stats["listening"] = self._thread is not None
+        return stats
+
+
+_backends = {"postgres": PostgresBackend(), "table": TableBackend()}
+
+
+def _select_backend(dialect: str):
+    name = settings.INVALIDATION_BUS_BACKEND
+    if name == "auto":
+        name = "postgres" if dialect == "postgresql" else "table"
+    return _backends[name]
+
+
+def get_backend(db: Session):
+    return _select_backend(db.get_bind().dialect.name)
+
+
+def cleanup_invalidations(db: Session, older_than_seconds: int = 3600) -> int:
+    """Delete polled invalidation rows every worker has long since applied"""
+    from datetime import timedelta
+    from app.models.cache_invalidation import CacheInvalidation
+
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=older_than_seconds)
+    return delete_in_batches(db, CacheInvalidation, CacheInvalidation.created_at < cutoff)
+
+
+invalidation_bus = InvalidationBus()
+maintenance.register("cache_invalidations", cleanup_invalidations)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session):
+    for kind, keys in session.info.pop("invalidations", ()):
+        for key in keys:
+            invalidation_bus._dispatch(kind, key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("invalidations", None)
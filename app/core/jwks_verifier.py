@@ -0,0 +1,163 @@
+import json
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+from jwt import InvalidTokenError
+
+# Standalone on purpose: other services import this module (or copy it)
+# to verify access tokens locally. It only needs PyJWT and cryptography.
+
+# Never refetch the JWKS for an unknown kid more often than this
+UNKNOWN_KID_REFETCH_SECONDS = 30
+
+
+class TokenVerifier:
+    """Verify access tokens without calling the auth service per request.
+
+    Public keys come from ``/.well-known/jwks.json`` and are cached for the
+    max-age the endpoint sends; a token with an unknown kid triggers one
+    rate-limited refetch, which picks up rotated keys. When a
+    ``revocation_token`` is given, tokens are also checked against the
+    revocation snapshot (revoked jtis, token epochs, disabled users and
+    user roles),
+    refreshed every ``revocation_refresh_seconds``.
+
+    Usage::
+
+        verifier = TokenVerifier("https://auth.internal", revocation_token="...")
+        claims = verifier.verify(token)  # raises jwt.InvalidTokenError
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        revocation_token: Optional[str] = None,
+        revocation_refresh_seconds: float = 30,
+        jwks_path: str = "/.well-known/jwks.json",
+        revocations_path: str = "/api/v1/auth/revocations",
+        timeout: float = 5
+    ):
+        self.jwks_url = base_url.rstrip("/") + jwks_path
+        self.revocations_url = base_url.rstrip("/") + revocations_path
+        self.revocation_token = revocation_token
+        self.revocation_refresh_seconds = revocation_refresh_seconds
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._keys: Dict[str, Tuple[Any, str]] = {}  # kid -> (public key, alg)
+        self._keys_expire_at = 0.0
+        self._last_unknown_kid_fetch = 0.0
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_etag: Optional[str] = None
+        self._snapshot_fetched_at = 0.0
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Return the claims of a valid, unrevoked access token"""
+        kid = jwt.get_unverified_header(token).get("kid")
+        if not kid:
+            raise InvalidTokenError("Token is not signed with a published key")
+
+        key, algorithm = self._get_key(kid)
+        claims = jwt.decode(token, key, algorithms=[algorithm])
+
+        if claims.get("type") != "access":
+            raise InvalidTokenError("Not an access token")
+
+        if self.revocation_token:
+            self._check_revocation(claims)
+        return claims
+
+    def _get_key(self, kid: str) -> Tuple[Any, str]:
+        with self._lock:
+            now = time.monotonic()
+            stale = now >= self._keys_expire_at
+            unknown = kid not in self._keys and now - self._last_unknown_kid_fetch >= UNKNOWN_KID_REFETCH_SECONDS
+            if stale or unknown:
+                if not stale:
+                    self._last_unknown_kid_fetch = now
+                try:
+                    self._fetch_jwks()
+                except Exception:
+                    # Keep verifying with the keys we have
+                    if not self._keys:
+                        raise InvalidTokenError("JWKS unavailable")
+                    self._keys_expire_at = now + UNKNOWN_KID_REFETCH_SECONDS
+
+            key = self._keys.get(kid)
+        if key is None:
+            raise InvalidTokenError(f"Unknown signing key {kid}")
+        return key
+
+    def _fetch_jwks(self):
+        with urllib.request.urlopen(self.jwks_url, timeout=self.timeout) as response:
+            jwks = json.loads(response.read())
+            max_age = _max_age(response.headers.get("Cache-Control"))
+
+        self._keys = {
+            jwk["kid"]: (jwt.PyJWK(jwk).key, jwk["alg"])
+            for jwk in jwks.get("keys", [])
+        }
+        self._keys_expire_at = time.monotonic() + max_age
+
+    def _check_revocation(self, claims: Dict[str, Any]):
+        snapshot = self._get_snapshot()
+        user_id = str(claims.get("sub"))
+
+        if claims.get("jti") in snapshot["revoked_jtis"]:
+            raise InvalidTokenError("Token has been revoked")
+        if claims.get("epoch", 0) != snapshot["token_epochs"].get(user_id, 0):
+            raise InvalidTokenError("Token has been revoked")
+        if user_id in snapshot["disabled_users"]:
+            raise InvalidTokenError("User account is inactive")
+        # The permission claims were computed for the role at issue time;
+        # after a role change the client has to refresh to get current ones
+        if claims.get("rid") != snapshot["role_ids"].get(user_id, snapshot["default_role_id"]):
+            raise InvalidTokenError("User role has changed")
+
+    def _get_snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            if time.monotonic() - self._snapshot_fetched_at < self.revocation_refresh_seconds:
+                return self._snapshot
+
+            try:
+                self._fetch_snapshot()
+            except Exception:
+                # Keep using the last snapshot until the next refresh; without one, fail closed
+                if self._snapshot is None:
+                    raise InvalidTokenError("Revocation snapshot unavailable")
+                self._snapshot_fetched_at = time.monotonic()
+            return self._snapshot
+
+    def _fetch_snapshot(self):
+        request = urllib.request.Request(
+            self.revocations_url,
+            headers={"Authorization": f"Bearer {self.revocation_token}"}
+        )
+        if self._snapshot_etag:
+            request.add_header("If-None-Match", self._snapshot_etag)
+
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data = json.loads(response.read())
+                self._snapshot_etag = response.headers.get("ETag")
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                raise
+        else:
+            self._snapshot = {
+                "revoked_jtis": set(data["revoked_jtis"]),
+                "token_epochs": data["token_epochs"],
+                "disabled_users": {str(user_id) for user_id in data["disabled_users"]},
+                "default_role_id": data["default_role_id"],
+                "role_ids": data["role_ids"]
+            }
+        self._snapshot_fetched_at = time.monotonic()
+
+
+def _max_age(cache_control: Optional[str], default: int = 300) -> int:
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return int(match.group(1)) if match else default
@@ -0,0 +1,126 @@
+import argparse
+import json
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+from app.core.config import settings
+from app.core.logger import logger
+
+
+class SigningKey:
+    """A private key with its kid, JWS algorithm and public JWK"""
+
+    __slots__ = ("kid", "algorithm", "private_key", "public_key", "public_jwk")
+
+    def __init__(self, kid: str, private_key):
+        self.kid = kid
+        self.private_key = private_key
+        self.public_key = private_key.public_key()
+
+        if isinstance(private_key, ed25519.Ed25519PrivateKey):
+            self.algorithm = "EdDSA"
+            jwk = json.loads(OKPAlgorithm.to_jwk(self.public_key))
+        elif isinstance(private_key, rsa.RSAPrivateKey):
+            self.algorithm = "RS256"
+            jwk = json.loads(RSAAlgorithm.to_jwk(self.public_key))
+        else:
+            raise ValueError(f"Unsupported key type for kid {kid}")
+
+        jwk.update({"kid": kid, "alg": self.algorithm, "use": "sig"})
+        self.public_jwk = jwk
+
+
+class KeyRing:
+    """Signing keys loaded from JWT_KEYS_DIR (empty when HS256 is used).
+
+    Each ``<kid>.pem`` file is a private key. The key named by
+    JWT_ACTIVE_KID (or the last one in sort order) signs new tokens; every
+    key is published in the JWKS and accepted for verification. To rotate,
+    add a key (``python -m app.core.keys generate``), make it active, and
+    delete the old file once the tokens it signed have expired.
+    """
+
+    def __init__(self, keys: Dict[str, SigningKey], active_kid: Optional[str]):
+        self.keys = keys
+        self.active_kid = active_kid
+
+    @property
+    def active(self) -> Optional[SigningKey]:
+        return self.keys.get(self.active_kid) if self.active_kid else None
+
+    def jwks(self) -> Dict[str, List[dict]]:
+        return {"keys": [key.public_jwk for key in self.keys.values()]}
+
+    @classmethod
+    def load(cls, keys_dir: Optional[str], active_kid: Optional[str] = None) -> "KeyRing":
+        if not keys_dir:
+            return cls({}, None)
+
+        keys = {}
+        for path in sorted(Path(keys_dir).glob("*.pem")):
+            private_key = serialization.load_pem_private_key(path.read_bytes(), password=None)
+            keys[path.stem] = SigningKey(path.stem, private_key)
+
+        if not keys:
+            raise RuntimeError(f"No signing keys found in {keys_dir}")
+
+        active_kid = active_kid or list(keys)[-1]
+        if active_kid not in keys:
+            raise RuntimeError(f"Active signing key {active_kid} not found in {keys_dir}")
+
+        logger.info(f"Loaded {len(keys)} JWT signing keys, active kid {active_kid}")
+        return cls(keys, active_kid)
+
+
+_keyring: Optional[KeyRing] = None
+_keyring_lock = threading.Lock()
+
+
+def get_keyring() -> KeyRing:
+    """Process-wide key ring, loaded on first use"""
+    global _keyring
+    if _keyring is None:
+        with _keyring_lock:
+            if _keyring is None:
+                _keyring = KeyRing.load(settings.JWT_KEYS_DIR, settings.JWT_ACTIVE_KID)
+    return _keyring
+
+
+def generate_key(keys_dir: str, key_type: str = "ed25519") -> Path:
+    """Write a new private key named by creation time"""
+    if key_type == "ed25519":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    elif key_type == "rsa":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        raise ValueError(f"Unknown key type {key_type}")
+
+    kid = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    path = Path(keys_dir) / f"{kid}.pem"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    ))
+    path.chmod(0o600)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage JWT signing keys")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    generate = subparsers.add_parser("generate", help="Create a new signing key")
+    generate.add_argument("--type", choices=["ed25519", "rsa"], default="ed25519")
+    generate.add_argument("--dir", default=settings.JWT_KEYS_DIR)
+    args = parser.parse_args()
+
+    if not args.dir:
+        parser.error("--dir is required when JWT_KEYS_DIR is not set")
+    print(generate_key(args.dir, args.type))
@@ -0,0 +1,195 @@
+import os
+import sys
+import threading
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class RotatingFile:
+    """Append-only log file rotated by size.
+
+    Rotation itself is a close and a rename; zipping the rotated file and
+    removing files older than the retention run in a short-lived helper
+    thread, so a 500 MB rotation does not stall the writer.
+    """
+
+    def __init__(self, path: str, max_bytes: int, retention_days: float, compress: bool = True):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.retention_seconds = retention_days * 86400
+        self.compress = compress
+        self.rotations = 0
+        self._file = None
+        self._size = 0
+
+    def write(self, text: str):
+        data = text.encode("utf-8", "replace")
+        if self._file is None:
+            self._open()
+        elif self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._size += len(data)
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        self.close()
+        stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")
+        rotated = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        os.replace(self.path, rotated)
+        self.rotations += 1
+        self._open()
+        threading.Thread(
+            target=self._archive, args=(rotated,), name=f"log-archive-{self.path.stem}", daemon=True
+        ).start()
+
+    def _archive(self, rotated: Path):
+        try:
+            # Compressing hundreds of MB takes CPU time the request threads
+            # need more; on Linux the niceness applies to this thread only
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+        try:
+            if self.compress:
+                with zipfile.ZipFile(rotated.with_name(rotated.name + ".zip"), "w", zipfile.ZIP_DEFLATED) as archive:
+                    archive.write(rotated, rotated.name)
+                rotated.unlink()
+            cutoff = time.time() - self.retention_seconds
+            for old in self.path.parent.glob(f"{self.path.stem}.*"):
+                if old != self.path and old.stat().st_mtime < cutoff:
+                    old.unlink()
+        except OSError as e:
+            sys.stderr.write(f"Log archiving failed for {rotated}: {e}\n")
+
+
+class _Stream:
+    """Console target; flushed by the writer like the files"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text: str):
+        self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        # At interpreter exit the stream may already be closed (e.g. captured output)
+        if not getattr(self.stream, "closed", False):
+            self.flush()
+
+
+class BackgroundLogWriter:
+    """Moves log I/O off the calling threads.
+
+    Loguru sinks created with ``sink()`` only append the formatted record
+    to a bounded buffer; one writer thread takes the whole buffer at once
+    and writes it into the files and the console, one chunk per target.
+    When the buffer is full the record is dropped and counted rather than
+    blocking the request that logged it.
+
+    After the first record of a quiet period the writer waits
+    ``flush_interval`` seconds before taking the buffer, so it wakes up
+    (and takes the GIL) at most once per interval instead of once per record.
+    """
+
+    def __init__(self, max_queue: int = 10000, flush_interval: float = 0.1):
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval
+        self._pending: List[Tuple[object, str]] = []
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._targets: Set = set()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {"written": 0, "dropped": 0, "write_errors": 0}
+
+    def sink(self, target):
+        """Loguru sink enqueueing to ``target`` (a RotatingFile or a text stream)"""
+        if not isinstance(target, RotatingFile):
+            target = _Stream(target)
+        self._targets.add(target)
+        self.start()
+
+        def enqueue(message):
+            text = str(message)
+            with self._pending_lock:
+                if len(self._pending) >= self.max_queue:
+                    self.stats["dropped"] += 1
+                    return
+                self._pending.append((target, text))
+                first = len(self._pending) == 1
+            if first:
+                self._wakeup.set()
+
+        return enqueue
+
+    def _run(self):
+        while not self._stopping.is_set() or self._pending:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            # Let records pile up; cut short by stop()
+            self._stopping.wait(self.flush_interval)
+
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            self._write(pending)
+
+    def _write(self, pending: List[Tuple[object, str]]):
+        batch: Dict = {}
+        for target, text in pending:
+            batch.setdefault(target, []).append(text)
+
+        for target, texts in batch.items():
+            try:
+                target.write("".join(texts))
+                target.flush()
+                self.stats["written"] += len(texts)
+            except Exception as e:
+                self.stats["write_errors"] += 1
+                sys.stderr.write(f"Log write failed: {e}\n")
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Write what is queued and close the files"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        thread.join(timeout=timeout)
+        for target in self._targets:
+            target.close()
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        stats["queued"] = len(self._pending)
+        stats["capacity"] = self.max_queue
+        stats["rotations"] = sum(target.rotations for target in self._targets if isinstance(target, RotatingFile))
+        return stats
@@ -1,22 +1,56 @@
+import atexit
 import sys
 import os
 from loguru import logger
 from pathlib import Path
 
+from app.core.config import settings
+from app.core.log_sinks import BackgroundLogWriter, RotatingFile
+
 # Check if we're in Vercel (read-only filesystem)
 IS_VERCEL = os.environ.get("VERCEL") == "1"
 
 # Remove default handler
 logger.remove()
 
-# Add console handler (always works)
+# Sinks only enqueue; file and console I/O, rotation and compression happen off the request path
+log_writer = BackgroundLogWriter(
+    max_queue=settings.LOG_QUEUE_SIZE,
+    flush_interval=settings.LOG_FLUSH_INTERVAL_MS / 1000
+)
+atexit.register(log_writer.stop)
+
+LOG_FILE_MAX_BYTES = 500 * 1000 * 1000
+LOG_RETENTION_DAYS = 10
+
+
+def _is_access(record) -> bool:
+    return "access" in record["extra"]
+
+
+def _is_app(record) -> bool:
+    return "access" not in record["extra"]
+
+
+# On Vercel the console stays synchronous, the function may be frozen
+# before a writer thread gets to run
+console = sys.stdout if IS_VERCEL else log_writer.sink(sys.stdout)
+
+# Add console handler (always works); access records go to access.log
 logger.add(
-    sys.stdout,
+    console,
     colorize=True,
     format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-    level="INFO"
+    level="INFO",
+    filter=_is_app
 )
 
+
+def _add_console_access_sink():
+    # Without access.log, access records go to stdout as plain JSON lines
+    logger.add(console, format="{message}", level="INFO", filter=_is_access)
+
+
 # Only add file handlers if not in Vercel
 if not IS_VERCEL:
     try:
@@ -26,27 +60,36 @@ if not IS_VERCEL:
         
         # Add file handler for all logs
         logger.add(
-            "logs/app.log",
-            rotation="500 MB",
-            retention="10 days",
-            compression="zip",
+            log_writer.sink(RotatingFile("logs/app.log", LOG_FILE_MAX_BYTES, LOG_RETENTION_DAYS)),
             format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-            level="DEBUG"
+            level="DEBUG",
+            filter=_is_app
         )
         
         # Add file handler for errors only
         logger.add(
-            "logs/error.log",
-            rotation="500 MB",
-            retention="10 days",
-            compression="zip",
+            log_writer.sink(RotatingFile("logs/error.log", LOG_FILE_MAX_BYTES, LOG_RETENTION_DAYS)),
             format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-            level="ERROR"
+            level="ERROR",
+            filter=_is_app
+        )
+        
+        # Add file handler for access records, one JSON object per line
+        logger.add(
+            log_writer.sink(RotatingFile("logs/access.log", LOG_FILE_MAX_BYTES, LOG_RETENTION_DAYS)),
+            format="{message}",
+            level="INFO",
+            filter=_is_access
         )
     except Exception as e:
         # If file logging fails, just use console logging
         logger.warning(f"File logging not available: {e}")
         logger.warning("Using console logging only")
+        _add_console_access_sink()
 else:
     # In Vercel, only use console logging
+    _add_console_access_sink()
     logger.info("Running in Vercel environment - using console logging only")
+
+# Request access records (JSON messages) from LoggingMiddleware
+access_logger = logger.bind(access=True)
@@ -0,0 +1,230 @@
+import argparse
+import hashlib
+import os
+import random
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import logger
+
+# A task deletes what is due and returns the number of rows it removed
+Task = Callable[[Session], int]
+
+# pg_try_advisory_lock key shared by every worker of this application
+ADVISORY_LOCK_KEY = zlib.crc32(b"maintenance")
+
+
+def delete_in_batches(db: Session, model, *conditions) -> int:
+    """Delete matching rows in bounded batches, committing after each.
+
+    Each batch is ``DELETE ... WHERE id IN (SELECT id ... LIMIT n)``, so
+    locks are held briefly and a large backlog never turns into one long
+    transaction. Stops after MAINTENANCE_MAX_BATCHES; the next run picks
+    up the rest.
+    """
+    batch = select(model.id).where(*conditions).limit(settings.MAINTENANCE_BATCH_SIZE)
+    total = 0
+    for _ in range(settings.MAINTENANCE_MAX_BATCHES):
+        deleted = db.execute(
+            delete(model).where(model.id.in_(batch)).execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        total += deleted
+        if deleted < settings.MAINTENANCE_BATCH_SIZE:
+            break
+        time.sleep(settings.MAINTENANCE_BATCH_PAUSE_SECONDS)
+    return total
+
+
+@contextmanager
+def leader_lock() -> Iterator[bool]:
+    """Try to become the one worker running maintenance.
+
+    PostgreSQL uses a session-level advisory lock, so it also covers
+    workers on other hosts. Other databases fall back to a file lock,
+    which covers workers on this host.
+    """
+    from app.db.base import engine
+
+    if engine.dialect.name == "postgresql":
+        conn = engine.connect()
+        try:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY}).scalar()
+            conn.commit()
+            yield bool(acquired)
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+                conn.commit()
+        except Exception:
+            # Never hand a connection that may still hold the lock back to the pool
+            conn.invalidate()
+            raise
+        finally:
+            conn.close()
+        return
+
+    import fcntl
+
+    digest = hashlib.blake2b(settings.DATABASE_URL.encode(), digest_size=4).hexdigest()
+    path = os.path.join(tempfile.gettempdir(), f"maintenance-{digest}.lock")
+    with open(path, "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class MaintenanceScheduler:
+    """Periodic cleanup of expired rows, run by one worker at a time.
+
+    Services register their tasks at import time. Every worker runs the
+    scheduler thread, but each run first takes the leader lock and the
+    workers that do not get it skip that round.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, Task] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._run_lock = threading.Lock()
+        self.stats = {"runs": 0, "skipped_not_leader": 0, "last_run_at": None}
+        self.task_stats: Dict[str, Dict] = {}
+
+    def register(self, name: str, task: Task):
+        self._tasks[name] = task
+        self.task_stats[name] = {
+            "runs": 0,
+            "rows_reaped": 0,
+            "errors": 0,
+            "seconds_total": 0.0,
+            "last_seconds": 0.0,
+            "last_rows": 0
+        }
+
+    @property
+    def task_names(self) -> List[str]:
+        return list(self._tasks)
+
+    def run_once(self, names: Optional[List[str]] = None) -> Optional[Dict[str, int]]:
+        """Run the tasks if this worker gets the leader lock.
+
+        Returns rows reaped per task, or None when another worker holds
+        the lock.
+        """
+        from app.db.base import SessionLocal
+
+        with self._run_lock, leader_lock() as is_leader:
+            if not is_leader:
+                self.stats["skipped_not_leader"] += 1
+                return None
+
+            results = {}
+            for name in names or self.task_names:
+                results[name] = self._run_task(name, SessionLocal)
+
+            self.stats["runs"] += 1
+            self.stats["last_run_at"] = datetime.now(timezone.utc).isoformat()
+            return results
+
+    def _run_task(self, name: str, session_factory) -> int:
+        stats = self.task_stats[name]
+        started = time.perf_counter()
+        rows = 0
+        db = session_factory()
+        try:
+            rows = self._tasks[name](db)
+        except Exception as e:
+            db.rollback()
+            stats["errors"] += 1
+            logger.error(f"Maintenance task {name} failed: {str(e)}")
+        finally:
+            db.close()
+
+        elapsed = time.perf_counter() - started
+        stats["runs"] += 1
+        stats["rows_reaped"] += rows
+        stats["seconds_total"] += elapsed
+        stats["last_seconds"] = elapsed
+        stats["last_rows"] = rows
+        if rows:
+            logger.info(f"Maintenance task {name} reaped {rows} rows in {elapsed:.2f}s")
+        return rows
+
+    def _next_delay(self) -> float:
+        return settings.MAINTENANCE_INTERVAL_SECONDS + random.uniform(0, settings.MAINTENANCE_JITTER_SECONDS)
+
+    def _run(self):
+        # Spread the first run too, so a fleet restart does not line up
+        delay = random.uniform(0, settings.MAINTENANCE_INTERVAL_SECONDS)
+        while not self._stop.wait(delay):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Maintenance run failed: {str(e)}")
+            delay = self._next_delay()
+
+    def start(self):
+        """Start the scheduler thread (once per process)"""
+        if self._thread is not None or not settings.MAINTENANCE_ENABLED:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="maintenance", daemon=True)
+        self._thread.start()
+        logger.info(f"Maintenance scheduler started ({len(self._tasks)} tasks)")
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        stats["running"] = self._thread is not None
+        stats["tasks"] = {
+            name: {**task, "seconds_total": round(task["seconds_total"], 3), "last_seconds": round(task["last_seconds"], 3)}
+            for name, task in self.task_stats.items()
+        }
+        return stats
+
+
+maintenance = MaintenanceScheduler()
+
+
+if __name__ == "__main__":
+    # Importing the app registers every service's tasks, on the imported
+    # module's scheduler rather than this __main__ copy
+    import main  # noqa: F401
+    from app.core.maintenance import maintenance
+
+    parser = argparse.ArgumentParser(description="Run database maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run = subparsers.add_parser("run", help="Reap expired rows now")
+    run.add_argument("--task", action="append", choices=maintenance.task_names, help="Only run this task (repeatable)")
+    subparsers.add_parser("list", help="List registered tasks")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        print("\n".join(maintenance.task_names))
+    else:
+        results = maintenance.run_once(args.task)
+        if results is None:
+            parser.exit(1, "Another worker is running maintenance\n")
+        for name, rows in results.items():
+            stats = maintenance.task_stats[name]
+            print(f"{name}: {rows} rows in {stats['last_seconds']:.2f}s")
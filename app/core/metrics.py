@@ -0,0 +1,173 @@
+import os
+import threading
+from typing import Dict, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from app.core.config import settings
+from app.core.logger import logger
+
+# With PROMETHEUS_MULTIPROC_DIR set (to an empty directory, before the
+# workers start) every worker keeps its samples in mmap'd files there and
+# /metrics, whichever worker serves it, adds them all up
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests handled", ["method", "route", "status"]
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"], buckets=LATENCY_BUCKETS
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled", ["method"], multiprocess_mode="livesum"
+)
+
+emails_in_flight = Gauge("emails_in_flight", "Emails being sent", multiprocess_mode="livesum")
+emails_sent = Counter("emails_sent_total", "Emails handed to SMTP, by result", ["result"])
+
+# Sampled from the components' own stats by MetricsSampler
+db_pool_size = Gauge("db_pool_size", "Connections the pool keeps open", multiprocess_mode="livesum")
+db_pool_checked_out = Gauge("db_pool_checked_out", "Pool connections in use", multiprocess_mode="livesum")
+db_pool_overflow = Gauge("db_pool_overflow", "Connections opened beyond the pool size", multiprocess_mode="livesum")
+audit_buffer_depth = Gauge(
+    "audit_buffer_depth", "Audit rows waiting to be written (login throttle summaries)", multiprocess_mode="livesum"
+)
+session_activity_pending = Gauge(
+    "session_activity_pending", "Session last-seen times waiting to be written", multiprocess_mode="livesum"
+)
+log_queue_depth = Gauge("log_queue_depth", "Log records waiting for the writer thread", multiprocess_mode="livesum")
+log_records_dropped = Counter("log_records_dropped_total", "Log records dropped on a full queue")
+cache_entries = Gauge("cache_entries", "Entries in in-process caches", ["cache"], multiprocess_mode="livesum")
+cache_hits = Counter("cache_hits_total", "In-process cache hits", ["cache"])
+cache_misses = Counter("cache_misses_total", "In-process cache misses", ["cache"])
+cache_evictions = Counter("cache_evictions_total", "In-process cache evictions", ["cache"])
+rate_limit_requests = Counter("rate_limit_requests_total", "Rate limit decisions", ["policy", "result"])
+login_attempts_throttled = Counter("login_attempts_throttled_total", "Login attempts rejected during backoff")
+maintenance_rows_reaped = Counter("maintenance_rows_reaped_total", "Expired rows deleted", ["task"])
+invalidations_received = Counter("cache_invalidations_received_total", "Cache invalidations received from other workers")
+
+
+class MetricsSampler:
+    """Publishes pool, queue and cache figures that live in other components.
+
+    The figures are read from each component's stats on every scrape; in
+    multiprocess mode every worker also publishes its own every
+    METRICS_SAMPLE_SECONDS, since a scrape only reaches one of them.
+    Cumulative stats become counters by adding what changed since the
+    previous sample.
+    """
+
+    def __init__(self):
+        self._last: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _advance(self, counter: Counter, value: float, *labels: str):
+        key = (counter._name, labels)
+        delta = value - self._last.get(key, 0)
+        if delta > 0:
+            (counter.labels(*labels) if labels else counter).inc(delta)
+        self._last[key] = value
+
+    def sample(self):
+        with self._lock:
+            for source in (self._db_pool, self._buffers, self._caches, self._limits, self._background):
+                try:
+                    source()
+                except Exception as e:
+                    logger.warning(f"Metrics sampling failed in {source.__name__}: {str(e)}")
+
+    @staticmethod
+    def _db_pool():
+        from app.db.base import engine
+
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            db_pool_size.set(pool.size())
+            db_pool_checked_out.set(pool.checkedout())
+            db_pool_overflow.set(max(pool.overflow(), 0))
+
+    def _buffers(self):
+        from app.core.logger import log_writer
+        from app.services.login_throttle_service import login_throttle
+        from app.services.session_service import session_activity
+
+        throttle = login_throttle.get_stats()
+        audit_buffer_depth.set(throttle["pending_summaries"])
+        self._advance(login_attempts_throttled, throttle["suppressed"])
+        session_activity_pending.set(session_activity.get_stats()["pending"])
+
+        writer = log_writer.get_stats()
+        log_queue_depth.set(writer["queued"])
+        self._advance(log_records_dropped, writer["dropped"])
+
+    def _caches(self):
+        from app.core.cache import get_cache_stats
+
+        for name, stats in get_cache_stats().items():
+            cache_entries.labels(name).set(stats["size"])
+            self._advance(cache_hits, stats["hits"], name)
+            self._advance(cache_misses, stats["misses"], name)
+            self._advance(cache_evictions, stats["evictions"], name)
+
+    def _limits(self):
+        from app.middleware.rate_limit import rate_limiter
+
+        for name, stats in rate_limiter.get_stats()["policies"].items():
+            self._advance(rate_limit_requests, stats["allowed"], name, "allowed")
+            self._advance(rate_limit_requests, stats["limited"], name, "limited")
+
+    def _background(self):
+        from app.core.invalidation import invalidation_bus
+        from app.core.maintenance import maintenance
+
+        for name, stats in maintenance.task_stats.items():
+            self._advance(maintenance_rows_reaped, stats["rows_reaped"], name)
+        self._advance(invalidations_received, invalidation_bus.stats["received"])
+
+    def _run(self):
+        while not self._stop.wait(settings.METRICS_SAMPLE_SECONDS):
+            self.sample()
+
+    def start(self):
+        """Start publishing this worker's figures (multiprocess mode only)"""
+        if self._thread is not None or not MULTIPROCESS or not settings.METRICS_ENABLED:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+        if MULTIPROCESS:
+            # Drop this worker's live gauges from the aggregate
+            multiprocess.mark_process_dead(os.getpid())
+
+
+metrics_sampler = MetricsSampler()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition text for all workers, and its content type"""
+    metrics_sampler.sample()
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,203 @@
+import hmac
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import logger
+
+
+class OTPStore(ABC):
+    """Where one-time passwords live while they are outstanding.
+
+    There is at most one code per (email, purpose): issuing a new one
+    replaces the previous code, and consuming a code removes it, so a
+    code works once. Every method takes the request's session; the SQL
+    store writes in that transaction (the caller commits), the other
+    stores ignore it.
+    """
+
+    name: str
+
+    @abstractmethod
+    def issue(self, db: Session, email: str, purpose: str, code: str, ttl_seconds: int):
+        """Store ``code``, replacing any outstanding code for the email and purpose"""
+
+    @abstractmethod
+    def consume(self, db: Session, email: str, purpose: str, code: str) -> bool:
+        """Remove the code if it matches and has not expired; True if it did"""
+
+    def cleanup(self, db: Session) -> int:
+        """Drop expired codes the backend does not expire by itself"""
+        return 0
+
+
+class MemoryOTPStore(OTPStore):
+    """Process-local dict with TTLs, for single-process deployments and development"""
+
+    name = "memory"
+
+    # Expired entries are swept at most this often, on issue
+    SWEEP_INTERVAL_SECONDS = 60
+
+    def __init__(self):
+        self._codes: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def issue(self, db: Session, email: str, purpose: str, code: str, ttl_seconds: int):
+        now = time.monotonic()
+        with self._lock:
+            self._codes[(email, purpose)] = (code, now + ttl_seconds)
+            if now - self._last_sweep >= self.SWEEP_INTERVAL_SECONDS:
+                self._sweep(now)
+
+    def consume(self, db: Session, email: str, purpose: str, code: str) -> bool:
+        with self._lock:
+            entry = self._codes.get((email, purpose))
+            if entry is None:
+                return False
+            stored_code, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._codes[(email, purpose)]
+                return False
+            if not hmac.compare_digest(stored_code, code):
+                return False
+            del self._codes[(email, purpose)]
+            return True
+
+    def cleanup(self, db: Session) -> int:
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def _sweep(self, now: float) -> int:
+        expired = [key for key, (_, expires_at) in self._codes.items() if expires_at <= now]
+        for key in expired:
+            del self._codes[key]
+        self._last_sweep = now
+        return len(expired)
+
+
+class SQLOTPStore(OTPStore):
+    """The otps table, one row per (email, purpose).
+
+    Issuing is a single upsert on the unique (email, purpose) index, which
+    also invalidates the previous code; consuming is a single conditional
+    DELETE.
+    """
+
+    name = "sql"
+
+    def issue(self, db: Session, email: str, purpose: str, code: str, ttl_seconds: int):
+        from app.models.otp import OTP
+
+        values = {
+            "email": email,
+            "purpose": purpose,
+            "code": code,
+            "is_used": False,
+            "expires_at": datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds),
+            "created_at": datetime.now(timezone.utc)
+        }
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            upsert = None
+
+        if upsert is None:
+            db.execute(delete(OTP).where(OTP.email == email, OTP.purpose == purpose))
+            db.execute(insert(OTP).values(**values))
+            return
+
+        statement = upsert(OTP).values(**values)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[OTP.email, OTP.purpose],
+            set_={
+                "code": statement.excluded.code,
+                "is_used": False,
+                "expires_at": statement.excluded.expires_at,
+                "created_at": statement.excluded.created_at
+            }
+        ))
+
+    def consume(self, db: Session, email: str, purpose: str, code: str) -> bool:
+        from app.models.otp import OTP
+
+        deleted = db.execute(
+            delete(OTP).where(
+                OTP.email == email,
+                OTP.purpose == purpose,
+                OTP.code == code,
+                OTP.expires_at > datetime.now(timezone.utc)
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        return deleted == 1
+
+    def cleanup(self, db: Session) -> int:
+        from app.core.maintenance import delete_in_batches
+        from app.models.otp import OTP
+
+        return delete_in_batches(db, OTP, OTP.expires_at < datetime.now(timezone.utc))
+
+
+# Compare-and-delete, so a wrong guess leaves the code in place
+_CONSUME_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisOTPStore(OTPStore):
+    """Codes as keys with a PX expiry on a Redis-protocol server"""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "otp:"):
+        from app.core.resp import get_client
+
+        self.client = get_client(url)
+        self.prefix = prefix
+
+    def _key(self, email: str, purpose: str) -> str:
+        return f"{self.prefix}{purpose}:{email}"
+
+    def issue(self, db: Session, email: str, purpose: str, code: str, ttl_seconds: int):
+        self.client.execute("SET", self._key(email, purpose), code, "PX", int(ttl_seconds * 1000))
+
+    def consume(self, db: Session, email: str, purpose: str, code: str) -> bool:
+        return self.client.execute("EVAL", _CONSUME_SCRIPT, 1, self._key(email, purpose), code) == 1
+
+
+_store: Optional[OTPStore] = None
+_store_lock = threading.Lock()
+
+
+def get_otp_store() -> OTPStore:
+    """Process-wide store selected by OTP_STORE_BACKEND, created on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = _create_store(settings.OTP_STORE_BACKEND)
+                logger.info(f"Using {_store.name} OTP store")
+    return _store
+
+
+def _create_store(backend: str) -> OTPStore:
+    if backend == "sql":
+        return SQLOTPStore()
+    if backend == "memory":
+        return MemoryOTPStore()
+    if backend == "redis":
+        return RedisOTPStore(settings.REDIS_URL)
+    raise ValueError(f"Unknown OTP store backend {backend}")
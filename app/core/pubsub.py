@@ -0,0 +1,202 @@
+import asyncio
+import threading
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import logger
+
+# Event ids are "<boot>-<seq>"; the boot token tells a resuming client
+# whether its Last-Event-ID was issued by this process at all
+BOOT_ID = uuid.uuid4().hex[:8]
+
+POLICY_DISCONNECT = "disconnect"
+POLICY_DROP_OLDEST = "drop_oldest"
+
+
+class Event:
+    """A published message"""
+
+    __slots__ = ("id", "name", "data")
+
+    def __init__(self, id: str, name: str, data: Any):
+        self.id = id
+        self.name = name
+        self.data = data
+
+
+class Subscription:
+    """A bounded per-subscriber queue bound to the subscriber's event loop.
+
+    Publishers may run on any thread; events are handed to the loop with
+    call_soon_threadsafe so the queue itself is only touched by its owner.
+    """
+
+    def __init__(self, topic: "Topic", loop: asyncio.AbstractEventLoop, maxsize: int, policy: str):
+        self.topic = topic
+        self.policy = policy
+        # Id of the newest event published before this subscription started
+        self.start_id: Optional[str] = None
+        self.dropped = 0
+        self.closed = False
+        self._loop = loop
+        self._queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize=maxsize)
+
+    def _deliver(self, evt: Event):
+        if self.closed:
+            return
+        try:
+            self._queue.put_nowait(evt)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if self.policy == POLICY_DROP_OLDEST:
+            self._queue.get_nowait()
+            self._queue.put_nowait(evt)
+            self.dropped += 1
+            self.topic.dropped += 1
+        else:
+            # Slow consumer: cut it loose, it can resume with Last-Event-ID
+            logger.warning(f"Disconnecting slow subscriber on topic {self.topic.name}")
+            self.topic.disconnected += 1
+            self.close()
+
+    def publish(self, evt: Event):
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, evt)
+        except RuntimeError:
+            # Event loop already closed
+            self.closed = True
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        """Next event, or None if nothing arrived within ``timeout``.
+
+        A closed subscription still hands out what was already queued.
+        """
+        if self.closed and self._queue.empty():
+            return None
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.closed = True
+        self.topic.unsubscribe(self)
+
+
+class Topic:
+    """Fan-out point with a replay buffer of recent events"""
+
+    def __init__(self, name: str, replay_size: int):
+        self.name = name
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._replay: Deque[Tuple[int, Event]] = deque(maxlen=replay_size)
+        self._subscribers: Set[Subscription] = set()
+        self.published = 0
+        self.dropped = 0
+        self.disconnected = 0
+
+    def publish(self, name: str, data: Any) -> Event:
+        with self._lock:
+            self._seq += 1
+            evt = Event(f"{BOOT_ID}-{self._seq}", name, data)
+            self._replay.append((self._seq, evt))
+            self.published += 1
+            # Hand off under the lock so every subscriber sees publish order
+            for subscription in self._subscribers:
+                subscription.publish(evt)
+        return evt
+
+    def subscribe(
+        self,
+        last_event_id: Optional[str] = None,
+        maxsize: Optional[int] = None,
+        policy: Optional[str] = None
+    ) -> Tuple[Subscription, Optional[List[Event]]]:
+        """Register a subscriber on the running loop.
+
+        Returns the subscription and the events missed since
+        ``last_event_id``. The backlog is None when the id cannot be
+        resumed from this process (unknown boot, or older than the
+        replay buffer) and the client has to resynchronise.
+        """
+        subscription = Subscription(
+            self,
+            asyncio.get_running_loop(),
+            maxsize or settings.SSE_QUEUE_SIZE,
+            policy or settings.SSE_SLOW_CONSUMER_POLICY
+        )
+
+        with self._lock:
+            backlog: Optional[List[Event]] = []
+            if last_event_id:
+                backlog = self._missed_since(last_event_id)
+            subscription.start_id = f"{BOOT_ID}-{self._seq}"
+            self._subscribers.add(subscription)
+
+        return subscription, backlog
+
+    def _missed_since(self, last_event_id: str) -> Optional[List[Event]]:
+        boot, _, seq = last_event_id.partition("-")
+        if boot != BOOT_ID or not seq.isdigit():
+            return None
+
+        seq = int(seq)
+        if seq >= self._seq:
+            return []
+        if not self._replay or seq < self._replay[0][0] - 1:
+            return None
+        return [evt for event_seq, evt in self._replay if event_seq > seq]
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "disconnected": self.disconnected
+        }
+
+
+_topics: Dict[str, Topic] = {}
+_topics_lock = threading.Lock()
+
+
+def get_topic(name: str) -> Topic:
+    """Get or create a topic by name"""
+    with _topics_lock:
+        topic = _topics.get(name)
+        if topic is None:
+            topic = _topics[name] = Topic(name, settings.SSE_REPLAY_BUFFER_SIZE)
+        return topic
+
+
+def publish_on_commit(db: Session, topic: str, name: str, data: Any):
+    """Publish once the caller's transaction commits (dropped on rollback)"""
+    db.info.setdefault("pubsub_events", []).append((topic, name, data))
+
+
+def get_pubsub_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every topic"""
+    return {name: topic.stats() for name, topic in _topics.items()}
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session):
+    for topic, name, data in session.info.pop("pubsub_events", ()):
+        get_topic(topic).publish(name, data)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("pubsub_events", None)
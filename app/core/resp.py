@@ -0,0 +1,153 @@
+import socket
+import threading
+from typing import Any, List, Optional
+from urllib.parse import unquote, urlparse
+
+
+class RespError(Exception):
+    """Error reply from the server"""
+
+
+class RespClient:
+    """Minimal blocking client for the Redis protocol (RESP2).
+
+    Enough for the few commands the shared stores need (SET, EVAL, ...),
+    without a client library dependency. Works against Redis, Valkey,
+    KeyDB or any other server speaking the protocol. Connections are
+    pooled and reopened after a network error.
+
+    Usage::
+
+        client = RespClient("redis://:password@localhost:6379/0")
+        client.execute("SET", "key", "value", "PX", 60000)
+    """
+
+    def __init__(self, url: str, timeout: float = 2.0, max_idle: int = 8):
+        parsed = urlparse(url)
+        if parsed.scheme not in ("redis", ""):
+            raise ValueError(f"Unsupported URL scheme {parsed.scheme}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle: List["_Connection"] = []
+        self._lock = threading.Lock()
+
+    def execute(self, *args) -> Any:
+        """Send one command and return its decoded reply"""
+        conn = self._acquire()
+        try:
+            reply = conn.call(args)
+        except (OSError, ConnectionError):
+            conn.close()
+            raise
+        self._release(conn)
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    def _acquire(self) -> "_Connection":
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+
+        conn = _Connection(self.host, self.port, self.timeout)
+        try:
+            if self.password:
+                auth = ("AUTH", self.username, self.password) if self.username else ("AUTH", self.password)
+                conn.check(conn.call(auth))
+            if self.db:
+                conn.check(conn.call(("SELECT", self.db)))
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def _release(self, conn: "_Connection"):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class _Connection:
+    def __init__(self, host: str, port: int, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def call(self, args) -> Any:
+        self.sock.sendall(_encode(args))
+        return self._read()
+
+    @staticmethod
+    def check(reply: Any):
+        if isinstance(reply, RespError):
+            raise reply
+
+    def _read(self) -> Any:
+        line = self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by server")
+        kind, payload = line[:1], line[1:-2]
+
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            return RespError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2].decode()
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply type {kind!r}")
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def _encode(args) -> bytes:
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(f"${len(data)}\r\n".encode())
+        parts.append(data)
+        parts.append(b"\r\n")
+    return b"".join(parts)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(url: Optional[str]) -> RespClient:
+    """Shared client per URL"""
+    if not url:
+        raise RuntimeError("REDIS_URL is not configured")
+    with _clients_lock:
+        client = _clients.get(url)
+        if client is None:
+            client = _clients[url] = RespClient(url)
+        return client
@@ -1,14 +1,28 @@
-from datetime import datetime, timedelta
-from typing import Optional, Union
-from jose import JWTError, jwt
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple, Union
+from jwt import InvalidTokenError
 from passlib.context import CryptContext
+from app.core.cache import LRUCache
+from app.core.keys import get_keyring
 from app.core.config import settings
+import jwt
+import hashlib
 import secrets
 import string
+import time
 import uuid
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Claims of tokens that passed signature verification, keyed by token digest.
+# Only verified tokens are admitted, so random garbage cannot fill it.
+_verified_tokens = LRUCache(
+    "verified_tokens",
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    sizeof=lambda claims: 512
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
@@ -38,32 +52,94 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         "type": "access",
         "jti": jti
     })
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    return _encode(to_encode)
 
 
-def create_refresh_token(data: dict) -> str:
+def create_refresh_token(data: dict, jti: Optional[str] = None) -> str:
     """Create JWT refresh token with JTI"""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     
-    # Add JTI (JWT ID) for token tracking
-    jti = str(uuid.uuid4())
+    # Add JTI (JWT ID) for token tracking; session rotation picks its own
+    jti = jti or str(uuid.uuid4())
     to_encode.update({
         "exp": expire, 
         "type": "refresh",
         "jti": jti
     })
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    return _encode(to_encode)
+
+
+def _encode(claims: dict) -> str:
+    """Sign with the active asymmetric key, or HS256 when none is configured"""
+    signing_key = get_keyring().active
+    if signing_key is None:
+        return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return jwt.encode(
+        claims,
+        signing_key.private_key,
+        algorithm=signing_key.algorithm,
+        headers={"kid": signing_key.kid}
+    )
+
+
+def _accepts_legacy_tokens() -> bool:
+    """Whether tokens without a kid, signed with SECRET_KEY, are still accepted"""
+    if get_keyring().active is None:
+        # HS256 is how tokens are signed at all
+        return True
+    until = settings.ACCEPT_LEGACY_HS256_UNTIL
+    if until is None:
+        return False
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) < until
+
+
+def _decode(token: str) -> Tuple[dict, bool]:
+    """Verified claims, and whether they may be cached until the token expires"""
+    kid = jwt.get_unverified_header(token).get("kid")
+    if kid is None:
+        # Signed with SECRET_KEY before switching to asymmetric keys; only
+        # honored during the ACCEPT_LEGACY_HS256_UNTIL grace period, so
+        # not cached past it either
+        if not _accepts_legacy_tokens():
+            raise InvalidTokenError("Token is not signed with a current key")
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        return claims, get_keyring().active is None
+    
+    key = get_keyring().keys.get(kid)
+    if key is None:
+        raise InvalidTokenError(f"Unknown signing key {kid}")
+    return jwt.decode(token, key.public_key, algorithms=[key.algorithm]), True
+
+
+def verify_token(token: str) -> dict:
+    """Verify a JWT and return its claims, raising InvalidTokenError if invalid.
+    
+    Verified claims are cached until the token's ``exp``; treat the
+    returned dict as read-only since it is shared between requests.
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    claims = _verified_tokens.get(key)
+    if claims is not None:
+        return claims
+    
+    claims, cacheable = _decode(token)
+    
+    exp = claims.get("exp")
+    if exp and cacheable:
+        remaining = exp - time.time()
+        if remaining > 0:
+            _verified_tokens.set(key, claims, ttl=remaining)
+    return claims
 
 
 def decode_token(token: str) -> Optional[dict]:
     """Decode and verify JWT token"""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError:
+        return verify_token(token)
+    except InvalidTokenError:
         return None
 
 
@@ -0,0 +1,78 @@
+import json
+from typing import Any, AsyncIterator, Callable, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from app.core.pubsub import Event, get_topic
+from app.core.config import settings
+
+
+def format_event(data: Any, event: Optional[str] = None, id: Optional[str] = None) -> str:
+    """Encode one Server-Sent Events frame"""
+    lines = []
+    if id is not None:
+        lines.append(f"id: {id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'), default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _stream(
+    request: Request,
+    topic_name: str,
+    matches: Optional[Callable[[Event], bool]]
+) -> AsyncIterator[str]:
+    subscription, backlog = get_topic(topic_name).subscribe(request.headers.get("Last-Event-ID"))
+    try:
+        yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+
+        if backlog is None:
+            # Too far behind (or issued by another process): the client
+            # reloads its view and continues from the current position
+            yield format_event({"reason": "resume_unavailable"}, event="reset", id=subscription.start_id)
+            backlog = []
+
+        for evt in backlog:
+            if matches is None or matches(evt):
+                yield format_event(evt.data, event=evt.name, id=evt.id)
+
+        dropped = 0
+        while True:
+            evt = await subscription.get(settings.SSE_HEARTBEAT_SECONDS)
+
+            if subscription.dropped != dropped:
+                yield format_event({"count": subscription.dropped - dropped}, event="dropped")
+                dropped = subscription.dropped
+
+            if evt is None:
+                if subscription.closed:
+                    break
+                # Comment frame keeps proxies from timing out idle streams
+                yield ": ping\n\n"
+            elif matches is None or matches(evt):
+                yield format_event(evt.data, event=evt.name, id=evt.id)
+    finally:
+        subscription.close()
+
+
+def event_stream_response(
+    request: Request,
+    topic_name: str,
+    matches: Optional[Callable[[Event], bool]] = None
+) -> StreamingResponse:
+    """Stream a pub/sub topic as text/event-stream.
+
+    Honours Last-Event-ID by replaying from the topic buffer, sends
+    heartbeat comments while idle and ends when the subscriber is
+    disconnected for falling behind.
+    """
+    return StreamingResponse(
+        _stream(request, topic_name, matches),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -0,0 +1,191 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+# Idle buckets refill to full, which is the same as not existing; they
+# are swept at most this often
+SWEEP_INTERVAL_SECONDS = 60
+
+
+class MemoryBucketStore:
+    """Token buckets in a dict: O(1) per request, per process"""
+
+    name = "memory"
+    blocking = False
+
+    def __init__(self):
+        self._buckets: Dict[str, List[float]] = {}  # key -> [tokens, updated, seconds until full]
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def take(self, key: str, capacity: int, rate: float) -> Tuple[bool, float]:
+        """Take one token; returns (allowed, tokens left)"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+                bucket = self._buckets[key] = [capacity, now, capacity / rate]
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            bucket[0] = tokens
+            bucket[1] = now
+
+            if now - self._last_sweep >= SWEEP_INTERVAL_SECONDS:
+                self._sweep(now)
+        return allowed, tokens
+
+    def _sweep(self, now: float):
+        idle = [key for key, (_, updated, full_after) in self._buckets.items() if now - updated >= full_after]
+        for key in idle:
+            del self._buckets[key]
+        self._last_sweep = now
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteBucketStore:
+    """Token buckets in a host-local SQLite file shared by every worker.
+
+    Each take is one upsert in its own transaction. Put the file on a
+    tmpfs (e.g. /dev/shm) to keep it in memory. Every row records when
+    it will be full again, and rows past that point are swept from take
+    like the memory store does; every worker sweeps, since the
+    maintenance leader may run on another host.
+    """
+
+    name = "sqlite"
+    blocking = True
+
+    # Rows deleted per statement, so a sweep never holds the write lock for long
+    SWEEP_BATCH = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._last_sweep = time.monotonic()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            # full_at: when the bucket has refilled and is as good as absent
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS token_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL) "
+                "WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS token_buckets_full_at ON token_buckets (full_at)")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, capacity: int, rate: float) -> Tuple[bool, float]:
+        now = time.time()
+        conn = self._connection()
+        if time.monotonic() - self._last_sweep >= SWEEP_INTERVAL_SECONDS:
+            self.sweep(now)
+
+        # SET expressions all see the row as it was before the update
+        row = conn.execute(
+            """
+            INSERT INTO token_buckets (key, tokens, updated, full_at)
+            VALUES (:key, :capacity - 1, :now, :now + 1 / :rate)
+            ON CONFLICT (key) DO UPDATE SET
+                tokens = MIN(:capacity, tokens + (:now - updated) * :rate) - 1,
+                updated = :now,
+                full_at = :now + (:capacity - MIN(:capacity, tokens + (:now - updated) * :rate) + 1) / :rate
+            WHERE MIN(:capacity, tokens + (:now - updated) * :rate) >= 1
+            RETURNING tokens
+            """,
+            {"key": key, "capacity": capacity, "rate": rate, "now": now}
+        ).fetchone()
+        if row is not None:
+            return True, row[0]
+
+        tokens, updated = conn.execute(
+            "SELECT tokens, updated FROM token_buckets WHERE key = ?", (key,)
+        ).fetchone()
+        return False, min(capacity, tokens + (now - updated) * rate)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Delete buckets that have refilled to full; returns how many"""
+        self._last_sweep = time.monotonic()
+        now = now or time.time()
+        conn = self._connection()
+        total = 0
+        while True:
+            deleted = conn.execute(
+                "DELETE FROM token_buckets WHERE key IN "
+                "(SELECT key FROM token_buckets WHERE full_at <= ? LIMIT ?)",
+                (now, self.SWEEP_BATCH)
+            ).rowcount
+            total += deleted
+            if deleted < self.SWEEP_BATCH:
+                return total
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM token_buckets").fetchone()[0]
+
+
+# Refill, take and store in one step; tokens come back as a string to keep the fraction
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - updated, 0) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBucketStore:
+    """Token buckets as hashes on a Redis-protocol server, shared across hosts"""
+
+    name = "redis"
+    blocking = True
+
+    def __init__(self, url: str, prefix: str = "tb:"):
+        from app.core.resp import get_client
+
+        self.client = get_client(url)
+        self.prefix = prefix
+
+    def take(self, key: str, capacity: int, rate: float) -> Tuple[bool, float]:
+        allowed, tokens = self.client.execute(
+            "EVAL", _TAKE_SCRIPT, 1, self.prefix + key, capacity, rate, time.time()
+        )
+        return allowed == 1, float(tokens)
+
+
+def create_bucket_store(backend: Optional[str] = None):
+    """Store selected by RATE_LIMIT_BACKEND"""
+    backend = backend or settings.RATE_LIMIT_BACKEND
+    if backend == "memory":
+        return MemoryBucketStore()
+    if backend == "sqlite":
+        path = settings.RATE_LIMIT_SQLITE_PATH or os.path.join(tempfile.gettempdir(), "rate_limit.sqlite3")
+        return SQLiteBucketStore(path)
+    if backend == "redis":
+        return RedisBucketStore(settings.REDIS_URL)
+    raise ValueError(f"Unknown rate limit backend {backend}")
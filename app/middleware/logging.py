@@ -1,35 +1,94 @@
+import json
+import random
+import re
 import time
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from app.core.logger import logger
-
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all requests and responses"""
-    
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
-        # Log request
-        logger.info(
-            f"Request: {request.method} {request.url.path} "
-            f"from {request.client.host if request.client else 'unknown'}"
-        )
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Calculate processing time
-        process_time = time.time() - start_time
-        
-        # Log response
-        logger.info(
-            f"Response: {request.method} {request.url.path} "
-            f"Status: {response.status_code} "
-            f"Duration: {process_time:.3f}s"
-        )
-        
-        # Add custom header
-        response.headers["X-Process-Time"] = str(process_time)
-        
-        return response
+import uuid
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.logger import access_logger
+
+# Incoming request ids are passed through only if they look harmless
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+class LoggingMiddleware:
+    """Pure ASGI middleware writing one JSON access record per request.
+
+    Every request gets a request id, taken from a well-formed X-Request-ID
+    header or generated, exposed as ``request.state.request_id`` and
+    echoed in the response. Errors (status >= 400, or an exception) and
+    requests slower than ACCESS_LOG_SLOW_MS are always logged; other
+    requests with probability ACCESS_LOG_SAMPLE_RATE.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        status_code = 500
+        response_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed = time.perf_counter() - start
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-request-id", request_id.encode()),
+                    (b"x-process-time", f"{elapsed:.6f}".encode()),
+                ]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if (
+                status_code >= 400
+                or duration_ms >= settings.ACCESS_LOG_SLOW_MS
+                or random.random() < settings.ACCESS_LOG_SAMPLE_RATE
+            ):
+                self._log(scope, request_id, status_code, duration_ms, response_bytes)
+
+    @staticmethod
+    def _log(scope, request_id: str, status_code: int, duration_ms: float, response_bytes: int):
+        user_agent = None
+        for name, value in scope["headers"]:
+            if name == b"user-agent":
+                user_agent = value.decode("latin-1")
+                break
+        client = scope.get("client")
+
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "request_id": request_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(duration_ms, 3),
+            "bytes": response_bytes,
+            "client": client[0] if client else None,
+            "user_agent": user_agent,
+        }
+        level = "ERROR" if status_code >= 500 else "WARNING" if status_code >= 400 else "INFO"
+        access_logger.log(level, json.dumps(record, separators=(",", ":")))
@@ -0,0 +1,46 @@
+import time
+
+from app.core.config import settings
+from app.core.metrics import http_request_duration, http_requests, http_requests_in_progress
+
+_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware counting and timing requests per route template.
+
+    Requests are labelled with the matched route's path (``/users/{user_id}``,
+    not ``/users/42``) so the number of series stays bounded; requests that
+    never reached a route (404s, rate-limited requests) share the
+    ``unmatched`` label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in _METHODS else "OTHER"
+        in_progress = http_requests_in_progress.labels(method)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+            # FastAPI puts the matched route in the scope, which routing shares with us
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_requests.labels(method, route, str(status_code)).inc()
+            http_request_duration.labels(method, route).observe(duration)
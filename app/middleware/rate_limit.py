@@ -0,0 +1,185 @@
+import json
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.token_bucket import create_bucket_store
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Credential and OTP endpoints, limited per IP whatever token is sent
+AUTH_PATHS = frozenset(
+    f"/api/v1/auth/{name}"
+    for name in ("login", "register", "verify-login", "verify-account", "resend-otp", "resend-login-otp")
+)
+
+EXEMPT_PATHS = frozenset(("/health", "/metrics", "/docs", "/redoc", "/openapi.json", "/docs/oauth2-redirect"))
+
+
+@dataclass(frozen=True)
+class RatePolicy:
+    """``limit`` requests per ``period`` seconds, as a bucket of ``limit`` tokens"""
+
+    name: str
+    limit: int
+    period: int
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.period
+
+    @classmethod
+    def parse(cls, name: str, value: str) -> "RatePolicy":
+        """Parse "10/minute" (or second, hour, day)"""
+        count, _, period = value.partition("/")
+        try:
+            return cls(name, int(count), _PERIODS[period.strip().lower()])
+        except (KeyError, ValueError):
+            raise ValueError(f"Invalid rate limit {value!r} for {name}, expected e.g. 10/minute")
+
+
+class RateLimiter:
+    """Picks the policy and bucket for a request and takes a token from it.
+
+    Auth endpoints are keyed by client IP. Everything else is keyed by
+    the access token's subject when a valid one is sent, else by IP, with
+    separate policies for reads (GET/HEAD) and writes.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or create_bucket_store()
+        self.policies = {
+            "auth": RatePolicy.parse("auth", settings.RATE_LIMIT_AUTH),
+            "read": RatePolicy.parse("read", settings.RATE_LIMIT_READ),
+            "write": RatePolicy.parse("write", settings.RATE_LIMIT_WRITE),
+        }
+        self._stats: Dict[str, Dict[str, int]] = {name: {"allowed": 0, "limited": 0} for name in self.policies}
+        self._stats_lock = threading.Lock()
+        self._store_errors = 0
+
+    def classify(self, scope) -> Optional[Tuple[RatePolicy, str]]:
+        """(policy, bucket key) for the request, or None if it is not limited"""
+        method, path = scope["method"], scope["path"]
+        if method == "OPTIONS" or path in EXEMPT_PATHS:
+            return None
+
+        from app.api.deps import get_client_ip
+
+        request = Request(scope)
+        if path in AUTH_PATHS and method == "POST":
+            return self.policies["auth"], f"auth:ip:{get_client_ip(request)}"
+
+        policy = self.policies["read" if method in ("GET", "HEAD") else "write"]
+        subject = self._subject(request)
+        if subject is not None:
+            return policy, f"{policy.name}:user:{subject}"
+        return policy, f"{policy.name}:ip:{get_client_ip(request)}"
+
+    @staticmethod
+    def _subject(request: Request) -> Optional[str]:
+        from app.core.security import decode_token
+
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        # Signature checks are cached by token digest, so this is a dict lookup after the first request
+        claims = decode_token(token)
+        if claims is None or claims.get("type") != "access":
+            return None
+        return claims.get("sub")
+
+    async def take(self, policy: RatePolicy, key: str) -> Optional[Tuple[bool, float]]:
+        """(allowed, tokens left); None when the shared store is unavailable"""
+        try:
+            if self.store.blocking:
+                return await run_in_threadpool(self.store.take, key, policy.limit, policy.rate)
+            return self.store.take(key, policy.limit, policy.rate)
+        except Exception as e:
+            # Fail open: an outage of the limiter store must not take the API down with it
+            self._store_errors += 1
+            logger.warning(f"Rate limit store unavailable, not limiting: {e}")
+            return None
+
+    def record(self, policy: RatePolicy, allowed: bool):
+        with self._stats_lock:
+            self._stats[policy.name]["allowed" if allowed else "limited"] += 1
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            policies = {
+                name: {"limit": policy.limit, "period": policy.period, **self._stats[name]}
+                for name, policy in self.policies.items()
+            }
+        stats = {"backend": self.store.name, "store_errors": self._store_errors, "policies": policies}
+        if hasattr(self.store, "__len__"):
+            stats["buckets"] = len(self.store)
+        return stats
+
+
+def _headers(policy: RatePolicy, tokens: float) -> list:
+    # Reset: seconds until the bucket is full again
+    reset = math.ceil((policy.limit - tokens) / policy.rate)
+    return [
+        (b"ratelimit-limit", str(policy.limit).encode()),
+        (b"ratelimit-remaining", str(max(int(tokens), 0)).encode()),
+        (b"ratelimit-reset", str(reset).encode()),
+        (b"ratelimit-policy", f"{policy.limit};w={policy.period}".encode()),
+    ]
+
+
+class RateLimitMiddleware:
+    """Pure ASGI token-bucket rate limiting with RateLimit-* response headers"""
+
+    def __init__(self, app, limiter: Optional["RateLimiter"] = None):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiter or rate_limiter
+        match = limiter.classify(scope)
+        result = await limiter.take(*match) if match is not None else None
+        if result is None:
+            await self.app(scope, receive, send)
+            return
+
+        policy, key = match
+        allowed, tokens = result
+        limiter.record(policy, allowed)
+        headers = _headers(policy, tokens)
+
+        if not allowed:
+            logger.warning(f"Rate limit exceeded for {key} on {scope['method']} {scope['path']}")
+            body = json.dumps({"detail": "Too many requests"}).encode()
+            retry_after = math.ceil((1 - tokens) / policy.rate)
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(retry_after).encode()),
+                    *headers,
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+rate_limiter = RateLimiter()
@@ -2,5 +2,8 @@ from app.models.role import Role
 from app.models.user import User
 from app.models.audit_log import AuditLog
 from app.models.otp import OTP
+from app.models.cache_invalidation import CacheInvalidation
+from app.models.permission import Permission, PermissionRegistryVersion
+from app.models.session import UserSession
 
-__all__ = ["Role", "User", "AuditLog", "OTP"]
+__all__ = ["Role", "User", "AuditLog", "OTP", "CacheInvalidation", "Permission", "PermissionRegistryVersion", "UserSession"]
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class Change(Base):
+    __tablename__ = "changes"
+
+    # Feed order is (txid, id). On PostgreSQL txid is the writing transaction's
+    # id; sequence values are taken before commit, so ids alone are not in
+    # commit order there. SQLite commits one writer at a time and keeps txid 0.
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    txid = Column(BigInteger, nullable=False, server_default="0")
+    entity_type = Column(String, nullable=False)  # user, content
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String, nullable=False)  # created, updated, deleted
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+    __table_args__ = (
+        Index("ix_changes_entity_type_txid_id", "entity_type", "txid", "id"),
+    )
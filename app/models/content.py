@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, DDL, Index, event, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -19,16 +19,36 @@ class Content(Base):
     is_moderated = Column(Boolean, default=False, nullable=False)
     moderation_status = Column(String, default="pending", nullable=False)  # pending, approved, rejected
     
+    # Moderation queue lease
+    claimed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    claim_expires_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Soft delete
     is_deleted = Column(Boolean, default=False, nullable=False)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
     
+    # Optimistic concurrency: bumped on every update, checked by the ORM on flush
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
+    __mapper_args__ = {"version_id_col": version}
+    
+    __table_args__ = (
+        # Only pending items are ever claimed, so the queue index stays small
+        Index(
+            "ix_contents_pending_queue",
+            "created_at",
+            "id",
+            postgresql_where=text("moderation_status = 'pending' AND is_deleted = false"),
+            sqlite_where=text("moderation_status = 'pending' AND is_deleted = 0")
+        ),
+    )
+    
     # Relationships
-    author = relationship("User", back_populates="contents")
+    author = relationship("User", back_populates="contents", foreign_keys=[author_id])
     
     def soft_delete(self):
         """Soft delete the content"""
@@ -36,11 +56,52 @@ class Content(Base):
         self.is_published = False
         self.deleted_at = datetime.utcnow()
     
-    def moderate(self, status: str):
-        """Moderate the content"""
-        self.is_moderated = True
-        self.moderation_status = status
+    @staticmethod
+    def moderation_values(status: str) -> dict:
+        """Column values applied by moderation (shared with bulk updates)"""
+        values = {
+            "is_moderated": True,
+            "moderation_status": status,
+            "claimed_by": None,
+            "claim_expires_at": None
+        }
         if status == "approved":
-            self.is_published = True
+            values["is_published"] = True
         elif status == "rejected":
-            self.is_published = False
+            values["is_published"] = False
+        return values
+    
+    def moderate(self, status: str):
+        """Moderate the content"""
+        for field, value in Content.moderation_values(status).items():
+            setattr(self, field, value)
+
+
+# Full-text search storage lives outside the mapped columns so each dialect
+# gets its own native index: a weighted tsvector column with a GIN index on
+# PostgreSQL and an FTS5 virtual table keyed by content id on SQLite.
+# ContentSearchService keeps both up to date.
+event.listen(
+    Content.__table__,
+    "after_create",
+    DDL("ALTER TABLE contents ADD COLUMN search_vector tsvector").execute_if(dialect="postgresql")
+)
+event.listen(
+    Content.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX ix_contents_search_vector ON contents USING gin (search_vector)"
+    ).execute_if(dialect="postgresql")
+)
+event.listen(
+    Content.__table__,
+    "after_create",
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS contents_fts USING fts5(title, content)"
+    ).execute_if(dialect="sqlite")
+)
+event.listen(
+    Content.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS contents_fts").execute_if(dialect="sqlite")
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.sql import func
 from datetime import datetime, timedelta
 from app.db.base import Base
@@ -10,12 +10,17 @@ class OTP(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
-    email = Column(String, nullable=False, index=True)
+    email = Column(String, nullable=False)
     code = Column(String, nullable=False)
     purpose = Column(String, nullable=False)  # registration, password_reset, login, etc.
     is_used = Column(Boolean, default=False, nullable=False)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # One outstanding code per email and purpose; target of the issue upsert
+        Index("ix_otps_email_purpose", "email", "purpose", unique=True),
+    )
     
     def is_valid(self) -> bool:
         """Check if OTP is still valid"""
@@ -9,6 +9,7 @@ class Permission(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
+    bit = Column(Integer, unique=True, index=True, nullable=True)  # stable position in token permission masks
     description = Column(String, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -16,3 +17,11 @@ class Permission(Base):
     
     # Many-to-many relationship with roles
     roles = relationship("Role", secondary="role_permissions", back_populates="permissions")
+
+
+class PermissionRegistryVersion(Base):
+    """Single-row counter bumped whenever permission bits or role grants change"""
+    __tablename__ = "permission_registry"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, default=1, nullable=False)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class UserSession(Base):
+    """A refresh-token family: one row per login, rotated in place"""
+    __tablename__ = "user_sessions"
+
+    id = Column(String(32), primary_key=True)  # family id, the "sid" claim
+    user_id = Column(Integer, nullable=False, index=True)
+    current_jti = Column(String, nullable=False)  # only this refresh token may rotate
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    user_agent = Column(String, nullable=True)  # device that logged in
+    ip_address = Column(String, nullable=True)  # last address that refreshed
+    last_seen_at = Column(DateTime(timezone=True), nullable=True)  # flushed periodically, not per request
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
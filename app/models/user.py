@@ -21,12 +21,20 @@ class User(Base):
     is_deleted = Column(Boolean, default=False, nullable=False)
     deleted_at = Column(DateTime(timezone=True), nullable=True)
     
+    # Bumped to revoke every token issued before (tokens carry the epoch they were issued in)
+    token_epoch = Column(Integer, default=0, server_default="0", nullable=False)
+    
+    # Optimistic concurrency: bumped on every update, checked by the ORM on flush
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
+    __mapper_args__ = {"version_id_col": version}
+    
     # Relationships
-    contents = relationship("Content", back_populates="author")
+    contents = relationship("Content", back_populates="author", foreign_keys="Content.author_id")
     role = relationship("Role", back_populates="users")
     
     def soft_delete(self):
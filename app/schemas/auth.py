@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from typing import Optional, List, Dict, Any
+from datetime import datetime
 
 
 class Token(BaseModel):
@@ -49,3 +50,38 @@ class RegisterResponse(BaseModel):
 class VerifyAccountRequest(BaseModel):
     email: EmailStr
     otp_code: str = Field(..., min_length=6, max_length=6)
+
+
+class RevocationSnapshot(BaseModel):
+    generated_at: datetime
+    revoked_jtis: List[str]
+    token_epochs: Dict[str, int]  # user id -> current token epoch, omitted when 0
+    disabled_users: List[int]
+    default_role_id: Optional[int] = None
+    role_ids: Dict[str, int]  # user id -> role id, omitted for the default role
+
+
+class IntrospectRequest(BaseModel):
+    tokens: List[str] = Field(..., min_length=1, max_length=100)
+
+
+class TokenIntrospection(BaseModel):
+    active: bool
+    claims: Optional[Dict[str, Any]] = None  # only for active tokens
+    reason: Optional[str] = None  # why an inactive token was rejected
+
+
+class IntrospectResponse(BaseModel):
+    results: List[TokenIntrospection]  # same order as the request
+
+
+class SessionResponse(BaseModel):
+    id: str
+    user_agent: Optional[str] = None
+    ip_address: Optional[str] = None
+    created_at: datetime
+    last_seen_at: Optional[datetime] = None
+    expires_at: datetime
+    current: bool = False  # the session of the token making the request
+    
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any, List
+
+
+class ChangeRecord(BaseModel):
+    seq: int
+    type: str
+    id: int
+    op: str  # created, updated, deleted
+    data: Optional[Dict[str, Any]] = None
+
+
+class ChangeFeedResponse(BaseModel):
+    changes: List[ChangeRecord]
+    cursor: str
+    has_more: bool = False
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -17,6 +17,7 @@ class ContentUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
     is_public: Optional[bool] = None
+    version: Optional[int] = None  # expected version for optimistic concurrency
 
 
 class ContentResponse(ContentBase):
@@ -25,6 +26,7 @@ class ContentResponse(ContentBase):
     is_published: bool
     is_moderated: bool
     moderation_status: str
+    version: int
     created_at: datetime
     updated_at: datetime
     
@@ -32,6 +34,46 @@ class ContentResponse(ContentBase):
         from_attributes = True
 
 
+class ContentSearchResponse(BaseModel):
+    items: List[ContentResponse]
+    next_cursor: Optional[str] = None
+
+
+class ModerationClaimResponse(BaseModel):
+    items: List[ContentResponse]
+    lease_expires_at: Optional[datetime] = None
+
+
+class ModerationEvent(BaseModel):
+    """Payload of moderation stream events"""
+    id: int
+    title: str
+    author_id: int
+    is_public: bool
+    moderation_status: str
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 class ContentModeration(BaseModel):
     status: str  # approved, rejected
     reason: Optional[str] = None
+
+
+class ContentBulkModeration(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=10000)
+    status: str  # approved, rejected
+    reason: Optional[str] = None
+
+
+class BulkModerationResult(BaseModel):
+    id: int
+    outcome: str  # moderated, not_found
+
+
+class BulkModerationResponse(BaseModel):
+    status: str
+    moderated: int
+    results: List[BulkModerationResult]
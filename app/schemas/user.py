@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import Optional
+from typing import Optional, List, Literal
 from datetime import datetime
 from app.schemas.role import RoleResponse
 
@@ -24,12 +24,37 @@ class UserUpdate(BaseModel):
     username: Optional[str] = Field(None, min_length=3, max_length=50)
     full_name: Optional[str] = None
     password: Optional[str] = Field(None, min_length=8, max_length=100)
+    version: Optional[int] = None  # expected version for optimistic concurrency
 
 
 class UserUpdateRole(BaseModel):
     role_id: int
 
 
+class UserBulkFilter(BaseModel):
+    role_id: Optional[int] = None
+    is_active: Optional[bool] = None
+    is_verified: Optional[bool] = None
+    email_domain: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+
+class UserBulkAction(BaseModel):
+    action: Literal["activate", "deactivate", "delete", "set_role"]
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=100000)
+    filter: Optional[UserBulkFilter] = None
+    role_id: Optional[int] = None  # required for set_role
+    revoke_tokens: bool = True
+
+
+class UserBulkResult(BaseModel):
+    action: str
+    matched: int
+    updated: int
+    skipped_ids: List[int] = []
+
+
 class UserResponse(UserBase):
     id: int
     role_id: int
@@ -37,6 +62,7 @@ class UserResponse(UserBase):
     is_active: bool
     is_verified: bool
     is_deleted: bool
+    version: int
     created_at: datetime
     updated_at: datetime
     
@@ -1,8 +1,14 @@
 from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
+from sqlalchemy import insert
+from typing import Optional, Dict, Any, List
 from app.models.audit_log import AuditLog
+from app.schemas.audit_log import AuditLogResponse
+from app.core.pubsub import get_topic, publish_on_commit
 from app.core.logger import logger
 
+# Pub/sub topic feeding the live audit tail
+AUDIT_TOPIC = "audit"
+
 
 class AuditService:
     
@@ -34,9 +40,56 @@ class AuditService:
         db.commit()
         db.refresh(audit_log)
         
+        get_topic(AUDIT_TOPIC).publish(
+            "audit_log",
+            AuditLogResponse.model_validate(audit_log).model_dump(mode="json")
+        )
+        
         logger.info(
             f"Audit log created: {action} by user {user_id} on {resource} "
             f"({resource_id}) - Status: {status}"
         )
         
         return audit_log
+    
+    @staticmethod
+    def log_actions(db: Session, entries: List[Dict[str, Any]], commit: bool = True) -> int:
+        """Log many actions with a single multi-row insert.
+        
+        Each entry takes the same keys as log_action. With commit=False the
+        rows join the caller's transaction.
+        """
+        if not entries:
+            return 0
+        
+        rows = [
+            {
+                "user_id": entry.get("user_id"),
+                "action": entry["action"],
+                "resource": entry.get("resource"),
+                "resource_id": entry.get("resource_id"),
+                "details": entry.get("details"),
+                "ip_address": entry.get("ip_address"),
+                "user_agent": entry.get("user_agent"),
+                "status": entry.get("status", "success")
+            }
+            for entry in entries
+        ]
+        inserted = db.execute(
+            insert(AuditLog).returning(AuditLog.id, AuditLog.created_at, sort_by_parameter_order=True),
+            rows
+        ).all()
+        
+        for row, (audit_id, created_at) in zip(rows, inserted):
+            publish_on_commit(
+                db,
+                AUDIT_TOPIC,
+                "audit_log",
+                AuditLogResponse(id=audit_id, created_at=created_at, **row).model_dump(mode="json")
+            )
+        
+        if commit:
+            db.commit()
+        
+        logger.info(f"Audit logs created: {len(rows)} x {rows[0]['action']}")
+        return len(rows)
@@ -1,21 +1,33 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import update
 from fastapi import HTTPException, status
-from typing import Optional
-from datetime import datetime, timedelta
+from typing import Optional, List
+from jwt import InvalidTokenError
+from datetime import datetime, timedelta, timezone
+import uuid
 
 from app.models.user import User
 from app.models.role import Role
-from app.models.otp import OTP
+from app.models.blacklisted_token import BlacklistedToken
+from app.models.session import UserSession
 from app.core.security import (
     verify_password,
     get_password_hash,
     create_access_token,
     create_refresh_token,
-    decode_token,
+    verify_token,
     generate_otp
 )
 from app.schemas.auth import RegisterRequest, VerifyAccountRequest
+from app.core.config import settings
 from app.core.logger import logger
+from app.services.change_feed_service import ChangeFeedService
+from app.services.permission_service import PermissionService
+from app.services.user_cache_service import UserCacheService
+from app.services.token_blacklist_service import TokenBlacklistService
+from app.services.audit_service import AuditService
+from app.services.otp_service import OTPService
+from app.core.invalidation import invalidation_bus
 
 
 class AuthService:
@@ -43,28 +55,53 @@ class AuthService:
         return user
     
     @staticmethod
-    def create_tokens(user_id: int, db: Session) -> dict:
-        """Create access and refresh tokens with extended payload"""
-        # Get user details
-        user = db.query(User).filter(User.id == user_id).first()
+    def create_tokens(
+        user_id: int,
+        db: Session,
+        user_agent: Optional[str] = None,
+        ip_address: Optional[str] = None
+    ) -> dict:
+        """Start a new session (refresh-token family) and issue its first token pair"""
+        user = UserCacheService.get_principal(db, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
-        # Get user role and permissions
-        user_role = db.query(Role).filter(Role.id == user.role_id).first()
-        permissions = []
-        if user_role:
-            permissions = [perm.name for perm in user_role.permissions] if hasattr(user_role, 'permissions') else []
+        session_id = uuid.uuid4().hex
+        refresh_jti = str(uuid.uuid4())
+        db.add(UserSession(
+            id=session_id,
+            user_id=user_id,
+            current_jti=refresh_jti,
+            expires_at=AuthService._session_expiry(),
+            user_agent=user_agent,
+            ip_address=ip_address
+        ))
+        db.commit()
         
-        # Create tokens with extended payload
+        return AuthService._issue_tokens(db, user, session_id, refresh_jti)
+    
+    @staticmethod
+    def _session_expiry() -> datetime:
+        return datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    
+    @staticmethod
+    def _issue_tokens(db: Session, user, session_id: str, refresh_jti: str) -> dict:
+        """Sign a token pair for a session; role permissions come from the cached registry"""
+        # Permissions travel as a bitmask tagged with the registry version and
+        # the role it was computed for; it is ignored once the user's role changes
+        registry = PermissionService.get_registry(db)
         token_data = {
-            "sub": str(user_id),
-            "username": user.username,
-            "roles": [user_role.name] if user_role else [],
-            "permissions": permissions
+            "sub": str(user.id),
+            "epoch": user.token_epoch,
+            "sid": session_id
         }
-        access_token = create_access_token(token_data)
-        refresh_token = create_refresh_token(token_data)
+        access_token = create_access_token({
+            **token_data,
+            "rid": user.role_id,
+            "pm": registry.role_masks.get(user.role_id, 0),
+            "pv": registry.version
+        })
+        refresh_token = create_refresh_token(token_data, jti=refresh_jti)
         
         return {
             "access_token": access_token,
@@ -73,30 +110,202 @@ class AuthService:
         }
     
     @staticmethod
-    def refresh_access_token(db: Session, refresh_token: str) -> dict:
-        """Refresh access token using refresh token"""
-        payload = decode_token(refresh_token)
+    def introspect_tokens(db: Session, tokens: List[str]) -> List[dict]:
+        """Check many access tokens with one query each for blacklist, sessions and users.
+        
+        Applies the same rules as get_current_user and returns one
+        {"active", "claims", "reason"} result per token, in order. When the
+        user's role changed after the token was issued, the permission
+        claims are replaced with those of the current role.
+        """
+        results: List[dict] = []
+        verified = []
+        for token in tokens:
+            try:
+                claims = verify_token(token)
+            except InvalidTokenError:
+                results.append({"active": False, "reason": "invalid_token"})
+                continue
+            
+            if claims.get("type") != "access" or claims.get("sub") is None:
+                results.append({"active": False, "reason": "invalid_token"})
+                continue
+            
+            results.append(None)
+            verified.append((len(results) - 1, claims))
         
-        if not payload or payload.get("type") != "refresh":
+        jtis = {claims["jti"] for _, claims in verified if claims.get("jti")}
+        revoked = set()
+        if jtis:
+            revoked = {
+                jti for (jti,) in db.query(BlacklistedToken.token_jti).filter(
+                    BlacklistedToken.token_jti.in_(jtis),
+                    BlacklistedToken.is_revoked == True
+                )
+            }
+        
+        session_ids = {claims["sid"] for _, claims in verified if claims.get("sid")}
+        revoked_sessions = set()
+        if session_ids:
+            revoked_sessions = {
+                session_id for (session_id,) in db.query(UserSession.id).filter(
+                    UserSession.id.in_(session_ids),
+                    UserSession.revoked_at.isnot(None)
+                )
+            }
+        
+        user_ids = {int(claims["sub"]) for _, claims in verified}
+        users = {}
+        if user_ids:
+            users = {
+                row.id: row for row in db.query(
+                    User.id, User.is_active, User.is_deleted, User.token_epoch, User.role_id
+                ).filter(User.id.in_(user_ids))
+            }
+        
+        for index, claims in verified:
+            user = users.get(int(claims["sub"]))
+            if claims.get("jti") in revoked or claims.get("sid") in revoked_sessions:
+                reason = "revoked"
+            elif user is None:
+                reason = "unknown_user"
+            elif not user.is_active or user.is_deleted:
+                reason = "inactive_user"
+            elif claims.get("epoch", 0) != user.token_epoch:
+                reason = "revoked"
+            else:
+                if claims.get("rid") != user.role_id:
+                    registry = PermissionService.get_registry(db)
+                    claims = {
+                        **claims,
+                        "rid": user.role_id,
+                        "pm": registry.role_masks.get(user.role_id, 0),
+                        "pv": registry.version
+                    }
+                results[index] = {"active": True, "claims": claims}
+                continue
+            results[index] = {"active": False, "reason": reason}
+        
+        return results
+    
+    @staticmethod
+    def refresh_access_token(
+        db: Session,
+        refresh_token: str,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> dict:
+        """Rotate a refresh token within its session.
+        
+        Rotation is a single conditional UPDATE that swaps the session's
+        current jti, so of two concurrent refreshes with the same token
+        only one wins. Presenting a jti that is no longer current means the
+        token was replayed (or stolen), and the whole session is revoked.
+        """
+        try:
+            payload = verify_token(refresh_token)
+        except InvalidTokenError:
+            payload = None
+        
+        if not payload or payload.get("type") != "refresh" or not payload.get("jti"):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid refresh token"
             )
         
         user_id = int(payload.get("sub"))
-        user = db.query(User).filter(
-            User.id == user_id,
-            User.is_deleted == False,
-            User.is_active == True
-        ).first()
+        user = UserCacheService.get_principal(db, user_id)
         
-        if not user:
+        if not user or user.is_deleted or not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found or inactive"
             )
         
-        return AuthService.create_tokens(user_id, db)
+        if payload.get("epoch", 0) != user.token_epoch:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+        
+        session_id = payload.get("sid")
+        if session_id is None:
+            return AuthService._upgrade_legacy_refresh_token(db, payload, user_agent, ip_address)
+        
+        new_jti = str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        rotated = db.execute(
+            update(UserSession)
+            .where(
+                UserSession.id == session_id,
+                UserSession.user_id == user_id,
+                UserSession.current_jti == payload["jti"],
+                UserSession.revoked_at.is_(None),
+                UserSession.expires_at > now
+            )
+            .values(
+                current_jti=new_jti,
+                expires_at=AuthService._session_expiry(),
+                ip_address=ip_address,
+                last_seen_at=now
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        
+        if rotated:
+            db.commit()
+            return AuthService._issue_tokens(db, user, session_id, new_jti)
+        
+        # Either the session is already gone, or this jti was rotated away: reuse
+        reused = db.execute(
+            update(UserSession)
+            .where(UserSession.id == session_id, UserSession.revoked_at.is_(None))
+            .values(revoked_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        
+        if reused:
+            logger.warning(f"Refresh token reuse detected for user {user_id}, session {session_id} revoked")
+            AuditService.log_action(
+                db=db,
+                action="refresh_token_reuse",
+                user_id=user_id,
+                resource="auth",
+                resource_id=session_id,
+                ip_address=ip_address,
+                user_agent=user_agent,
+                status="failed"
+            )
+        
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+    
+    @staticmethod
+    def _upgrade_legacy_refresh_token(
+        db: Session,
+        payload: dict,
+        user_agent: Optional[str] = None,
+        ip_address: Optional[str] = None
+    ) -> dict:
+        """Move a refresh token issued before sessions existed onto a new session"""
+        if TokenBlacklistService.is_jti_blacklisted(db, payload["jti"]):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+        
+        user_id = int(payload["sub"])
+        db.add(BlacklistedToken(
+            token_jti=payload["jti"],
+            user_id=user_id,
+            token_type="refresh",
+            expires_at=datetime.fromtimestamp(payload["exp"], timezone.utc),
+            is_revoked=True
+        ))
+        return AuthService.create_tokens(user_id, db, user_agent, ip_address)
     
     @staticmethod
     def register_user(db: Session, user_data: RegisterRequest) -> User:
@@ -125,6 +334,8 @@ class AuthService:
                 existing_user.username = user_data.username
                 existing_user.hashed_password = get_password_hash(user_data.password)
                 existing_user.full_name = user_data.full_name
+                ChangeFeedService.record(db, "user", existing_user.id, "updated")
+                invalidation_bus.user_changed(db, existing_user.id)
                 db.commit()
                 db.refresh(existing_user)
                 return existing_user
@@ -149,6 +360,8 @@ class AuthService:
         )
         
         db.add(new_user)
+        db.flush()
+        ChangeFeedService.record(db, "user", new_user.id, "created")
         db.commit()
         db.refresh(new_user)
         
@@ -176,32 +389,18 @@ class AuthService:
                 detail="Account already verified"
             )
         
-        # Verify OTP
-        otp = db.query(OTP).filter(
-            OTP.email == verify_data.email,
-            OTP.code == verify_data.otp_code,
-            OTP.purpose == "registration",
-            OTP.is_used == False
-        ).order_by(OTP.created_at.desc()).first()
-        
-        if not otp:
+        # Use up the OTP in the same transaction as the activation
+        if not OTPService.consume_otp(db, verify_data.email, verify_data.otp_code, purpose="registration"):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid OTP code"
+                detail="Invalid or expired OTP code"
             )
         
-        if not otp.is_valid():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="OTP code has expired"
-            )
-        
-        # Mark OTP as used
-        otp.mark_as_used()
-        
         # Activate and verify user
         user.is_verified = True
         user.is_active = True
+        ChangeFeedService.record(db, "user", user.id, "updated")
+        invalidation_bus.user_changed(db, user.id)
         db.commit()
         db.refresh(user)
         
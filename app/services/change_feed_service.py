@@ -0,0 +1,152 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import BigInteger, Text, cast, func, insert, tuple_
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Tuple
+
+from app.models.change import Change
+from app.models.content import Content
+from app.models.user import User
+from app.schemas.content import ContentResponse
+from app.schemas.user import UserResponse
+from app.core.config import settings
+from app.core.maintenance import delete_in_batches, maintenance
+
+ENTITY_TYPES = ("user", "content")
+
+Cursor = Tuple[int, int]
+
+
+def _current_txid():
+    # pg_current_xact_id() is an xid8; it goes through text to fit a bigint
+    return cast(cast(func.pg_current_xact_id(), Text), BigInteger)
+
+
+def _completed_below():
+    # Every transaction with a lower id has committed or rolled back
+    return cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+class ChangeFeedService:
+    """Service for the incremental change feed.
+
+    Mutations record a row in ``changes`` inside their own transaction, so
+    the feed only ever contains committed changes. On PostgreSQL each row
+    also records its transaction id, and rows are only served once every
+    older transaction has finished; the cursor is the (txid, id) of the
+    last row served, so a long transaction that commits after younger ones
+    is picked up instead of skipped.
+    """
+
+    @staticmethod
+    def parse_cursor(value: str) -> Cursor:
+        """Parse a cursor from a response; plain ids from older responses are accepted.
+
+        Raises ValueError for anything else.
+        """
+        txid, _, change_id = value.rpartition(".")
+        cursor = (int(txid or 0), int(change_id))
+        if cursor[0] < 0 or cursor[1] < 0:
+            raise ValueError(value)
+        return cursor
+
+    @staticmethod
+    def format_cursor(cursor: Cursor) -> str:
+        txid, change_id = cursor
+        return f"{txid}.{change_id}" if txid else str(change_id)
+
+    @staticmethod
+    def record(db: Session, entity_type: str, entity_id: int, operation: str = "updated"):
+        """Record a change as part of the caller's transaction"""
+        change = Change(entity_type=entity_type, entity_id=entity_id, operation=operation)
+        if _is_postgres(db):
+            change.txid = _current_txid()
+        db.add(change)
+
+    @staticmethod
+    def record_many(db: Session, entity_type: str, entity_ids: Iterable[int], operation: str = "updated"):
+        """Record many changes with one multi-row insert"""
+        rows = [
+            {"entity_type": entity_type, "entity_id": entity_id, "operation": operation}
+            for entity_id in entity_ids
+        ]
+        if rows:
+            statement = insert(Change)
+            if _is_postgres(db):
+                statement = statement.values(txid=_current_txid())
+            db.execute(statement, rows)
+
+    @staticmethod
+    def current_cursor(db: Session) -> str:
+        """Cursor positioned after every change that can no longer be skipped"""
+        if _is_postgres(db):
+            # Changes of transactions still running are ahead of it, even
+            # if younger transactions already committed theirs
+            return ChangeFeedService.format_cursor((db.query(_completed_below()).scalar(), 0))
+        return ChangeFeedService.format_cursor((0, db.query(func.max(Change.id)).scalar() or 0))
+
+    @staticmethod
+    def get_changes(db: Session, since: Cursor, types: List[str], limit: int = 500) -> dict:
+        """Changes after ``since``, collapsed to the latest state per entity.
+
+        On PostgreSQL only rows of transactions older than the oldest one
+        still running are returned: every row ordered before them is then
+        final. SQLite serializes writers, so rows already commit in id order.
+        """
+        query = db.query(Change).filter(
+            tuple_(Change.txid, Change.id) > tuple_(*since),
+            Change.entity_type.in_(types)
+        )
+        if _is_postgres(db):
+            query = query.filter(Change.txid < _completed_below())
+        rows = query.order_by(Change.txid, Change.id).limit(limit + 1).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # Keep only the latest change per entity, ordered by that change
+        latest = {}
+        for row in rows:
+            latest.pop((row.entity_type, row.entity_id), None)
+            latest[(row.entity_type, row.entity_id)] = row
+
+        states = {}
+        user_ids = [entity_id for entity_type, entity_id in latest if entity_type == "user"]
+        if user_ids:
+            for user in db.query(User).filter(User.id.in_(user_ids)).all():
+                states[("user", user.id)] = UserResponse.model_validate(user).model_dump(mode="json")
+
+        content_ids = [entity_id for entity_type, entity_id in latest if entity_type == "content"]
+        if content_ids:
+            for content in db.query(Content).filter(Content.id.in_(content_ids)).all():
+                if not content.is_deleted:
+                    states[("content", content.id)] = ContentResponse.model_validate(content).model_dump(mode="json")
+
+        changes = [
+            {
+                "seq": row.id,
+                "type": row.entity_type,
+                "id": row.entity_id,
+                "op": row.operation,
+                "data": states.get(key)
+            }
+            for key, row in latest.items()
+        ]
+
+        return {
+            "changes": changes,
+            "cursor": ChangeFeedService.format_cursor((rows[-1].txid, rows[-1].id) if rows else since),
+            "has_more": has_more
+        }
+
+    @staticmethod
+    def cleanup_old_changes(db: Session) -> int:
+        """Delete changes older than CHANGE_FEED_RETENTION_DAYS"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.CHANGE_FEED_RETENTION_DAYS)
+        return delete_in_batches(db, Change, Change.created_at < cutoff)
+
+
+maintenance.register("changes", ChangeFeedService.cleanup_old_changes)
@@ -0,0 +1,118 @@
+from sqlalchemy.orm import Session
+from typing import Iterable, Optional
+
+from app.schemas.content import ContentResponse
+from app.core.cache import LRUCache
+from app.core.etag import make_version_etag
+from app.core.invalidation import invalidation_bus, CONTENT_CHANGED
+from app.core.config import settings
+
+# Sentinel stored for ids that do not exist (or are deleted)
+_NOT_FOUND = object()
+
+
+class CachedContent:
+    """Serialized ContentResponse plus the fields needed for access checks.
+
+    ``body`` is None for version-only lookups that skipped serialization.
+    """
+
+    __slots__ = ("author_id", "is_public", "etag", "body")
+
+    def __init__(self, author_id: int, is_public: bool, etag: str, body: Optional[bytes] = None):
+        self.author_id = author_id
+        self.is_public = is_public
+        self.etag = etag
+        self.body = body
+
+
+def _sizeof(value) -> int:
+    if value is _NOT_FOUND:
+        return 64
+    return 128 + len(value.body)
+
+
+_cache = LRUCache(
+    "content",
+    maxsize=settings.CONTENT_CACHE_SIZE,
+    ttl=settings.CONTENT_CACHE_TTL_SECONDS,
+    sizeof=_sizeof
+)
+
+
+def _on_content_changed(content_id: Optional[int]):
+    if content_id is None:
+        _cache.clear()
+    else:
+        _cache.delete(content_id)
+
+
+invalidation_bus.subscribe(CONTENT_CHANGED, _on_content_changed)
+
+
+class ContentCacheService:
+    """Process-local read cache for single content lookups.
+
+    Writers publish content_changed on the invalidation bus in the same
+    transaction as the change, which evicts the entry on every worker
+    once that transaction commits.
+    """
+
+    @staticmethod
+    def get_content(db: Session, content_id: int) -> Optional[CachedContent]:
+        """Get serialized content by ID, loading it on a miss"""
+        from app.services.content_service import ContentService
+
+        cached = _cache.get(content_id)
+        if cached is not None:
+            return None if cached is _NOT_FOUND else cached
+
+        generation = _cache.generation
+        content = ContentService.get_content_by_id(db, content_id)
+
+        if not content:
+            _cache.set(
+                content_id,
+                _NOT_FOUND,
+                ttl=settings.CONTENT_CACHE_NEGATIVE_TTL_SECONDS,
+                generation=generation
+            )
+            return None
+
+        entry = CachedContent(
+            author_id=content.author_id,
+            is_public=content.is_public,
+            etag=make_version_etag("content", content.id, content.version),
+            body=ContentResponse.model_validate(content).model_dump_json().encode()
+        )
+        _cache.set(content_id, entry, generation=generation)
+        return entry
+
+    @staticmethod
+    def get_version(db: Session, content_id: int) -> Optional[CachedContent]:
+        """Get access-check fields and ETag without loading the content body"""
+        from app.services.content_service import ContentService
+
+        cached = _cache.get(content_id)
+        if cached is not None:
+            return None if cached is _NOT_FOUND else cached
+
+        row = ContentService.get_content_version(db, content_id)
+        if not row:
+            return None
+
+        return CachedContent(
+            author_id=row.author_id,
+            is_public=row.is_public,
+            etag=make_version_etag("content", row.id, row.version)
+        )
+
+    @staticmethod
+    def invalidate(db: Session, content_id: int):
+        """Invalidate as part of the caller's transaction"""
+        invalidation_bus.content_changed(db, content_id)
+
+    @staticmethod
+    def invalidate_many(db: Session, content_ids: Iterable[int]):
+        """Invalidate many ids; PostgreSQL packs them into a few NOTIFY payloads sent by one statement"""
+        invalidation_bus.publish(db, CONTENT_CHANGED, content_ids)
@@ -1,13 +1,25 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, update, select, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import Integer
 from fastapi import HTTPException, status
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 
 from app.models.content import Content
 from app.models.user import User
-from app.schemas.content import ContentCreate, ContentUpdate
+from app.schemas.content import ContentCreate, ContentUpdate, ModerationEvent
+from app.services.search_service import ContentSearchService
+from app.services.user_service import UserService
+from app.services.content_cache_service import ContentCacheService
+from app.services.change_feed_service import ChangeFeedService
+from app.core.pubsub import publish_on_commit
+from app.core.config import settings
 from app.core.logger import logger
 
+# Pub/sub topic feeding the live moderation queue
+MODERATION_TOPIC = "moderation"
+
 
 class ContentService:
     """Service for managing content operations"""
@@ -23,6 +35,11 @@ class ContentService:
         )
         
         db.add(content)
+        db.flush()
+        ContentSearchService.index_content(db, content)
+        ContentCacheService.invalidate(db, content.id)
+        ChangeFeedService.record(db, "content", content.id, "created")
+        ContentService._publish_moderation_event(db, "content_created", content)
         db.commit()
         db.refresh(content)
         
@@ -39,6 +56,20 @@ class ContentService:
         
         return query.first()
     
+    @staticmethod
+    def get_content_version(db: Session, content_id: int):
+        """Get only the columns needed for access checks and ETags"""
+        return db.query(
+            Content.id,
+            Content.author_id,
+            Content.is_public,
+            Content.version,
+            Content.updated_at
+        ).filter(
+            Content.id == content_id,
+            Content.is_deleted.is_(False)
+        ).first()
+    
     @staticmethod
     def get_contents(
         db: Session, 
@@ -63,41 +94,71 @@ class ContentService:
         return query.offset(skip).limit(limit).all()
     
     @staticmethod
-    def update_content(db: Session, content_id: int, content_data: ContentUpdate, user_id: int) -> Content:
-        """Update content (only by author or admin)"""
-        content = ContentService.get_content_by_id(db, content_id)
+    def update_content(
+        db: Session,
+        content_id: int,
+        content_data: ContentUpdate,
+        user_id: int,
+        expected_version: Optional[int] = None
+    ) -> Content:
+        """Update content (only by author or admin).
+        
+        Ownership and the optional version check are part of a single
+        conditional UPDATE, so concurrent edits cannot overwrite each other.
+        """
+        update_data = content_data.dict(exclude_unset=True, exclude={"version"})
+        
+        if expected_version is None:
+            expected_version = content_data.version
+        
+        stmt = update(Content).where(
+            Content.id == content_id,
+            Content.is_deleted.is_(False),
+            or_(Content.author_id == user_id, UserService.is_admin_clause(user_id))
+        )
+        if expected_version is not None:
+            stmt = stmt.where(Content.version == expected_version)
+        
+        update_data["version"] = Content.version + 1
+        content = db.execute(
+            stmt.values(**update_data).returning(Content).execution_options(synchronize_session=False)
+        ).scalars().first()
         
         if not content:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Content not found"
-            )
+            db.rollback()
+            ContentService._raise_update_failure(db, content_id, user_id)
         
-        # Check if user is author or admin
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
+        if "title" in update_data or "content" in update_data:
+            ContentSearchService.index_content(db, content)
+        
+        ContentCacheService.invalidate(db, content.id)
+        ChangeFeedService.record(db, "content", content.id, "updated")
+        db.commit()
+        db.refresh(content)
+        
+        logger.info(f"Content updated: {content.title} by user {user_id}")
+        return content
+    
+    @staticmethod
+    def _raise_update_failure(db: Session, content_id: int, user_id: int):
+        """Explain why a conditional content UPDATE matched no row"""
+        version = ContentService.get_content_version(db, content_id)
+        if not version:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
+                detail="Content not found"
             )
         
-        # Only author or admin can update
-        if content.author_id != user_id and user.role.name != "admin":
+        if version.author_id != user_id and not db.query(UserService.is_admin_clause(user_id)).scalar():
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to update this content"
             )
         
-        # Update fields
-        update_data = content_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(content, field, value)
-        
-        db.commit()
-        db.refresh(content)
-        
-        logger.info(f"Content updated: {content.title} by user {user_id}")
-        return content
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Content was modified by another request"
+        )
     
     @staticmethod
     def delete_content(db: Session, content_id: int, user_id: int) -> Content:
@@ -127,6 +188,10 @@ class ContentService:
         
         # Soft delete
         content.soft_delete()
+        ContentSearchService.remove_content(db, content.id)
+        ContentCacheService.invalidate(db, content.id)
+        ChangeFeedService.record(db, "content", content.id, "deleted")
+        ContentService._publish_moderation_event(db, "content_deleted", content)
         db.commit()
         
         logger.info(f"Content deleted: {content.title} by user {user_id}")
@@ -145,8 +210,97 @@ class ContentService:
         
         # Moderate content
         content.moderate(moderation_data.status)
+        ContentCacheService.invalidate(db, content.id)
+        ChangeFeedService.record(db, "content", content.id, "updated")
+        ContentService._publish_moderation_event(db, "content_moderated", content)
         db.commit()
         db.refresh(content)
         
         logger.info(f"Content moderated: {content.title} by user {moderator_id} - Status: {moderation_data.status}")
         return content
+    
+    @staticmethod
+    def bulk_moderate_content(db: Session, content_ids: List[int], moderation_status: str) -> List[Tuple[int, str]]:
+        """Moderate many items with one set-based UPDATE (caller commits).
+        
+        Applies the same column changes as Content.moderate and returns
+        (id, title) for every row that was updated; missing or deleted ids
+        are simply absent from the result.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            id_filter = Content.id == any_(bindparam("content_ids", content_ids, type_=ARRAY(Integer)))
+        else:
+            id_filter = Content.id.in_(content_ids)
+        
+        values = Content.moderation_values(moderation_status)
+        values["version"] = Content.version + 1
+        
+        rows = db.execute(
+            update(Content)
+            .where(id_filter, Content.is_deleted.is_(False))
+            .values(**values)
+            .returning(
+                Content.id, Content.title, Content.author_id, Content.is_public,
+                Content.moderation_status, Content.created_at
+            )
+            .execution_options(synchronize_session=False)
+        ).all()
+        
+        moderated = [(row.id, row.title) for row in rows]
+        ContentCacheService.invalidate_many(db, [content_id for content_id, _ in moderated])
+        ChangeFeedService.record_many(db, "content", [content_id for content_id, _ in moderated])
+        for row in rows:
+            ContentService._publish_moderation_event(db, "content_moderated", row)
+        
+        logger.info(f"Bulk moderated {len(moderated)}/{len(content_ids)} content items - Status: {moderation_status}")
+        return moderated
+    
+    @staticmethod
+    def _publish_moderation_event(db: Session, name: str, content):
+        """Queue a moderation stream event for when the transaction commits"""
+        publish_on_commit(
+            db,
+            MODERATION_TOPIC,
+            name,
+            ModerationEvent.model_validate(content).model_dump(mode="json")
+        )
+    
+    @staticmethod
+    def claim_pending_content(db: Session, moderator_id: int, limit: int = 10) -> List[Content]:
+        """Lease the next pending items to a moderator.
+        
+        Claiming is a single UPDATE over a subquery that walks the partial
+        pending-queue index. On PostgreSQL the subquery uses FOR UPDATE SKIP
+        LOCKED so concurrent moderators never block on or receive the same
+        rows; SQLite serializes writers, so the same statement is atomic there.
+        """
+        now = datetime.now(timezone.utc)
+        lease_expires_at = now + timedelta(seconds=settings.MODERATION_LEASE_SECONDS)
+        
+        candidates = select(Content.id).where(
+            Content.moderation_status == "pending",
+            Content.is_deleted.is_(False),
+            or_(Content.claim_expires_at.is_(None), Content.claim_expires_at < now)
+        ).order_by(Content.created_at, Content.id).limit(limit)
+        
+        if db.get_bind().dialect.name == "postgresql":
+            candidates = candidates.with_for_update(skip_locked=True)
+        
+        claimed = db.execute(
+            update(Content)
+            .where(Content.id.in_(candidates.scalar_subquery()))
+            .values(claimed_by=moderator_id, claim_expires_at=lease_expires_at)
+            .returning(Content)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        
+        # RETURNING has no order; sort in queue order, then detach the rows
+        # so the commit does not expire them and reading them costs no
+        # refresh SELECT per row
+        claimed.sort(key=lambda content: (content.created_at, content.id))
+        for content in claimed:
+            db.expunge(content)
+        db.commit()
+        
+        logger.info(f"Moderator {moderator_id} claimed {len(claimed)} pending content items")
+        return claimed
@@ -8,6 +8,7 @@ from pathlib import Path
 
 from app.core.config import settings
 from app.core.logger import logger
+from app.core.metrics import emails_in_flight, emails_sent
 
 
 class EmailService:
@@ -32,6 +33,7 @@ class EmailService:
             logger.error("SMTP credentials not configured")
             return False
         
+        emails_in_flight.inc()
         try:
             # Create message
             message = MIMEMultipart("alternative")
@@ -58,11 +60,15 @@ class EmailService:
                 server.send_message(message)
             
             logger.info(f"Email sent successfully to {to_email}")
+            emails_sent.labels("sent").inc()
             return True
             
         except Exception as e:
             logger.error(f"Failed to send email to {to_email}: {str(e)}")
+            emails_sent.labels("failed").inc()
             return False
+        finally:
+            emails_in_flight.dec()
     
     @staticmethod
     async def send_otp_email(to_email: str, otp_code: str, purpose: str = "registration") -> bool:
@@ -0,0 +1,204 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logger import logger
+
+# Distinct (email, IP) pairs aggregated between flushes; beyond this,
+# suppressed attempts are folded into one summary without an email
+MAX_PENDING_SUMMARIES = 10000
+
+
+class LoginThrottle:
+    """Exponential backoff after failed logins, per email and per client IP.
+
+    Failures are counted in memory. Once a key is past its free attempts,
+    every further failure doubles the time before the next attempt is
+    allowed (up to LOGIN_THROTTLE_MAX_DELAY_SECONDS), and attempts inside
+    that window are rejected before the password hash is checked.
+    Rejected attempts are not written one by one: they are counted per
+    email and IP and a background thread writes one ``login_throttled``
+    audit row per pair every LOGIN_THROTTLE_SUMMARY_SECONDS.
+
+    State is per process, so each worker enforces its own backoff.
+    """
+
+    def __init__(self):
+        self._failures: Dict[str, List[float]] = {}  # key -> [failures, blocked until, last failure]
+        self._suppressed: Dict[Tuple[Optional[str], Optional[str]], list] = {}  # -> [attempts, first, last, user agent]
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {"failures": 0, "suppressed": 0, "summaries_written": 0, "flush_errors": 0}
+
+    @staticmethod
+    def _keys(email: str, ip_address: Optional[str]) -> List[Tuple[str, int]]:
+        keys = [(f"email:{email.lower()}", settings.LOGIN_THROTTLE_FREE_ATTEMPTS)]
+        if ip_address:
+            keys.append((f"ip:{ip_address}", settings.LOGIN_THROTTLE_FREE_ATTEMPTS_PER_IP))
+        return keys
+
+    @staticmethod
+    def _delay(failures: float, free_attempts: int) -> float:
+        # Nothing for the free failures, then 1x, 2x, 4x ... the base delay
+        if failures <= free_attempts:
+            return 0.0
+        return min(
+            settings.LOGIN_THROTTLE_BASE_DELAY_SECONDS * 2 ** (failures - free_attempts - 1),
+            settings.LOGIN_THROTTLE_MAX_DELAY_SECONDS
+        )
+
+    def acquire(self, email: str, ip_address: Optional[str] = None) -> float:
+        """Seconds to wait before this attempt may run, 0 if it may run now.
+
+        An allowed attempt on a key that is already backing off claims the
+        next window, so concurrent requests cannot all slip through while
+        the first one is being checked.
+        """
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return 0.0
+
+        now = time.monotonic()
+        keys = self._keys(email, ip_address)
+        with self._lock:
+            wait = 0.0
+            for key, _ in keys:
+                entry = self._failures.get(key)
+                if entry is not None:
+                    wait = max(wait, entry[1] - now)
+            if wait > 0:
+                return wait
+
+            for key, free_attempts in keys:
+                entry = self._failures.get(key)
+                if entry is None or now - entry[2] >= settings.LOGIN_THROTTLE_RESET_SECONDS:
+                    continue
+                if entry[0] >= free_attempts:
+                    entry[1] = now + self._delay(entry[0] + 1, free_attempts)
+        return 0.0
+
+    def record_failure(self, email: str, ip_address: Optional[str] = None):
+        """Count a wrong password and start or extend the backoff"""
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            for key, free_attempts in self._keys(email, ip_address):
+                entry = self._failures.get(key)
+                if entry is None or now - entry[2] >= settings.LOGIN_THROTTLE_RESET_SECONDS:
+                    entry = self._failures[key] = [0, 0.0, now]
+                entry[0] += 1
+                entry[1] = now + self._delay(entry[0], free_attempts)
+                entry[2] = now
+            self.stats["failures"] += 1
+
+    def record_success(self, email: str):
+        """Clear the email's failures; the IP keeps its count until it decays"""
+        with self._lock:
+            self._failures.pop(f"email:{email.lower()}", None)
+
+    def suppress(self, email: str, ip_address: Optional[str] = None, user_agent: Optional[str] = None):
+        """Count a rejected attempt towards the next summary row"""
+        now = time.time()
+        key = (email.lower(), ip_address)
+        with self._lock:
+            self.stats["suppressed"] += 1
+            summary = self._suppressed.get(key)
+            if summary is None:
+                if len(self._suppressed) >= MAX_PENDING_SUMMARIES:
+                    key = (None, None)
+                    summary = self._suppressed.get(key)
+                if summary is None:
+                    summary = self._suppressed[key] = [0, now, now, user_agent]
+            summary[0] += 1
+            summary[2] = now
+
+    def flush(self) -> int:
+        """Write one audit row per (email, IP) with suppressed attempts"""
+        with self._lock:
+            pending, self._suppressed = self._suppressed, {}
+        if not pending:
+            return 0
+
+        from app.db.base import SessionLocal
+        from app.services.audit_service import AuditService
+
+        entries = [
+            {
+                "action": "login_throttled",
+                "resource": "auth",
+                "details": {
+                    "email": email,
+                    "attempts": attempts,
+                    "first_attempt_at": datetime.fromtimestamp(first, timezone.utc).isoformat(),
+                    "last_attempt_at": datetime.fromtimestamp(last, timezone.utc).isoformat()
+                },
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "status": "failed"
+            }
+            for (email, ip_address), (attempts, first, last, user_agent) in pending.items()
+        ]
+        db = SessionLocal()
+        try:
+            written = AuditService.log_actions(db, entries)
+            self.stats["summaries_written"] += written
+            return written
+        except Exception as e:
+            db.rollback()
+            self.stats["flush_errors"] += 1
+            logger.error(f"Error writing login throttle summaries: {str(e)}")
+            # Merge back into whatever was suppressed meanwhile
+            with self._lock:
+                for key, (attempts, first, last, user_agent) in pending.items():
+                    summary = self._suppressed.setdefault(key, [0, first, last, user_agent])
+                    summary[0] += attempts
+                    summary[1] = min(summary[1], first)
+            return 0
+        finally:
+            db.close()
+
+    def sweep(self) -> int:
+        """Forget keys whose failures have decayed"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                key for key, (_, blocked_until, last) in self._failures.items()
+                if blocked_until <= now and now - last >= settings.LOGIN_THROTTLE_RESET_SECONDS
+            ]
+            for key in expired:
+                del self._failures[key]
+        return len(expired)
+
+    def _run(self):
+        while not self._stop.wait(settings.LOGIN_THROTTLE_SUMMARY_SECONDS):
+            self.flush()
+            self.sweep()
+
+    def start(self):
+        """Start the summary thread (once per process)"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="login-throttle", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the summary thread and write what is left"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        stats["tracked_keys"] = len(self._failures)
+        stats["pending_summaries"] = len(self._suppressed)
+        return stats
+
+
+login_throttle = LoginThrottle()
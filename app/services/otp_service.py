@@ -1,44 +1,66 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from datetime import datetime
-import asyncio
+from typing import Optional
 
-from app.models.otp import OTP
+from app.core.config import settings
+from app.core.counters import Cooldown, SlidingWindowCounter, shared_client
 from app.core.security import generate_otp
 from app.core.logger import logger
+from app.core.maintenance import maintenance
+from app.core.otp_store import get_otp_store
+
+_limits_client = shared_client()
+
+# Verify attempts per email+purpose and per IP, checked before any DB work
+_verify_attempts = SlidingWindowCounter("otp_verify", settings.OTP_VERIFY_WINDOW_SECONDS, _limits_client)
+_verify_attempts_by_ip = SlidingWindowCounter("otp_verify_ip", settings.OTP_VERIFY_WINDOW_SECONDS, _limits_client)
+
+# Send requests per IP, and the resend cooldown per email+purpose
+_sends_by_ip = SlidingWindowCounter("otp_send_ip", settings.OTP_SEND_WINDOW_SECONDS, _limits_client)
+_resend_cooldown = Cooldown("otp_resend", settings.OTP_RESEND_COOLDOWN_SECONDS, _limits_client)
+
+
+def _too_many(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=detail)
 
 
 class OTPService:
     
     @staticmethod
-    async def create_otp(db: Session, email: str, purpose: str = "registration") -> OTP:
-        """Create a new OTP for the given email"""
-        # Invalidate any existing unused OTPs for this email and purpose
-        existing_otps = db.query(OTP).filter(
-            OTP.email == email,
-            OTP.purpose == purpose,
-            OTP.is_used == False
-        ).all()
-        
-        for otp in existing_otps:
-            otp.mark_as_used()
+    async def create_otp(
+        db: Session,
+        email: str,
+        purpose: str = "registration",
+        ip_address: Optional[str] = None
+    ) -> bool:
+        """Create a new OTP for the given email, replacing any outstanding one.
+        
+        Within OTP_RESEND_COOLDOWN_SECONDS of the previous code nothing is
+        stored or mailed and the pending code stays valid; returns whether
+        a new code was issued. The cooldown only covers codes that were
+        actually mailed, so a failed store write or send leaves the next
+        resend free to try again.
+        """
+        if ip_address:
+            OTPService.check_send_allowed(ip_address)
+        
+        cooldown_key = f"{purpose}:{email}"
+        if not _resend_cooldown.acquire(cooldown_key):
+            logger.info(f"OTP resend for {email} coalesced with the pending code")
+            return False
         
-        # Generate new OTP
         code = generate_otp()
-        new_otp = OTP(
-            email=email,
-            code=code,
-            purpose=purpose,
-            expires_at=OTP.calculate_expiry()
-        )
-        
-        db.add(new_otp)
-        db.commit()
-        db.refresh(new_otp)
+        try:
+            get_otp_store().issue(db, email, purpose, code, settings.OTP_EXPIRE_MINUTES * 60)
+            db.commit()
+        except Exception:
+            _resend_cooldown.reset(cooldown_key)
+            raise
         
         logger.info(f"OTP created for {email} with purpose {purpose}")
         
         # Send OTP via email
+        email_sent = False
         try:
             from app.services.email_service import EmailService
             email_sent = await EmailService.send_otp_email(email, code, purpose)
@@ -49,53 +71,52 @@ class OTPService:
         except Exception as e:
             logger.error(f"Error sending OTP email: {str(e)}")
         
+        if not email_sent:
+            _resend_cooldown.reset(cooldown_key)
+        
         # Also log for development (REMOVE IN PRODUCTION!)
         logger.debug(f"OTP Code for {email}: {code}")
-        
-        return new_otp
+        return True
     
     @staticmethod
-    def verify_otp(db: Session, email: str, code: str, purpose: str = "registration") -> bool:
-        """Verify an OTP code"""
-        otp = db.query(OTP).filter(
-            OTP.email == email,
-            OTP.code == code,
-            OTP.purpose == purpose,
-            OTP.is_used == False
-        ).order_by(OTP.created_at.desc()).first()
-        
-        if not otp:
-            logger.warning(f"Invalid OTP attempt for {email}")
-            return False
-        
-        if not otp.is_valid():
-            logger.warning(f"Expired OTP attempt for {email}")
-            return False
-        
-        return True
+    def check_send_allowed(ip_address: str):
+        """Count an OTP send for the IP; raise 429 once it is over OTP_SEND_MAX_PER_IP"""
+        if _sends_by_ip.hit(ip_address) > settings.OTP_SEND_MAX_PER_IP:
+            logger.warning(f"OTP send limit reached for IP {ip_address}")
+            raise _too_many("Too many OTP requests, please try again later")
+    
+    @staticmethod
+    def check_verify_allowed(email: str, purpose: str, ip_address: Optional[str] = None):
+        """Count a verify attempt; raise 429 once the email or IP is over its limit"""
+        over_email = _verify_attempts.hit(f"{purpose}:{email}") > settings.OTP_VERIFY_MAX_ATTEMPTS
+        over_ip = bool(ip_address) and _verify_attempts_by_ip.hit(ip_address) > settings.OTP_VERIFY_MAX_ATTEMPTS_PER_IP
+        
+        if over_email or over_ip:
+            logger.warning(f"OTP verify limit reached for {email} ({ip_address})")
+            raise _too_many("Too many verification attempts, please try again later")
+    
+    @staticmethod
+    def consume_otp(db: Session, email: str, code: str, purpose: str = "registration") -> bool:
+        """Use up an OTP code; False if it is wrong, expired or already used.
+        
+        With the SQL store the removal is part of the caller's transaction.
+        """
+        if get_otp_store().consume(db, email, purpose, code):
+            # A fresh start for this email: no lockout, and the next request sends a new code
+            _verify_attempts.reset(f"{purpose}:{email}")
+            _resend_cooldown.reset(f"{purpose}:{email}")
+            return True
+        
+        logger.warning(f"Invalid or expired OTP attempt for {email}")
+        return False
     
     @staticmethod
     async def verify_otp(db: Session, email: str, code: str, purpose: str = "registration"):
         """Verify an OTP code and return user"""
         from app.models.user import User
         
-        otp = db.query(OTP).filter(
-            OTP.email == email,
-            OTP.code == code,
-            OTP.purpose == purpose,
-            OTP.is_used == False
-        ).order_by(OTP.created_at.desc()).first()
-        
-        if not otp:
-            logger.warning(f"Invalid OTP attempt for {email}")
-            return None
-        
-        if not otp.is_valid():
-            logger.warning(f"Expired OTP attempt for {email}")
+        if not OTPService.consume_otp(db, email, code, purpose):
             return None
-        
-        # Mark OTP as used
-        otp.mark_as_used()
         db.commit()
         
         # Get user
@@ -103,16 +124,9 @@ class OTPService:
         return user
     
     @staticmethod
-    def mark_otp_used(db: Session, email: str, code: str, purpose: str = "registration"):
-        """Mark an OTP as used"""
-        otp = db.query(OTP).filter(
-            OTP.email == email,
-            OTP.code == code,
-            OTP.purpose == purpose,
-            OTP.is_used == False
-        ).first()
-        
-        if otp:
-            otp.mark_as_used()
-            db.commit()
-            logger.info(f"OTP marked as used for {email}")
+    def cleanup_expired_otps(db: Session) -> int:
+        """Delete expired OTPs the store does not expire by itself"""
+        return get_otp_store().cleanup(db)
+
+
+maintenance.register("otps", OTPService.cleanup_expired_otps)
@@ -1,21 +1,65 @@
 from sqlalchemy.orm import Session
-from app.models.permission import Permission
+from sqlalchemy import func
+from typing import Dict, Iterable, Optional
+from app.models.permission import Permission, PermissionRegistryVersion
 from app.models.role import Role
 from app.models.role_permission import role_permissions
+from app.core.cache import LRUCache
+from app.core.invalidation import invalidation_bus, ROLE_CHANGED
+from app.core.config import settings
 from app.core.logger import logger
 
 
+class PermissionRegistry:
+    """Snapshot of permission bits and per-role masks.
+    
+    Each permission owns a stable bit, so a set of permissions travels in a
+    token as one integer and a check is a single AND. ``version`` changes
+    whenever bits or role grants change; masks minted under another version
+    are not trusted.
+    """
+    
+    __slots__ = ("version", "flags", "role_masks")
+    
+    def __init__(self, version: int, flags: Dict[str, int], role_masks: Dict[int, int]):
+        self.version = version
+        self.flags = flags
+        self.role_masks = role_masks
+    
+    def mask_for(self, names: Iterable[str]) -> int:
+        mask = 0
+        for name in names:
+            mask |= self.flags.get(name, 0)
+        return mask
+    
+    def names_for(self, mask: int) -> list:
+        return [name for name, flag in self.flags.items() if mask & flag]
+
+
+_registry_cache = LRUCache(
+    "permission_registry",
+    maxsize=1,
+    ttl=settings.PERMISSION_REGISTRY_TTL_SECONDS,
+    sizeof=lambda registry: 64 * (len(registry.flags) + len(registry.role_masks))
+)
+
+invalidation_bus.subscribe(ROLE_CHANGED, lambda role_id: _registry_cache.clear())
+
+
 class PermissionService:
     """Service for managing permissions and role-permission relationships"""
     
     @staticmethod
     def create_permission(db: Session, name: str, description: str = None) -> Permission:
-        """Create a new permission"""
+        """Create a new permission with the next free mask bit"""
+        last_bit = db.query(func.max(Permission.bit)).scalar()
         permission = Permission(
             name=name,
-            description=description
+            description=description,
+            bit=0 if last_bit is None else last_bit + 1
         )
         db.add(permission)
+        PermissionService.bump_registry_version(db)
         db.commit()
         db.refresh(permission)
         logger.info(f"Permission created: {name}")
@@ -35,6 +79,8 @@ class PermissionService:
         if role and permission:
             if permission not in role.permissions:
                 role.permissions.append(permission)
+                PermissionService.bump_registry_version(db)
+                invalidation_bus.role_changed(db, role.id)
                 db.commit()
                 logger.info(f"Permission '{permission_name}' assigned to role '{role_name}'")
             # Remove the warning log to reduce noise
@@ -52,6 +98,69 @@ class PermissionService:
         
         return [perm.name for perm in user.role.permissions]
     
+    @staticmethod
+    def bump_registry_version(db: Session):
+        """Invalidate masks issued so far (caller commits)"""
+        updated = db.query(PermissionRegistryVersion).filter(
+            PermissionRegistryVersion.id == 1
+        ).update(
+            {PermissionRegistryVersion.version: PermissionRegistryVersion.version + 1},
+            synchronize_session=False
+        )
+        if not updated:
+            db.add(PermissionRegistryVersion(id=1, version=1))
+    
+    @staticmethod
+    def get_registry(db: Session) -> PermissionRegistry:
+        """Current permission registry, cached per process"""
+        registry = _registry_cache.get("registry")
+        if registry is not None:
+            return registry
+        
+        generation = _registry_cache.generation
+        version = db.query(PermissionRegistryVersion.version).filter(
+            PermissionRegistryVersion.id == 1
+        ).scalar() or 0
+        
+        flags = {
+            name: 1 << bit
+            for name, bit in db.query(Permission.name, Permission.bit).filter(Permission.bit.isnot(None))
+        }
+        
+        role_masks: Dict[int, int] = {}
+        grants = db.query(role_permissions.c.role_id, Permission.bit).join(
+            Permission, Permission.id == role_permissions.c.permission_id
+        ).filter(Permission.bit.isnot(None))
+        for role_id, bit in grants:
+            role_masks[role_id] = role_masks.get(role_id, 0) | (1 << bit)
+        
+        registry = PermissionRegistry(version, flags, role_masks)
+        _registry_cache.set("registry", registry, generation=generation)
+        return registry
+    
+    @staticmethod
+    def has_permission(
+        db: Session,
+        role_id: int,
+        permission: str,
+        mask: Optional[int] = None,
+        registry_version: Optional[int] = None
+    ) -> bool:
+        """Check a permission with one AND.
+        
+        Uses the mask carried by the token when it was issued under the
+        current registry version, otherwise the role's current mask.
+        """
+        registry = PermissionService.get_registry(db)
+        flag = registry.flags.get(permission)
+        if not flag:
+            return False
+        
+        if mask is None or registry_version != registry.version:
+            mask = registry.role_masks.get(role_id, 0)
+        
+        return bool(mask & flag)
+    
     @staticmethod
     def initialize_default_permissions(db: Session):
         """Initialize default permissions for the system"""
@@ -4,6 +4,7 @@ from typing import Optional, List
 
 from app.models.role import Role
 from app.schemas.role import RoleCreate, RoleUpdate
+from app.core.invalidation import invalidation_bus
 from app.core.logger import logger
 
 
@@ -76,6 +77,7 @@ class RoleService:
         if role_data.is_active is not None:
             role.is_active = role_data.is_active
         
+        invalidation_bus.role_changed(db, role.id)
         db.commit()
         db.refresh(role)
         
@@ -102,6 +104,7 @@ class RoleService:
             )
         
         role.is_active = False
+        invalidation_bus.role_changed(db, role.id)
         db.commit()
         db.refresh(role)
         
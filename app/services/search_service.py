@@ -0,0 +1,166 @@
+import base64
+import json
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, and_, func, literal_column, table, column, text
+from fastapi import HTTPException, status
+from typing import List, Optional, Tuple
+
+from app.models.content import Content
+from app.core.logger import logger
+
+# Text search configuration used for the PostgreSQL tsvector column
+SEARCH_CONFIG = "english"
+
+# FTS5 virtual table used on SQLite (created alongside the contents table)
+contents_fts = table("contents_fts", column("rowid"), column("title"), column("content"))
+
+
+class ContentSearchService:
+    """Service for indexing and searching content"""
+
+    @staticmethod
+    def _dialect(db: Session) -> str:
+        return db.get_bind().dialect.name
+
+    @staticmethod
+    def index_content(db: Session, content: Content):
+        """Add or refresh a content row in the search index (caller commits)"""
+        dialect = ContentSearchService._dialect(db)
+
+        if dialect == "postgresql":
+            db.execute(
+                text(
+                    "UPDATE contents SET search_vector = "
+                    "setweight(to_tsvector(CAST(:config AS regconfig), coalesce(:title, '')), 'A') || "
+                    "setweight(to_tsvector(CAST(:config AS regconfig), coalesce(:body, '')), 'B') "
+                    "WHERE id = :id"
+                ),
+                {"config": SEARCH_CONFIG, "title": content.title, "body": content.content, "id": content.id}
+            )
+        elif dialect == "sqlite":
+            db.execute(text("DELETE FROM contents_fts WHERE rowid = :id"), {"id": content.id})
+            db.execute(
+                text("INSERT INTO contents_fts (rowid, title, content) VALUES (:id, :title, :body)"),
+                {"id": content.id, "title": content.title, "body": content.content}
+            )
+
+    @staticmethod
+    def remove_content(db: Session, content_id: int):
+        """Remove a content row from the search index (caller commits)"""
+        dialect = ContentSearchService._dialect(db)
+
+        if dialect == "postgresql":
+            db.execute(text("UPDATE contents SET search_vector = NULL WHERE id = :id"), {"id": content_id})
+        elif dialect == "sqlite":
+            db.execute(text("DELETE FROM contents_fts WHERE rowid = :id"), {"id": content_id})
+
+    @staticmethod
+    def rebuild_index(db: Session) -> int:
+        """Rebuild the search index from all non-deleted content"""
+        dialect = ContentSearchService._dialect(db)
+
+        if dialect == "sqlite":
+            db.execute(text("DELETE FROM contents_fts"))
+
+        contents = db.query(Content).filter(Content.is_deleted.is_(False)).all()
+        for content in contents:
+            ContentSearchService.index_content(db, content)
+        db.commit()
+
+        logger.info(f"Search index rebuilt with {len(contents)} content rows")
+        return len(contents)
+
+    @staticmethod
+    def encode_cursor(score: float, content_id: int) -> str:
+        """Encode a keyset cursor from the last row of a page"""
+        raw = json.dumps({"s": score, "id": content_id}).encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[float, int]:
+        """Decode a keyset cursor"""
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return float(data["s"]), int(data["id"])
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    @staticmethod
+    def _fts5_query(q: str) -> str:
+        """Quote each term so user input is never parsed as FTS5 syntax"""
+        terms = [term.replace('"', '""') for term in q.split()]
+        return " ".join(f'"{term}"' for term in terms if term)
+
+    @staticmethod
+    def search(
+        db: Session,
+        q: str,
+        user_id: int,
+        is_privileged: bool = False,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Content], Optional[str]]:
+        """Ranked full-text search with keyset pagination.
+
+        Visibility follows get_content_by_id: deleted content is never
+        returned, and non-privileged users only see their own content plus
+        public content that has not been rejected by moderation.
+        """
+        dialect = ContentSearchService._dialect(db)
+
+        if dialect == "postgresql":
+            ts_query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'"), q)
+            search_vector = literal_column("contents.search_vector")
+            score = func.ts_rank_cd(search_vector, ts_query)
+            query = db.query(Content, score.label("score")).filter(search_vector.op("@@")(ts_query))
+        elif dialect == "sqlite":
+            match = ContentSearchService._fts5_query(q)
+            if not match:
+                return [], None
+            # bm25() is lower-is-better, negate it so both backends sort descending
+            score = -func.bm25(literal_column("contents_fts"))
+            query = (
+                db.query(Content, score.label("score"))
+                .join(contents_fts, contents_fts.c.rowid == Content.id)
+                .filter(literal_column("contents_fts").op("MATCH")(match))
+            )
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail=f"Search is not supported on {dialect}"
+            )
+
+        query = query.filter(Content.is_deleted.is_(False))
+
+        if not is_privileged:
+            query = query.filter(
+                or_(
+                    Content.author_id == user_id,
+                    and_(
+                        Content.is_public.is_(True),
+                        Content.moderation_status != "rejected"
+                    )
+                )
+            )
+
+        if cursor:
+            last_score, last_id = ContentSearchService.decode_cursor(cursor)
+            query = query.filter(
+                or_(
+                    score < last_score,
+                    and_(score == last_score, Content.id < last_id)
+                )
+            )
+
+        rows = query.order_by(score.desc(), Content.id.desc()).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_content, last_score = rows[-1]
+            next_cursor = ContentSearchService.encode_cursor(last_score, last_content.id)
+
+        return [content for content, _ in rows], next_cursor
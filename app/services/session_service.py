@@ -0,0 +1,170 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, or_, update
+from sqlalchemy.orm import Session
+
+from app.models.session import UserSession
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.maintenance import delete_in_batches, maintenance
+
+
+class SessionActivityTracker:
+    """Coalesces session last-seen times in memory.
+
+    Every authenticated request only records a timestamp in a dict; a
+    background thread writes the latest value per session in one batched
+    UPDATE every SESSION_LAST_SEEN_FLUSH_SECONDS. Activity recorded since
+    the last flush is lost if the process dies, which only makes
+    last_seen_at slightly older than it should be.
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {"touched": 0, "flushed": 0, "flush_errors": 0}
+
+    def touch(self, session_id: str):
+        """Record activity on a session"""
+        with self._lock:
+            self._pending[session_id] = time.time()
+            self.stats["touched"] += 1
+
+    def last_seen(self, session_id: str) -> Optional[datetime]:
+        """Activity recorded here but not written yet"""
+        seen = self._pending.get(session_id)
+        return datetime.fromtimestamp(seen, timezone.utc) if seen else None
+
+    def flush(self) -> int:
+        """Write pending activity, one row per session"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        from app.db.base import SessionLocal
+
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(UserSession.__table__)
+                .where(UserSession.__table__.c.id == bindparam("session_id"))
+                .values(last_seen_at=bindparam("seen_at")),
+                [
+                    {"session_id": session_id, "seen_at": datetime.fromtimestamp(seen, timezone.utc)}
+                    for session_id, seen in pending.items()
+                ]
+            )
+            db.commit()
+            self.stats["flushed"] += len(pending)
+            return len(pending)
+        except Exception as e:
+            db.rollback()
+            self.stats["flush_errors"] += 1
+            logger.error(f"Error flushing session activity: {str(e)}")
+            # Put it back unless newer activity arrived meanwhile
+            with self._lock:
+                for session_id, seen in pending.items():
+                    self._pending.setdefault(session_id, seen)
+            return 0
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop.wait(settings.SESSION_LAST_SEEN_FLUSH_SECONDS):
+            self.flush()
+
+    def start(self):
+        """Start the flush thread (once per process)"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="session-activity", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flush thread and write what is left"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        stats["pending"] = len(self._pending)
+        return stats
+
+
+session_activity = SessionActivityTracker()
+
+
+class SessionService:
+    """Login sessions (refresh-token families) of a user"""
+
+    @staticmethod
+    def list_sessions(db: Session, user_id: int) -> List[UserSession]:
+        """Active sessions of a user, most recently used first"""
+        sessions = db.query(UserSession).filter(
+            UserSession.user_id == user_id,
+            UserSession.revoked_at.is_(None),
+            UserSession.expires_at > datetime.now(timezone.utc)
+        ).all()
+
+        for session in sessions:
+            db.expunge(session)
+            # Prefer activity this worker has not flushed yet
+            pending = session_activity.last_seen(session.id)
+            if pending is not None:
+                session.last_seen_at = pending
+
+        sessions.sort(key=lambda s: _as_utc(s.last_seen_at or s.created_at), reverse=True)
+        return sessions
+
+    @staticmethod
+    def revoke_session(db: Session, session_id: str, user_id: int) -> bool:
+        """Revoke one of ``user_id``'s sessions with a single UPDATE.
+
+        Its refresh token can no longer rotate and get_current_user
+        rejects access tokens that carry its id.
+        """
+        revoked = db.execute(
+            update(UserSession)
+            .where(
+                UserSession.id == session_id,
+                UserSession.user_id == user_id,
+                UserSession.revoked_at.is_(None)
+            )
+            .values(revoked_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return bool(revoked)
+
+    @staticmethod
+    def cleanup_sessions(db: Session) -> int:
+        """Delete expired sessions, and revoked ones once their access tokens have expired.
+
+        A revoked session must outlive its access tokens, since
+        get_current_user rejects them by finding the revoked row.
+        """
+        now = datetime.now(timezone.utc)
+        revoked_before = now - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        return delete_in_batches(
+            db,
+            UserSession,
+            or_(UserSession.expires_at < now, UserSession.revoked_at < revoked_before)
+        )
+
+
+maintenance.register("user_sessions", SessionService.cleanup_sessions)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
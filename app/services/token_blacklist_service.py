@@ -1,13 +1,17 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, exists, func, or_, select, update
 from datetime import datetime
 from typing import Optional
-import jwt
+from jwt import ExpiredSignatureError
 from fastapi import HTTPException, status
 
 from app.models.blacklisted_token import BlacklistedToken
-from app.core.config import settings
+from app.models.user import User
+from app.models.role import Role
+from app.models.session import UserSession
+from app.core.security import verify_token
 from app.core.logger import logger
+from app.core.maintenance import delete_in_batches, maintenance
 
 
 class TokenBlacklistService:
@@ -18,7 +22,7 @@ class TokenBlacklistService:
         """Add token to blacklist"""
         try:
             # Decode token to get JTI, expiration, and user_id
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            payload = verify_token(token)
             jti = payload.get("jti")
             exp = payload.get("exp")
             token_user_id = payload.get("sub")
@@ -61,7 +65,7 @@ class TokenBlacklistService:
             logger.info(f"Token blacklisted for user {final_user_id}, JTI: {jti}")
             return blacklisted_token
             
-        except jwt.ExpiredSignatureError:
+        except ExpiredSignatureError:
             # Token is already expired, no need to blacklist
             logger.info(f"Token already expired for user {final_user_id if 'final_user_id' in locals() else 'unknown'}")
             return None
@@ -77,44 +81,103 @@ class TokenBlacklistService:
         """Check if token is blacklisted"""
         try:
             # Decode token to get JTI
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-            jti = payload.get("jti")
-            
-            if not jti:
-                return False
-            
-            # Check if token is blacklisted
-            blacklisted = db.query(BlacklistedToken).filter(
-                and_(
-                    BlacklistedToken.token_jti == jti,
-                    BlacklistedToken.is_revoked == True
-                )
-            ).first()
+            payload = verify_token(token)
+            return TokenBlacklistService.is_jti_blacklisted(db, payload.get("jti"))
             
-            return blacklisted is not None
-            
-        except jwt.ExpiredSignatureError:
+        except ExpiredSignatureError:
             # Token is expired, consider it invalid
             return True
         except Exception as e:
             logger.error(f"Error checking token blacklist: {str(e)}")
             return False
     
+    @staticmethod
+    def is_jti_blacklisted(db: Session, jti: Optional[str]) -> bool:
+        """Check if a token ID is blacklisted"""
+        if not jti:
+            return False
+        
+        blacklisted = db.query(BlacklistedToken.id).filter(
+            and_(
+                BlacklistedToken.token_jti == jti,
+                BlacklistedToken.is_revoked == True
+            )
+        ).first()
+        
+        return blacklisted is not None
+    
+    @staticmethod
+    def is_token_revoked(db: Session, jti: Optional[str], session_id: Optional[str] = None) -> bool:
+        """Check a token's jti and its session in one round trip"""
+        checks = []
+        if jti:
+            checks.append(exists().where(
+                BlacklistedToken.token_jti == jti,
+                BlacklistedToken.is_revoked == True
+            ))
+        if session_id:
+            checks.append(exists().where(
+                UserSession.id == session_id,
+                UserSession.revoked_at.isnot(None)
+            ))
+        if not checks:
+            return False
+        
+        return bool(db.execute(select(or_(*checks))).scalar())
+    
+    @staticmethod
+    def get_revocation_snapshot(db: Session) -> dict:
+        """Everything a local verifier needs to reject revoked tokens.
+        
+        Revoked jtis that have not expired yet, token epochs that differ
+        from the default, users whose tokens must be refused outright, and
+        the role of every user not on the default role, so tokens issued
+        before a role change can be told apart.
+        """
+        revoked_jtis = db.query(BlacklistedToken.token_jti).filter(
+            BlacklistedToken.is_revoked == True,
+            BlacklistedToken.expires_at > datetime.utcnow()
+        ).order_by(BlacklistedToken.token_jti).all()
+        
+        epochs = db.query(User.id, User.token_epoch).filter(User.token_epoch != 0).order_by(User.id).all()
+        
+        disabled = db.query(User.id).filter(
+            (User.is_active == False) | (User.is_deleted == True)
+        ).order_by(User.id).all()
+        
+        default_role_id = db.query(Role.id).filter(Role.name == "user").scalar()
+        roles = db.query(User.id, User.role_id)
+        if default_role_id is not None:
+            roles = roles.filter(User.role_id != default_role_id)
+        roles = roles.order_by(User.id).all()
+        
+        return {
+            "generated_at": datetime.utcnow(),
+            "revoked_jtis": [jti for (jti,) in revoked_jtis],
+            "token_epochs": {str(user_id): epoch for user_id, epoch in epochs},
+            "disabled_users": [user_id for (user_id,) in disabled],
+            "default_role_id": default_role_id,
+            "role_ids": {str(user_id): role_id for user_id, role_id in roles}
+        }
+    
     @staticmethod
     def revoke_all_user_tokens(db: Session, user_id: int) -> int:
-        """Revoke all tokens for a user"""
+        """Revoke all tokens for a user by ending every session.
+        
+        Tokens are checked against their session, so this also covers
+        tokens that were never blacklisted individually.
+        """
         try:
-            # Mark all user tokens as revoked
-            updated = db.query(BlacklistedToken).filter(
-                and_(
-                    BlacklistedToken.user_id == user_id,
-                    BlacklistedToken.is_revoked is False
-                )
-            ).update({"is_revoked": True})
+            updated = db.execute(
+                update(UserSession)
+                .where(UserSession.user_id == user_id, UserSession.revoked_at.is_(None))
+                .values(revoked_at=func.now())
+                .execution_options(synchronize_session=False)
+            ).rowcount
             
             db.commit()
             
-            logger.info(f"Revoked {updated} tokens for user {user_id}")
+            logger.info(f"Revoked {updated} sessions for user {user_id}")
             return updated
             
         except Exception as e:
@@ -126,18 +189,8 @@ class TokenBlacklistService:
     
     @staticmethod
     def cleanup_expired_tokens(db: Session) -> int:
-        """Clean up expired tokens from blacklist"""
-        try:
-            # Delete expired tokens
-            deleted = db.query(BlacklistedToken).filter(
-                BlacklistedToken.expires_at < datetime.utcnow()
-            ).delete()
-            
-            db.commit()
-            
-            logger.info(f"Cleaned up {deleted} expired tokens")
-            return deleted
-            
-        except Exception as e:
-            logger.error(f"Error cleaning up expired tokens: {str(e)}")
-            return 0
+        """Clean up expired tokens from blacklist, in bounded batches"""
+        return delete_in_batches(db, BlacklistedToken, BlacklistedToken.expires_at < datetime.utcnow())
+
+
+maintenance.register("blacklisted_tokens", TokenBlacklistService.cleanup_expired_tokens)
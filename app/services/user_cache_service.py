@@ -0,0 +1,109 @@
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.models.user import User
+from app.core.cache import LRUCache
+from app.core.invalidation import invalidation_bus, USER_CHANGED
+from app.core.config import settings
+
+
+class UserPrincipal:
+    """Compact view of a user for authenticating requests.
+
+    Only the fields needed to accept or reject a token are stored. Any
+    other attribute (email, role, ...) loads the full User row from the
+    bound session on first access, so handlers that need more than the id
+    keep working unchanged.
+    """
+
+    __slots__ = (
+        "id", "role_id", "is_active", "is_deleted", "token_epoch",
+        "permission_mask", "registry_version", "_db", "_user"
+    )
+
+    def __init__(
+        self,
+        id: int,
+        role_id: int,
+        is_active: bool,
+        is_deleted: bool,
+        token_epoch: int,
+        db: Optional[Session] = None,
+        permission_mask: Optional[int] = None,
+        registry_version: Optional[int] = None
+    ):
+        self.id = id
+        self.role_id = role_id
+        self.is_active = is_active
+        self.is_deleted = is_deleted
+        self.token_epoch = token_epoch
+        self.permission_mask = permission_mask
+        self.registry_version = registry_version
+        self._db = db
+        self._user = None
+
+    def bind(
+        self,
+        db: Session,
+        permission_mask: Optional[int] = None,
+        registry_version: Optional[int] = None
+    ) -> "UserPrincipal":
+        """Copy bound to a request session and token claims (cached instances stay unbound)"""
+        return UserPrincipal(
+            self.id, self.role_id, self.is_active, self.is_deleted, self.token_epoch,
+            db, permission_mask, registry_version
+        )
+
+    def __getattr__(self, name):
+        # Only reached for attributes that are not slots
+        if name.startswith("_") or self._db is None:
+            raise AttributeError(name)
+        if self._user is None:
+            self._user = self._db.get(User, self.id)
+        return getattr(self._user, name)
+
+
+_cache = LRUCache(
+    "user_principal",
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+    sizeof=lambda value: 96
+)
+
+
+def _on_user_changed(user_id: Optional[int]):
+    if user_id is None:
+        _cache.clear()
+    else:
+        _cache.delete(user_id)
+
+
+invalidation_bus.subscribe(USER_CHANGED, _on_user_changed)
+
+
+class UserCacheService:
+    """Process-local cache of user principals for get_current_user.
+
+    Account changes publish user_changed on the invalidation bus, which
+    evicts the entry on every worker. The TTL bounds staleness if a
+    message is missed.
+    """
+
+    @staticmethod
+    def get_principal(db: Session, user_id: int) -> Optional[UserPrincipal]:
+        """Get the principal for a user ID, loading it on a miss"""
+        principal = _cache.get(user_id)
+        if principal is not None:
+            return principal
+
+        generation = _cache.generation
+        row = db.query(
+            User.id, User.role_id, User.is_active, User.is_deleted, User.token_epoch
+        ).filter(User.id == user_id).first()
+
+        if not row:
+            return None
+
+        principal = UserPrincipal(row.id, row.role_id, row.is_active, row.is_deleted, row.token_epoch)
+        _cache.set(user_id, principal, generation=generation)
+        return principal
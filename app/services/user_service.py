@@ -1,12 +1,18 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import update, exists, or_
 from fastapi import HTTPException, status
-from typing import Optional, List
+from typing import Optional, List, Iterator
+from datetime import datetime
 
 from app.models.user import User
 from app.models.role import Role
-from app.schemas.user import UserCreate, UserUpdate, UserUpdateRole
+from app.schemas.user import UserCreate, UserUpdate, UserUpdateRole, UserBulkAction
 from app.core.security import get_password_hash
+from app.core.etag import make_version_etag
+from app.core.config import settings
 from app.core.logger import logger
+from app.services.change_feed_service import ChangeFeedService
+from app.core.invalidation import invalidation_bus, USER_CHANGED
 
 
 class UserService:
@@ -19,6 +25,34 @@ class UserService:
             query = query.filter(User.is_deleted == False)
         return query.first()
     
+    @staticmethod
+    def is_admin_clause(user_id: int):
+        """SQL condition that holds when the given user has the admin role"""
+        actor = aliased(User)
+        return exists().where(
+            actor.id == user_id,
+            actor.role_id == Role.id,
+            Role.name == "admin"
+        )
+    
+    @staticmethod
+    def user_etag(user: User) -> str:
+        """ETag for a user response (includes the nested role)"""
+        return make_version_etag("user", user.id, user.version, user.role.updated_at if user.role else None)
+    
+    @staticmethod
+    def get_user_etag(db: Session, user_id: int) -> Optional[str]:
+        """Compute a user's ETag from version columns only, without loading the row"""
+        row = db.query(User.id, User.version, Role.updated_at).outerjoin(
+            Role, Role.id == User.role_id
+        ).filter(
+            User.id == user_id,
+            User.is_deleted == False
+        ).first()
+        if not row:
+            return None
+        return make_version_etag("user", row[0], row[1], row[2])
+    
     @staticmethod
     def get_user_by_email(db: Session, email: str, include_deleted: bool = False) -> Optional[User]:
         """Get user by email"""
@@ -90,6 +124,8 @@ class UserService:
         )
         
         db.add(new_user)
+        db.flush()
+        ChangeFeedService.record(db, "user", new_user.id, "created")
         db.commit()
         db.refresh(new_user)
         
@@ -97,45 +133,104 @@ class UserService:
         return new_user
     
     @staticmethod
-    def update_user(db: Session, user_id: int, user_data: UserUpdate) -> User:
-        """Update user information"""
-        user = UserService.get_user_by_id(db, user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
+    def update_user(
+        db: Session,
+        user_id: int,
+        user_data: UserUpdate,
+        actor_id: Optional[int] = None,
+        expected_version: Optional[int] = None
+    ) -> User:
+        """Update user information.
+        
+        The write is a single conditional UPDATE: when ``actor_id`` is given
+        it only applies if the actor is the user or an admin, and when
+        ``expected_version`` is given it only applies to that version.
+        """
+        # Authorize before anything else, so the uniqueness checks below
+        # cannot be used to probe for other users' emails or usernames
+        if actor_id is not None and actor_id != user_id:
+            if not db.query(UserService.is_admin_clause(actor_id)).scalar():
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not authorized to update this user"
+                )
+        
+        values = {}
         
         # Check email uniqueness if being updated
-        if user_data.email and user_data.email != user.email:
-            if UserService.get_user_by_email(db, user_data.email):
+        if user_data.email:
+            existing = UserService.get_user_by_email(db, user_data.email)
+            if existing and existing.id != user_id:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Email already in use"
                 )
-            user.email = user_data.email
+            values["email"] = user_data.email
         
         # Check username uniqueness if being updated
-        if user_data.username and user_data.username != user.username:
-            if UserService.get_user_by_username(db, user_data.username):
+        if user_data.username:
+            existing = UserService.get_user_by_username(db, user_data.username)
+            if existing and existing.id != user_id:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Username already taken"
                 )
-            user.username = user_data.username
+            values["username"] = user_data.username
         
         if user_data.full_name is not None:
-            user.full_name = user_data.full_name
+            values["full_name"] = user_data.full_name
         
         if user_data.password:
-            user.hashed_password = get_password_hash(user_data.password)
+            values["hashed_password"] = get_password_hash(user_data.password)
+        
+        if expected_version is None:
+            expected_version = user_data.version
+        
+        stmt = update(User).where(User.id == user_id, User.is_deleted == False)
+        if actor_id is not None:
+            stmt = stmt.where(or_(User.id == actor_id, UserService.is_admin_clause(actor_id)))
+        if expected_version is not None:
+            stmt = stmt.where(User.version == expected_version)
         
+        values["version"] = User.version + 1
+        user = db.execute(
+            stmt.values(**values).returning(User).execution_options(synchronize_session=False)
+        ).scalars().first()
+        
+        if not user:
+            db.rollback()
+            UserService._raise_update_failure(db, user_id, actor_id)
+        
+        ChangeFeedService.record(db, "user", user.id, "updated")
+        invalidation_bus.user_changed(db, user.id)
         db.commit()
         db.refresh(user)
         
         logger.info(f"User updated: {user.email}")
         return user
     
+    @staticmethod
+    def _raise_update_failure(db: Session, user_id: int, actor_id: Optional[int]):
+        """Explain why a conditional user UPDATE matched no row"""
+        if not UserService.get_user_by_id(db, user_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        
+        if actor_id is not None and actor_id != user_id:
+            is_admin = db.query(UserService.is_admin_clause(actor_id)).scalar()
+            if not is_admin:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not authorized to update this user"
+                )
+        
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="User was modified by another request"
+        )
+    
     @staticmethod
     def update_user_role(db: Session, user_id: int, role_data: UserUpdateRole) -> User:
         """Update user role (admin only)"""
@@ -155,6 +250,8 @@ class UserService:
             )
         
         user.role_id = role_data.role_id
+        ChangeFeedService.record(db, "user", user.id, "updated")
+        invalidation_bus.user_changed(db, user.id)
         db.commit()
         db.refresh(user)
         
@@ -172,6 +269,8 @@ class UserService:
             )
         
         user.soft_delete()
+        ChangeFeedService.record(db, "user", user.id, "deleted")
+        invalidation_bus.user_changed(db, user.id)
         db.commit()
         db.refresh(user)
         
@@ -189,6 +288,8 @@ class UserService:
             )
         
         user.is_active = True
+        ChangeFeedService.record(db, "user", user.id, "updated")
+        invalidation_bus.user_changed(db, user.id)
         db.commit()
         db.refresh(user)
         
@@ -206,8 +307,157 @@ class UserService:
             )
         
         user.is_active = False
+        ChangeFeedService.record(db, "user", user.id, "updated")
+        invalidation_bus.user_changed(db, user.id)
         db.commit()
         db.refresh(user)
         
         logger.info(f"User deactivated: {user.email}")
         return user
+    
+    @staticmethod
+    def _resolve_bulk_targets(db: Session, bulk: UserBulkAction, include_deleted: bool) -> List[int]:
+        """Turn an explicit id list or a filter into the list of target ids"""
+        if (bulk.ids is None) == (bulk.filter is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Provide either ids or filter"
+            )
+        
+        if bulk.ids is not None:
+            return list(dict.fromkeys(bulk.ids))
+        
+        criteria = bulk.filter.dict(exclude_none=True)
+        if not criteria:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Filter must contain at least one criterion"
+            )
+        
+        query = db.query(User.id)
+        if not include_deleted:
+            query = query.filter(User.is_deleted == False)
+        if "role_id" in criteria:
+            query = query.filter(User.role_id == criteria["role_id"])
+        if "is_active" in criteria:
+            query = query.filter(User.is_active == criteria["is_active"])
+        if "is_verified" in criteria:
+            query = query.filter(User.is_verified == criteria["is_verified"])
+        if "email_domain" in criteria:
+            query = query.filter(User.email.ilike(f"%@{criteria['email_domain']}"))
+        if "created_after" in criteria:
+            query = query.filter(User.created_at >= criteria["created_after"])
+        if "created_before" in criteria:
+            query = query.filter(User.created_at < criteria["created_before"])
+        
+        return [row.id for row in query.order_by(User.id).all()]
+    
+    @staticmethod
+    def bulk_update_users(
+        db: Session,
+        bulk: UserBulkAction,
+        actor_id: int,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> Iterator[dict]:
+        """Apply an admin action to many users in one transaction.
+        
+        Targets are validated and resolved up front; the returned iterator
+        then runs set-based UPDATEs in chunks of BULK_CHUNK_SIZE, writing
+        the audit rows for each chunk with one insert. Bumping token_epoch
+        in the same UPDATE revokes every outstanding token of the affected
+        users. A progress record is yielded after each chunk and the last
+        record carries ``done=True`` with the summary.
+        """
+        from app.services.audit_service import AuditService
+        
+        values = {}
+        if bulk.action == "activate":
+            values["is_active"] = True
+        elif bulk.action == "deactivate":
+            values["is_active"] = False
+        elif bulk.action == "delete":
+            values.update(is_deleted=True, is_active=False, deleted_at=datetime.utcnow())
+        elif bulk.action == "set_role":
+            if bulk.role_id is None or not db.query(Role.id).filter(Role.id == bulk.role_id).first():
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid role_id"
+                )
+            values["role_id"] = bulk.role_id
+        
+        values["version"] = User.version + 1
+        if bulk.revoke_tokens and bulk.action != "activate":
+            values["token_epoch"] = User.token_epoch + 1
+        
+        # Activation also applies to deleted accounts, as in activate_user
+        include_deleted = bulk.action == "activate"
+        target_ids = UserService._resolve_bulk_targets(db, bulk, include_deleted)
+        
+        # Admins cannot lock themselves out through a bulk action
+        if bulk.action != "activate":
+            target_ids = [user_id for user_id in target_ids if user_id != actor_id]
+        
+        def run() -> Iterator[dict]:
+            total = len(target_ids)
+            updated = set()
+            chunk_size = settings.BULK_CHUNK_SIZE
+            
+            try:
+                for start in range(0, total, chunk_size):
+                    chunk = target_ids[start:start + chunk_size]
+                    
+                    stmt = update(User).where(User.id.in_(chunk))
+                    if not include_deleted:
+                        stmt = stmt.where(User.is_deleted == False)
+                    
+                    chunk_updated = db.execute(
+                        stmt.values(**values).returning(User.id).execution_options(synchronize_session=False)
+                    ).scalars().all()
+                    
+                    AuditService.log_actions(
+                        db,
+                        [
+                            {
+                                "action": f"user_{bulk.action}",
+                                "user_id": actor_id,
+                                "resource": "user",
+                                "resource_id": str(user_id),
+                                "details": {"bulk": True, "role_id": bulk.role_id} if bulk.role_id else {"bulk": True},
+                                "ip_address": ip_address,
+                                "user_agent": user_agent,
+                                "status": "success"
+                            }
+                            for user_id in chunk_updated
+                        ],
+                        commit=False
+                    )
+                    
+                    ChangeFeedService.record_many(
+                        db,
+                        "user",
+                        chunk_updated,
+                        "deleted" if bulk.action == "delete" else "updated"
+                    )
+                    invalidation_bus.publish(db, USER_CHANGED, chunk_updated)
+                    
+                    updated.update(chunk_updated)
+                    processed = min(start + chunk_size, total)
+                    logger.info(f"Bulk {bulk.action}: {processed}/{total} users processed")
+                    yield {"processed": processed, "total": total, "updated": len(updated)}
+                
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            
+            logger.info(f"Bulk {bulk.action} by user {actor_id}: {len(updated)}/{total} users updated")
+            yield {
+                "done": True,
+                "action": bulk.action,
+                "matched": total,
+                "updated": len(updated),
+                "skipped_ids": [user_id for user_id in target_ids if user_id not in updated]
+            }
+        
+        return run()
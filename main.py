@@ -2,17 +2,28 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm.exc import StaleDataError
 from fastapi_pagination import add_pagination
 
 from app.core.config import settings
 from app.core.logger import logger
+from app.core.invalidation import invalidation_bus
+from app.core.maintenance import maintenance
+from app.services.session_service import session_activity
+from app.services.login_throttle_service import login_throttle
+from app.core.metrics import metrics_sampler
 from app.core.exceptions import (
     global_exception_handler,
     validation_exception_handler,
-    sqlalchemy_exception_handler
+    sqlalchemy_exception_handler,
+    stale_data_exception_handler
 )
 from app.middleware.logging import LoggingMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.metrics import MetricsMiddleware
 from app.api.v1.router import api_router
+from app.api.well_known import router as well_known_router
+from app.api.metrics import router as metrics_router
 from app.db.base import Base, engine
 
 # Create database tables (only if database is configured)
@@ -50,6 +61,9 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Add rate limiting (innermost, so CORS headers and request logs cover 429s too)
+app.add_middleware(RateLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -62,13 +76,19 @@ app.add_middleware(
 # Add custom logging middleware
 app.add_middleware(LoggingMiddleware)
 
+# Add request metrics (outermost, so every response is counted and timed)
+app.add_middleware(MetricsMiddleware)
+
 # Add exception handlers
 app.add_exception_handler(Exception, global_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(SQLAlchemyError, sqlalchemy_exception_handler)
+app.add_exception_handler(StaleDataError, stale_data_exception_handler)
 
 # Include API routers
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(well_known_router, tags=["Well-Known"])
+app.include_router(metrics_router, tags=["Monitoring"])
 
 # Add pagination
 add_pagination(app)
@@ -85,12 +105,28 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Startup error: {e}")
         # Don't crash the app if database initialization fails
+    
+    # Receive cache invalidations published by other workers
+    invalidation_bus.start()
+    # Write coalesced session last-seen times periodically
+    session_activity.start()
+    # Write summaries of throttled login attempts periodically
+    login_throttle.start()
+    # Reap expired rows (one worker at a time, behind a leader lock)
+    maintenance.start()
+    # Publish this worker's pool, queue and cache figures for /metrics
+    metrics_sampler.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Shutdown event handler"""
     logger.info(f"Shutting down {settings.APP_NAME}")
+    invalidation_bus.stop()
+    session_activity.stop()
+    login_throttle.stop()
+    maintenance.stop()
+    metrics_sampler.stop()
 
 
 @app.get("/")
@@ -0,0 +1,144 @@
+"""Request latency across log file rotations.
+
+Sends sequential requests through LoggingMiddleware to an endpoint that
+logs one application line, with an app and an access log file small
+enough to rotate during the run. Compares loguru's own synchronous file
+sinks (rotation and zip compression inside the request that crosses the
+size limit) with the BackgroundLogWriter the app uses. The run is
+sequential, so on a single core the writer thread's work lands inside
+whichever requests it overlaps.
+
+    python -m scripts.bench_log_rotation [--requests 60000] [--max-bytes 8000000] [--flush-interval-ms 50]
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import string
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+# Importing the logger creates logs/ in the working directory
+os.chdir(tempfile.mkdtemp(prefix="bench-log-rotation-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware import Middleware  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.log_sinks import BackgroundLogWriter, RotatingFile  # noqa: E402
+from app.core.logger import _is_access, _is_app, log_writer, logger  # noqa: E402
+from app.middleware.logging import LoggingMiddleware  # noqa: E402
+
+APP_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+LOG_DIR = "bench-logs"
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/bench",
+    "raw_path": b"/bench",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+    "client": ("203.0.113.5", 4711),
+    "server": ("bench", 80),
+}
+
+random.seed(1)
+PAYLOAD = "".join(random.choice(string.ascii_letters) for _ in range(200))
+
+
+async def endpoint(request):
+    logger.info(f"handled {PAYLOAD}")
+    return JSONResponse({"ok": True})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+def loguru_sinks(max_bytes: int):
+    for name, log_format, log_filter in (("app", APP_FORMAT, _is_app), ("access", "{message}", _is_access)):
+        logger.add(
+            f"{LOG_DIR}/{name}.log",
+            rotation=max_bytes,
+            compression="zip",
+            format=log_format,
+            filter=log_filter
+        )
+    return None
+
+
+def background_sinks(max_bytes: int):
+    writer = BackgroundLogWriter(
+        max_queue=settings.LOG_QUEUE_SIZE,
+        flush_interval=settings.LOG_FLUSH_INTERVAL_MS / 1000
+    )
+    for name, log_format, log_filter in (("app", APP_FORMAT, _is_app), ("access", "{message}", _is_access)):
+        logger.add(
+            writer.sink(RotatingFile(f"{LOG_DIR}/{name}.log", max_bytes, 10)),
+            format=log_format,
+            filter=log_filter
+        )
+    return writer
+
+
+async def run(label: str, add_sinks, requests: int, max_bytes: int):
+    shutil.rmtree(LOG_DIR, ignore_errors=True)
+    os.makedirs(LOG_DIR)
+    logger.remove()
+    writer = add_sinks(max_bytes)
+    app = Starlette(routes=[Route("/bench", endpoint)], middleware=[Middleware(LoggingMiddleware)])
+
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await app(dict(SCOPE), receive, send)
+        latencies.append(time.perf_counter() - start)
+
+    logger.remove()
+    extra = ""
+    if writer is not None:
+        writer.stop()
+        stats = writer.get_stats()
+        extra = f"  dropped {stats['dropped']}"
+    rotations = sum(1 for name in os.listdir(LOG_DIR) if name.endswith(".zip"))
+
+    latencies.sort()
+    p50, p99, p999 = (latencies[int(len(latencies) * q)] * 1e6 for q in (0.5, 0.99, 0.999))
+    print(
+        f"{label:22s} p50 {p50:6.0f}us  p99 {p99:6.0f}us  "
+        f"p99.9 {p999:7.0f}us  max {latencies[-1] * 1e3:6.1f}ms  "
+        f"rotations {rotations}{extra}"
+    )
+
+
+async def main(requests: int, max_bytes: int):
+    await run("loguru sync rotation", loguru_sinks, requests, max_bytes)
+    await run("background writer", background_sinks, requests, max_bytes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=60000)
+    parser.add_argument("--max-bytes", type=int, default=8 * 1000 * 1000, help="rotation size of each log file")
+    parser.add_argument("--flush-interval-ms", type=int, default=settings.LOG_FLUSH_INTERVAL_MS)
+    args = parser.parse_args()
+    settings.LOG_FLUSH_INTERVAL_MS = args.flush_interval_ms
+
+    log_writer.stop()
+    asyncio.run(main(args.requests, args.max_bytes))
@@ -0,0 +1,130 @@
+"""Per-request overhead of the access log middleware.
+
+Drives a trivial Starlette endpoint in-process, with no middleware, with
+the request logging the app used before (a BaseHTTPMiddleware writing two
+lines per request) and with LoggingMiddleware at several sample rates.
+Log output is discarded, so this measures formatting and dispatch, not
+disk I/O.
+
+    python -m scripts.bench_middleware [--requests 20000] [--rounds 3]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+# Importing the logger creates logs/ in the working directory
+os.chdir(tempfile.mkdtemp(prefix="bench-middleware-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware import Middleware  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.logger import log_writer, logger  # noqa: E402
+from app.middleware.logging import LoggingMiddleware  # noqa: E402
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/bench",
+    "raw_path": b"/bench",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+    "client": ("203.0.113.5", 4711),
+    "server": ("bench", 80),
+}
+
+
+class BaseHTTPLoggingMiddleware(BaseHTTPMiddleware):
+    """The request logging LoggingMiddleware replaced"""
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        logger.info(
+            f"Request: {request.method} {request.url.path} "
+            f"from {request.client.host if request.client else 'unknown'}"
+        )
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logger.info(
+            f"Response: {request.method} {request.url.path} "
+            f"Status: {response.status_code} "
+            f"Duration: {process_time:.3f}s"
+        )
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+async def endpoint(request):
+    return JSONResponse({"ok": True})
+
+
+def receiver():
+    # One empty body, then wait like a client that keeps the connection
+    # open (BaseHTTPMiddleware listens for a disconnect)
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+        sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    return receive
+
+
+async def send(message):
+    pass
+
+
+async def per_request(app, requests: int) -> float:
+    for _ in range(200):
+        await app(dict(SCOPE), receiver(), send)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receiver(), send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main(requests: int, rounds: int):
+    cases = [
+        ("no middleware", None, 1.0),
+        ("BaseHTTPMiddleware, two lines", BaseHTTPLoggingMiddleware, 1.0),
+        ("ASGI, sample rate 1.0", LoggingMiddleware, 1.0),
+        ("ASGI, sample rate 0.1", LoggingMiddleware, 0.1),
+        ("ASGI, sample rate 0", LoggingMiddleware, 0.0),
+    ]
+    for label, middleware, sample_rate in cases:
+        settings.ACCESS_LOG_SAMPLE_RATE = sample_rate
+        app = Starlette(
+            routes=[Route("/bench", endpoint)],
+            middleware=[Middleware(middleware)] if middleware else []
+        )
+        best = min([await per_request(app, requests) for _ in range(rounds)])
+        print(f"{label:32s} {best:7.1f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=3, help="best of this many runs is reported")
+    args = parser.parse_args()
+
+    log_writer.stop()
+    logger.remove()
+    logger.add(lambda message: None, level="DEBUG")
+    asyncio.run(main(args.requests, args.rounds))
@@ -0,0 +1,103 @@
+"""Permission checks with the token bitmask against the alternatives.
+
+Builds an in-memory database with the default roles and permissions and
+an admin user, then reports the access token size with the bitmask
+claims next to a token carrying the permission names, and the cost of
+one check: a name lookup in a list, an AND against the mask,
+PermissionService.has_permission (registry cache included), and the
+per-request user/role/permissions query the mask replaced.
+
+    python -m scripts.bench_permissions [--number 1000000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+# Importing the logger creates logs/ in the working directory
+os.chdir(tempfile.mkdtemp(prefix="bench-permissions-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+import app.models  # noqa: E402,F401
+import app.models.change  # noqa: E402,F401
+import app.models.content  # noqa: E402,F401
+import app.models.role_permission  # noqa: E402,F401
+from app.core.logger import log_writer, logger  # noqa: E402
+from app.core.security import get_password_hash, verify_token  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.models.role import Role  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.auth_service import AuthService  # noqa: E402
+from app.services.permission_service import PermissionService  # noqa: E402
+from app.services.role_service import RoleService  # noqa: E402
+
+PERMISSION = "audit_view"
+
+
+def setup():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    RoleService.initialize_default_roles(db)
+    PermissionService.initialize_default_permissions(db)
+    admin = User(
+        email="admin@example.com",
+        username="admin",
+        hashed_password=get_password_hash("password123"),
+        role_id=db.query(Role.id).filter(Role.name == "admin").scalar(),
+        is_active=True,
+        is_verified=True
+    )
+    db.add(admin)
+    db.commit()
+    return db, admin
+
+
+def per_call(function, number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=3)) / number * 1e9
+
+
+def main(number: int):
+    db, admin = setup()
+    access_token = AuthService.create_tokens(admin.id, db)["access_token"]
+    claims = verify_token(access_token)
+    registry = PermissionService.get_registry(db)
+    names = registry.names_for(claims["pm"])
+
+    # What the token carried before: identity, role and permission names
+    fat_claims = {key: value for key, value in claims.items() if key not in ("rid", "pm", "pv", "sid")}
+    fat_claims.update({"username": admin.username, "roles": ["admin"], "permissions": names})
+    fat_token = jwt.encode(fat_claims, os.environ["SECRET_KEY"], algorithm="HS256")
+
+    print(f"admin role: {len(names)} permissions")
+    print(f"{'access token, permission names':31s} {len(fat_token):8d} bytes")
+    print(f"{'access token, bitmask':31s} {len(access_token):8d} bytes")
+
+    mask, flag, version = claims["pm"], registry.flags[PERMISSION], claims["pv"]
+    role_id, user_id = admin.role_id, admin.id
+    checks = [
+        ("name in list", lambda: PERMISSION in names, number),
+        ("mask & flag", lambda: bool(mask & flag), number),
+        ("has_permission", lambda: PermissionService.has_permission(db, role_id, PERMISSION, mask, version), number // 10),
+        ("user/role/permissions query", lambda: PermissionService.get_user_permissions(db, user_id), number // 500),
+    ]
+    for label, check, iterations in checks:
+        print(f"{label:31s} {per_call(check, max(iterations, 1)):8.0f} ns")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=1000000, help="iterations of the in-memory checks")
+    args = parser.parse_args()
+
+    log_writer.stop()
+    logger.remove()
+    main(args.number)
@@ -0,0 +1,223 @@
+import os
+import socketserver
+import threading
+import time
+
+import pytest
+
+# Settings are read at import time, so these must be set before any app import
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("SEND_EMAIL_ENABLED", "false")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+
+class FakeRedis:
+    """Keys with optional expiry, shared by every connection to a FakeRespServer"""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+        self.password = None
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self.data[key]
+            return None
+        return value
+
+    def execute(self, args, session):
+        name = args[0].upper()
+        self.commands.append([name, *args[1:]])
+        if name == "AUTH":
+            if args[-1] != self.password:
+                return Exception("WRONGPASS invalid username-password pair")
+            session["authenticated"] = True
+            return "OK"
+        if self.password and not session.get("authenticated"):
+            return Exception("NOAUTH Authentication required")
+        if name == "SELECT":
+            session["db"] = int(args[1])
+            return "OK"
+        if name == "PING":
+            return "PONG"
+        if name == "SET":
+            expires_at = None
+            if "PX" in args:
+                expires_at = time.monotonic() + int(args[args.index("PX") + 1]) / 1000
+            self.data[args[1]] = (args[2], expires_at)
+            return "OK"
+        if name == "GET":
+            return self.get(args[1])
+        if name == "DEL":
+            return sum(self.data.pop(key, None) is not None for key in args[1:])
+        if name == "MGET":
+            return [self.get(key) for key in args[1:]]
+        if name == "EVAL":
+            # Only the OTP store's compare-and-delete script
+            script, numkeys = args[1], int(args[2])
+            keys, argv = args[3:3 + numkeys], args[3 + numkeys:]
+            if "GET" in script and "DEL" in script:
+                if self.get(keys[0]) == argv[0]:
+                    del self.data[keys[0]]
+                    return 1
+                return 0
+            return Exception("ERR unsupported script")
+        return Exception(f"ERR unknown command '{name}'")
+
+
+def _encode(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, Exception):
+        return f"-{value}\r\n".encode()
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, list):
+        return f"*{len(value)}\r\n".encode() + b"".join(_encode(item) for item in value)
+    if value in ("OK", "PONG"):
+        return f"+{value}\r\n".encode()
+    data = str(value).encode()
+    return f"${len(data)}\r\n".encode() + data + b"\r\n"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        session = {}
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            assert line.startswith(b"*"), line
+            args = []
+            for _ in range(int(line[1:-2])):
+                length = int(self.rfile.readline()[1:-2])
+                args.append(self.rfile.read(length + 2)[:-2].decode())
+            with server.redis.lock:
+                reply = server.redis.execute(args, session)
+            self.wfile.write(_encode(reply))
+            if server.drop_after_reply:
+                server.drop_after_reply = False
+                return
+
+
+class FakeRespServer(socketserver.ThreadingTCPServer):
+    """Socket-level stand-in speaking enough RESP2 for RespClient and the stores"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.redis = FakeRedis()
+        self.connections = 0
+        self.drop_after_reply = False
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        return f"redis://{host}:{port}/0"
+
+
+class FakeClock:
+    """Stands in for the ``time`` module; both clocks only move on advance()"""
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable clock for the in-memory limiters"""
+    from app.core import counters, token_bucket
+    from app.services import login_throttle_service
+
+    # On a whole hour, so fixed windows start at the current time
+    fake = FakeClock(1_699_200_000.0)
+    for module in (counters, token_bucket, login_throttle_service):
+        monkeypatch.setattr(module, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def resp_server():
+    server = FakeRespServer()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def db():
+    """Session on a fresh in-memory SQLite database with every table"""
+    from app.db.base import Base
+    # Modules app.models does not re-export, needed to configure the mappers
+    import app.models.change  # noqa: F401
+    import app.models.content  # noqa: F401
+    import app.models.role_permission  # noqa: F401
+    from app.core import security
+    from app.services import permission_service, user_cache_service
+
+    # Process-wide caches keyed by ids that each fresh database reuses
+    for cache in (security._verified_tokens, permission_service._registry_cache, user_cache_service._cache):
+        cache.clear()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def make_user(db):
+    """Create an active, verified user with the given role name"""
+    from app.core.security import get_password_hash
+    from app.models.role import Role
+    from app.models.user import User
+    from app.services.permission_service import PermissionService
+    from app.services.role_service import RoleService
+
+    RoleService.initialize_default_roles(db)
+    PermissionService.initialize_default_permissions(db)
+    password_hash = get_password_hash("password123")
+
+    def make(username: str, role: str = "user") -> User:
+        user = User(
+            email=f"{username}@example.com",
+            username=username,
+            hashed_password=password_hash,
+            role_id=db.query(Role.id).filter(Role.name == role).scalar(),
+            is_active=True,
+            is_verified=True
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+
+    return make
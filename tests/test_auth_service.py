@@ -0,0 +1,79 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.api.deps import get_current_user
+from app.core.security import create_refresh_token, verify_token
+from app.models.blacklisted_token import BlacklistedToken
+from app.models.session import UserSession
+from app.services.auth_service import AuthService
+
+
+def authenticate(db, access_token):
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=access_token)
+    return get_current_user(db=db, credentials=credentials)
+
+
+def test_refresh_rotates_within_the_session(db, make_user):
+    alice = make_user("alice")
+    tokens = AuthService.create_tokens(alice.id, db)
+
+    rotated = AuthService.refresh_access_token(db, tokens["refresh_token"])
+
+    old, new = verify_token(tokens["refresh_token"]), verify_token(rotated["refresh_token"])
+    assert new["sid"] == old["sid"]
+    assert new["jti"] != old["jti"]
+    assert db.get(UserSession, new["sid"]).current_jti == new["jti"]
+    assert authenticate(db, rotated["access_token"]).id == alice.id
+
+
+def test_replayed_refresh_token_revokes_the_session(db, make_user):
+    alice = make_user("alice")
+    tokens = AuthService.create_tokens(alice.id, db)
+    rotated = AuthService.refresh_access_token(db, tokens["refresh_token"])
+
+    with pytest.raises(HTTPException) as error:
+        AuthService.refresh_access_token(db, tokens["refresh_token"])
+    assert error.value.status_code == 401
+
+    session = db.get(UserSession, verify_token(tokens["refresh_token"])["sid"])
+    db.refresh(session)
+    assert session.revoked_at is not None
+
+    # The legitimate holder's newer token belongs to the same, now revoked, family
+    with pytest.raises(HTTPException) as error:
+        AuthService.refresh_access_token(db, rotated["refresh_token"])
+    assert error.value.status_code == 401
+
+
+def test_access_token_of_revoked_session_gets_401(db, make_user):
+    alice = make_user("alice")
+    tokens = AuthService.create_tokens(alice.id, db)
+    assert authenticate(db, tokens["access_token"]).id == alice.id
+
+    AuthService.refresh_access_token(db, tokens["refresh_token"])
+    with pytest.raises(HTTPException):
+        AuthService.refresh_access_token(db, tokens["refresh_token"])
+
+    with pytest.raises(HTTPException) as error:
+        authenticate(db, tokens["access_token"])
+    assert error.value.status_code == 401
+
+
+def test_legacy_refresh_token_is_upgraded_to_a_session(db, make_user):
+    alice = make_user("alice")
+    legacy = create_refresh_token({"sub": str(alice.id), "epoch": alice.token_epoch})
+
+    tokens = AuthService.refresh_access_token(db, legacy)
+
+    payload = verify_token(tokens["refresh_token"])
+    session = db.get(UserSession, payload["sid"])
+    assert session.user_id == alice.id
+    assert session.current_jti == payload["jti"]
+    assert authenticate(db, tokens["access_token"]).id == alice.id
+
+    # The sid-less token is single use
+    assert db.query(BlacklistedToken).filter_by(token_jti=verify_token(legacy)["jti"]).one().is_revoked
+    with pytest.raises(HTTPException) as error:
+        AuthService.refresh_access_token(db, legacy)
+    assert error.value.status_code == 401
@@ -0,0 +1,47 @@
+import pytest
+from starlette.requests import Request
+
+from app.api.deps import get_client_ip
+from app.core.config import settings
+
+
+def make_request(peer: str, headers: dict) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": (peer, 50000),
+    })
+
+
+@pytest.fixture(autouse=True)
+def trusted_proxies(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", "127.0.0.1,10.0.0.0/8")
+
+
+def test_forwarded_headers_from_untrusted_peers_are_ignored():
+    request = make_request("203.0.113.7", {"X-Forwarded-For": "1.2.3.4", "X-Real-IP": "5.6.7.8"})
+
+    assert get_client_ip(request) == "203.0.113.7"
+
+
+def test_forwarded_for_from_a_trusted_proxy():
+    assert get_client_ip(make_request("127.0.0.1", {"X-Forwarded-For": "198.51.100.9"})) == "198.51.100.9"
+
+
+def test_forwarded_for_skips_trusted_hops_but_not_spoofed_ones():
+    # The client prepended 1.2.3.4 itself; 198.51.100.9 is what our proxies saw
+    request = make_request("10.0.0.2", {"X-Forwarded-For": "1.2.3.4, 198.51.100.9, 10.0.0.5"})
+
+    assert get_client_ip(request) == "198.51.100.9"
+
+
+def test_real_ip_from_a_trusted_proxy():
+    assert get_client_ip(make_request("10.1.2.3", {"X-Real-IP": "198.51.100.9"})) == "198.51.100.9"
+
+
+def test_trust_everything(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", "*")
+
+    assert get_client_ip(make_request("203.0.113.7", {"X-Forwarded-For": "1.2.3.4"})) == "1.2.3.4"
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from app.models.content import Content
+from app.schemas.content import ContentResponse
+from app.services.content_service import ContentService
+
+
+def add_pending(db, author, count):
+    start = datetime.now(timezone.utc) - timedelta(hours=1)
+    items = [
+        Content(title=f"item {i}", content="text", author_id=author.id, created_at=start + timedelta(minutes=i))
+        for i in range(count)
+    ]
+    db.add_all(items)
+    db.commit()
+    return [item.id for item in items]
+
+
+def test_claim_returns_the_oldest_pending_items_in_queue_order(db, make_user):
+    author, moderator = make_user("alice"), make_user("mod", "moderator")
+    ids = add_pending(db, author, 5)
+
+    first = ContentService.claim_pending_content(db, moderator.id, limit=3)
+    second = ContentService.claim_pending_content(db, moderator.id, limit=3)
+
+    assert [item.id for item in first] == ids[:3]
+    assert [item.id for item in second] == ids[3:]
+    assert all(item.claimed_by == moderator.id for item in first + second)
+
+
+def test_claimed_items_are_read_without_further_queries(db, make_user):
+    author, moderator = make_user("alice"), make_user("mod", "moderator")
+    add_pending(db, author, 5)
+    moderator_id = moderator.id
+
+    statements = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        claimed = ContentService.claim_pending_content(db, moderator_id, limit=5)
+        [ContentResponse.model_validate(item) for item in claimed]
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    # Only the claiming UPDATE; no refresh SELECT per claimed row
+    assert len(claimed) == 5
+    assert [statement.split()[0] for statement in statements] == ["UPDATE"]
@@ -0,0 +1,89 @@
+import pytest
+
+from app.core.counters import Cooldown, SlidingWindowCounter
+
+
+@pytest.fixture
+def counter(clock):
+    return SlidingWindowCounter("test", 60)
+
+
+def test_counts_within_the_current_window(counter, clock):
+    for _ in range(3):
+        counter.hit("a")
+    clock.advance(59)
+
+    assert counter.count("a") == 3
+    assert counter.count("b") == 0
+
+
+def test_previous_window_is_weighted_by_its_overlap(counter, clock):
+    counter.hit("a", 10)
+
+    clock.advance(60)
+    assert counter.count("a") == 10
+
+    # A quarter into the new window, three quarters of the old one still count
+    clock.advance(15)
+    assert counter.count("a") == 7.5
+    assert counter.hit("a", 2) == 9.5
+
+    clock.advance(60)
+    assert counter.count("a") == 1.5
+
+
+def test_windows_older_than_the_previous_one_are_dropped(counter, clock):
+    counter.hit("a", 10)
+    clock.advance(120)
+
+    assert counter.count("a") == 0
+    assert counter.hit("a") == 1
+
+
+def test_reset_forgets_the_key(counter):
+    counter.hit("a", 5)
+
+    counter.reset("a")
+
+    assert counter.count("a") == 0
+
+
+def test_stale_keys_are_swept_on_write(counter, clock):
+    counter.hit("a")
+    clock.advance(120)
+
+    counter.hit("b")
+
+    assert len(counter) == 1
+
+
+def test_cooldown_allows_one_event_per_period(clock):
+    cooldown = Cooldown("test", 60)
+
+    assert cooldown.acquire("a") is True
+    assert cooldown.acquire("a") is False
+    assert cooldown.acquire("b") is True
+
+    clock.advance(59.9)
+    assert cooldown.acquire("a") is False
+    clock.advance(0.1)
+    assert cooldown.acquire("a") is True
+
+
+def test_cooldown_reset_releases_the_key(clock):
+    cooldown = Cooldown("test", 60)
+    cooldown.acquire("a")
+
+    cooldown.reset("a")
+
+    assert cooldown.acquire("a") is True
+
+
+def test_expired_cooldowns_are_swept(clock):
+    cooldown = Cooldown("test", 30)
+    cooldown.acquire("a")
+    clock.advance(60)
+
+    cooldown.acquire("b")
+
+    assert len(cooldown) == 1
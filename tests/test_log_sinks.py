@@ -0,0 +1,62 @@
+import io
+import threading
+
+from app.core.log_sinks import BackgroundLogWriter, RotatingFile
+
+
+def test_stop_writes_everything_queued(tmp_path):
+    writer = BackgroundLogWriter(flush_interval=0.05)
+    app_log = writer.sink(RotatingFile(str(tmp_path / "app.log"), 10 ** 6, 1))
+    stream = io.StringIO()
+    console = writer.sink(stream)
+
+    for n in range(500):
+        app_log(f"line {n}\n")
+        console(f"line {n}\n")
+    writer.stop()
+
+    expected = "".join(f"line {n}\n" for n in range(500))
+    assert (tmp_path / "app.log").read_text() == expected
+    assert stream.getvalue() == expected
+    assert writer.get_stats()["written"] == 1000
+
+
+def test_records_are_written_without_stop(tmp_path):
+    written = threading.Event()
+
+    class Target(io.StringIO):
+        def flush(self):
+            written.set()
+
+    writer = BackgroundLogWriter(flush_interval=0.001)
+    target = Target()
+    writer.sink(target)("hello\n")
+
+    assert written.wait(5)
+    assert target.getvalue() == "hello\n"
+    writer.stop()
+
+
+def test_full_buffer_drops_and_counts(tmp_path):
+    writer = BackgroundLogWriter(max_queue=10, flush_interval=60)
+    sink = writer.sink(io.StringIO())
+
+    for n in range(25):
+        sink(f"line {n}\n")
+
+    stats = writer.get_stats()
+    assert stats["dropped"] == 15
+    assert stats["queued"] == 10
+    writer.stop()
+    assert writer.get_stats()["written"] == 10
+
+
+def test_rotates_by_size(tmp_path):
+    log = RotatingFile(str(tmp_path / "app.log"), 100, 1, compress=False)
+
+    for _ in range(5):
+        log.write("x" * 60)
+    log.close()
+
+    assert log.rotations == 4
+    assert len(list(tmp_path.glob("app.*.log"))) == 4
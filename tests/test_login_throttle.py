@@ -0,0 +1,138 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app.api.v1 import auth
+from app.models.audit_log import AuditLog
+from app.schemas.auth import LoginRequest
+from app.services.login_throttle_service import LoginThrottle
+
+EMAIL = "alice@example.com"
+IP = "203.0.113.5"
+
+
+@pytest.fixture
+def throttle(clock, monkeypatch):
+    monkeypatch.setattr(auth, "login_throttle", LoginThrottle())
+    return auth.login_throttle
+
+
+@pytest.fixture
+def audit_db(db, monkeypatch):
+    # flush() opens its own session; point it at the test database
+    monkeypatch.setattr("app.db.base.SessionLocal", sessionmaker(bind=db.get_bind()))
+    return db
+
+
+def fail(throttle, times, ip_address=None):
+    for _ in range(times):
+        throttle.record_failure(EMAIL, ip_address)
+
+
+def test_free_attempts_are_not_delayed(throttle):
+    for _ in range(3):
+        assert throttle.acquire(EMAIL) == 0
+        throttle.record_failure(EMAIL)
+
+    # The fourth failure starts the backoff
+    fail(throttle, 1)
+    assert throttle.acquire(EMAIL) == 1.0
+
+
+def test_delay_doubles_with_every_further_failure(throttle, clock):
+    fail(throttle, 3)
+
+    for delay in (1.0, 2.0, 4.0, 8.0):
+        throttle.record_failure(EMAIL)
+        assert throttle.acquire(EMAIL) == delay
+        clock.advance(delay)
+        assert throttle.acquire(EMAIL) == 0
+
+
+def test_delay_is_capped(throttle):
+    fail(throttle, 30)
+
+    assert throttle.acquire(EMAIL) == 900.0
+
+
+def test_allowed_attempt_claims_the_next_window(throttle, clock):
+    fail(throttle, 4)
+    clock.advance(1.0)
+
+    # One attempt goes through; a concurrent one waits for the window the
+    # first would open if it fails too
+    assert throttle.acquire(EMAIL) == 0
+    assert throttle.acquire(EMAIL) == 2.0
+
+
+def test_ip_key_backs_off_across_emails(throttle):
+    for n in range(21):
+        throttle.record_failure(f"user{n}@example.com", IP)
+
+    assert throttle.acquire("other@example.com", IP) == 1.0
+    assert throttle.acquire("other@example.com", "198.51.100.7") == 0
+
+
+def test_success_clears_the_email(throttle):
+    fail(throttle, 5)
+
+    throttle.record_success(EMAIL)
+
+    assert throttle.acquire(EMAIL) == 0
+
+
+def test_failures_decay_and_are_swept(throttle, clock):
+    fail(throttle, 5)
+    clock.advance(899)
+    assert throttle.sweep() == 0
+
+    clock.advance(1)
+    assert throttle.sweep() == 1
+    assert throttle.acquire(EMAIL) == 0
+
+
+def test_throttled_login_gets_429_with_retry_after(throttle):
+    fail(throttle, 5, IP)
+    request = Request({"type": "http", "method": "POST", "path": "/", "headers": [], "client": (IP, 4711)})
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(auth.login(LoginRequest(email=EMAIL, password="wrong"), request, db=None))
+
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "2"
+    assert throttle.get_stats()["pending_summaries"] == 1
+
+
+def test_flush_writes_one_summary_per_email_and_ip(throttle, clock, audit_db):
+    for _ in range(3):
+        throttle.suppress(EMAIL, IP, "curl/8.0")
+        clock.advance(10)
+    throttle.suppress("bob@example.com", IP)
+
+    assert throttle.flush() == 2
+    assert throttle.flush() == 0
+
+    rows = {row.details["email"]: row for row in audit_db.query(AuditLog).filter_by(action="login_throttled")}
+    assert rows[EMAIL].details["attempts"] == 3
+    assert rows[EMAIL].ip_address == IP
+    assert rows[EMAIL].user_agent == "curl/8.0"
+    assert rows[EMAIL].details["first_attempt_at"].startswith("2023-11-05T16:00:00")
+    assert rows[EMAIL].details["last_attempt_at"].startswith("2023-11-05T16:00:20")
+    assert rows["bob@example.com"].details["attempts"] == 1
+
+
+def test_failed_flush_keeps_the_summaries(throttle, audit_db):
+    throttle.suppress(EMAIL, IP)
+
+    with mock.patch("app.services.audit_service.AuditService.log_actions", side_effect=RuntimeError("down")):
+        assert throttle.flush() == 0
+    throttle.suppress(EMAIL, IP)
+
+    assert throttle.get_stats()["flush_errors"] == 1
+    assert throttle.flush() == 1
+    row = audit_db.query(AuditLog).filter_by(action="login_throttled").one()
+    assert row.details["attempts"] == 2
@@ -0,0 +1,55 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import otp_store
+from app.core.otp_store import MemoryOTPStore
+from app.services import otp_service
+from app.services.otp_service import OTPService
+
+EMAIL = "alice@example.com"
+
+
+@pytest.fixture(autouse=True)
+def fresh_limits(monkeypatch):
+    monkeypatch.setattr(otp_store, "_store", MemoryOTPStore())
+    monkeypatch.setattr(otp_service, "_resend_cooldown", otp_service.Cooldown("otp_resend_test", 60))
+    monkeypatch.setattr(otp_service, "_sends_by_ip", otp_service.SlidingWindowCounter("otp_send_ip_test", 60))
+
+
+def send(db, delivered):
+    with mock.patch("app.services.email_service.EmailService.send_otp_email", return_value=delivered) as send_email:
+        issued = asyncio.run(OTPService.create_otp(db, EMAIL, purpose="login"))
+    return issued, send_email.await_count
+
+
+def test_resend_within_cooldown_keeps_the_pending_code(db):
+    assert send(db, delivered=True) == (True, 1)
+    assert send(db, delivered=True) == (False, 0)
+
+
+def test_failed_send_does_not_hold_the_cooldown(db):
+    assert send(db, delivered=False) == (True, 1)
+    # Nothing was mailed, so the resend mails a new code instead of coalescing
+    assert send(db, delivered=True) == (True, 1)
+
+
+def test_failed_store_write_does_not_hold_the_cooldown(db):
+    with mock.patch.object(MemoryOTPStore, "issue", side_effect=RuntimeError("store down")):
+        with pytest.raises(RuntimeError):
+            send(db, delivered=True)
+
+    assert send(db, delivered=True) == (True, 1)
+
+
+def test_send_limit_per_ip(db, monkeypatch):
+    monkeypatch.setattr(otp_service.settings, "OTP_SEND_MAX_PER_IP", 2)
+    OTPService.check_send_allowed("10.0.0.1")
+    OTPService.check_send_allowed("10.0.0.1")
+
+    with pytest.raises(HTTPException) as error:
+        OTPService.check_send_allowed("10.0.0.1")
+    assert error.value.status_code == 429
+    OTPService.check_send_allowed("10.0.0.2")
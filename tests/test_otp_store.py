@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+from app.core.otp_store import MemoryOTPStore, RedisOTPStore, SQLOTPStore
+from app.models.otp import OTP
+
+EMAIL = "alice@example.com"
+
+
+@pytest.fixture
+def redis_store(resp_server):
+    return RedisOTPStore(resp_server.url)
+
+
+@pytest.fixture(params=["memory", "sql", "redis"])
+def store(request):
+    if request.param == "memory":
+        return MemoryOTPStore()
+    if request.param == "sql":
+        return SQLOTPStore()
+    return request.getfixturevalue("redis_store")
+
+
+def test_issue_then_consume(store, db):
+    store.issue(db, EMAIL, "login", "123456", 60)
+
+    assert store.consume(db, EMAIL, "login", "123456") is True
+
+
+def test_code_works_once(store, db):
+    store.issue(db, EMAIL, "login", "123456", 60)
+    store.consume(db, EMAIL, "login", "123456")
+
+    assert store.consume(db, EMAIL, "login", "123456") is False
+
+
+def test_wrong_guess_keeps_the_code(store, db):
+    store.issue(db, EMAIL, "login", "123456", 60)
+
+    assert store.consume(db, EMAIL, "login", "000000") is False
+    assert store.consume(db, EMAIL, "login", "123456") is True
+
+
+def test_new_code_replaces_the_previous_one(store, db):
+    store.issue(db, EMAIL, "login", "111111", 60)
+    store.issue(db, EMAIL, "login", "222222", 60)
+
+    assert store.consume(db, EMAIL, "login", "111111") is False
+    assert store.consume(db, EMAIL, "login", "222222") is True
+
+
+def test_codes_are_per_purpose_and_email(store, db):
+    store.issue(db, EMAIL, "login", "111111", 60)
+    store.issue(db, EMAIL, "registration", "222222", 60)
+
+    assert store.consume(db, EMAIL, "login", "222222") is False
+    assert store.consume(db, "bob@example.com", "login", "111111") is False
+    assert store.consume(db, EMAIL, "registration", "222222") is True
+    assert store.consume(db, EMAIL, "login", "111111") is True
+
+
+def test_expired_code_is_rejected(store, db):
+    store.issue(db, EMAIL, "login", "123456", 0.05)
+    time.sleep(0.1)
+
+    assert store.consume(db, EMAIL, "login", "123456") is False
+
+
+def test_unknown_email_is_rejected(store, db):
+    assert store.consume(db, EMAIL, "login", "123456") is False
+
+
+def test_sql_store_keeps_one_row_per_email_and_purpose(db):
+    store = SQLOTPStore()
+    for code in ("111111", "222222", "333333"):
+        store.issue(db, EMAIL, "login", code, 60)
+    db.commit()
+
+    rows = db.query(OTP).filter(OTP.email == EMAIL).all()
+    assert [(row.purpose, row.code) for row in rows] == [("login", "333333")]
+
+
+def test_sql_store_cleanup_deletes_only_expired_codes(db):
+    store = SQLOTPStore()
+    store.issue(db, EMAIL, "login", "111111", -1)
+    store.issue(db, EMAIL, "registration", "222222", 60)
+    db.commit()
+
+    assert store.cleanup(db) == 1
+    assert [row.purpose for row in db.query(OTP).all()] == ["registration"]
+
+
+def test_redis_store_sets_a_server_side_expiry(redis_store, resp_server, db):
+    redis_store.issue(db, EMAIL, "login", "123456", 300)
+
+    assert ["SET", f"otp:login:{EMAIL}", "123456", "PX", "300000"] in resp_server.redis.commands
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+import pytest
+from jwt import InvalidTokenError
+
+from app.core import keys, security
+from app.core.config import settings
+from app.core.security import create_access_token, verify_token
+
+
+@pytest.fixture(autouse=True)
+def fresh_keyring(monkeypatch):
+    monkeypatch.setattr(keys, "_keyring", None)
+    security._verified_tokens.clear()
+    yield
+    security._verified_tokens.clear()
+
+
+@pytest.fixture
+def legacy_token():
+    # Issued while no asymmetric keys were configured
+    return create_access_token({"sub": "1"})
+
+
+@pytest.fixture
+def signing_keys(tmp_path, monkeypatch):
+    keys.generate_key(str(tmp_path))
+    monkeypatch.setattr(settings, "JWT_KEYS_DIR", str(tmp_path))
+    monkeypatch.setattr(keys, "_keyring", None)
+
+
+def test_hs256_accepted_without_keys(legacy_token):
+    assert verify_token(legacy_token)["sub"] == "1"
+
+
+def test_legacy_token_rejected_once_keys_configured(legacy_token, signing_keys, monkeypatch):
+    monkeypatch.setattr(settings, "ACCEPT_LEGACY_HS256_UNTIL", None)
+
+    with pytest.raises(InvalidTokenError):
+        verify_token(legacy_token)
+
+
+def test_legacy_token_accepted_during_grace_period(legacy_token, signing_keys, monkeypatch):
+    monkeypatch.setattr(settings, "ACCEPT_LEGACY_HS256_UNTIL", datetime.utcnow() + timedelta(days=1))
+
+    assert verify_token(legacy_token)["sub"] == "1"
+
+
+def test_legacy_token_rejected_after_grace_period(legacy_token, signing_keys, monkeypatch):
+    monkeypatch.setattr(settings, "ACCEPT_LEGACY_HS256_UNTIL", datetime.utcnow() + timedelta(days=1))
+    verify_token(legacy_token)
+
+    # Not served from the cache of verified tokens once the window closes
+    monkeypatch.setattr(settings, "ACCEPT_LEGACY_HS256_UNTIL", datetime.utcnow() - timedelta(seconds=1))
+    with pytest.raises(InvalidTokenError):
+        verify_token(legacy_token)
+
+
+def test_keyed_token_accepted(signing_keys, monkeypatch):
+    monkeypatch.setattr(settings, "ACCEPT_LEGACY_HS256_UNTIL", None)
+
+    assert verify_token(create_access_token({"sub": "2"}))["sub"] == "2"
@@ -0,0 +1,75 @@
+import pytest
+
+from app.core.token_bucket import MemoryBucketStore, SQLiteBucketStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, clock, tmp_path):
+    if request.param == "memory":
+        return MemoryBucketStore()
+    return SQLiteBucketStore(str(tmp_path / "buckets.db"))
+
+
+def test_allows_capacity_then_refuses(store):
+    results = [store.take("a", 3, 1.0) for _ in range(4)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert [tokens for _, tokens in results] == [2, 1, 0, 0]
+
+
+def test_refills_at_rate(store, clock):
+    for _ in range(3):
+        store.take("a", 3, 0.5)
+
+    clock.advance(1)
+    assert store.take("a", 3, 0.5) == (False, 0.5)
+    clock.advance(1)
+    assert store.take("a", 3, 0.5) == (True, 0)
+
+
+def test_refill_is_capped_at_capacity(store, clock):
+    store.take("a", 3, 1.0)
+    clock.advance(3600)
+
+    assert store.take("a", 3, 1.0) == (True, 2)
+
+
+def test_keys_are_independent(store):
+    for _ in range(3):
+        store.take("a", 3, 1.0)
+
+    assert store.take("b", 3, 1.0) == (True, 2)
+
+
+def test_refilled_buckets_are_swept_on_take(store, clock):
+    store.take("a", 3, 1.0)
+    clock.advance(60)
+
+    store.take("b", 3, 1.0)
+
+    assert len(store) == 1
+
+
+def test_sqlite_sweep_deletes_only_full_buckets(clock, tmp_path):
+    store = SQLiteBucketStore(str(tmp_path / "buckets.db"))
+    start = clock.time()
+    for _ in range(3):
+        store.take("a", 3, 1.0)
+    store.take("b", 3, 1.0)
+
+    # a is full again after 3 seconds, b after 1
+    assert store.sweep(start + 0.9) == 0
+    assert store.sweep(start + 1) == 1
+    assert store.sweep(start + 2.9) == 0
+    assert store.sweep(start + 3) == 1
+    assert len(store) == 0
+
+
+def test_sqlite_sweep_runs_in_batches(clock, tmp_path, monkeypatch):
+    store = SQLiteBucketStore(str(tmp_path / "buckets.db"))
+    monkeypatch.setattr(SQLiteBucketStore, "SWEEP_BATCH", 3)
+    for n in range(7):
+        store.take(f"key{n}", 3, 1.0)
+
+    assert store.sweep(clock.time() + 1) == 7
+    assert len(store) == 0
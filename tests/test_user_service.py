@@ -0,0 +1,44 @@
+from unittest import mock
+
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.user import UserUpdate
+from app.services.user_service import UserService
+
+
+def test_owner_can_update_own_profile(db, make_user):
+    alice = make_user("alice")
+
+    user = UserService.update_user(db, alice.id, UserUpdate(full_name="Alice"), actor_id=alice.id)
+
+    assert user.full_name == "Alice"
+
+
+def test_admin_can_update_other_users(db, make_user):
+    admin, alice = make_user("admin", "admin"), make_user("alice")
+
+    user = UserService.update_user(db, alice.id, UserUpdate(full_name="Alice"), actor_id=admin.id)
+
+    assert user.full_name == "Alice"
+
+
+def test_other_users_get_403_before_uniqueness_checks(db, make_user):
+    alice, bob = make_user("alice"), make_user("bob")
+    make_user("carol")
+
+    # Taken email and username: a 400 here would reveal that they exist
+    for update in (UserUpdate(email="carol@example.com"), UserUpdate(username="carol")):
+        with pytest.raises(HTTPException) as error:
+            UserService.update_user(db, alice.id, update, actor_id=bob.id)
+        assert error.value.status_code == 403
+
+
+def test_unauthorized_update_does_not_hash_the_password(db, make_user):
+    alice, bob = make_user("alice"), make_user("bob")
+
+    with mock.patch("app.services.user_service.get_password_hash") as hash_password:
+        with pytest.raises(HTTPException):
+            UserService.update_user(db, alice.id, UserUpdate(password="new-password"), actor_id=bob.id)
+
+    hash_password.assert_not_called()